@@ -0,0 +1,120 @@
+"""Workflow engine benchmark suite.
+
+Run from `backend/`:
+
+    uv run python -m benchmarks run                       # all cases → benchmarks/results/latest.json
+    uv run python -m benchmarks run -k resolve_variables  # selected cases
+
+No baseline is committed: timings from different hardware aren't comparable.
+Record one from the base commit (e.g. ``main``) in a separate worktree, on the
+same machine, then run your checkout and compare (exit 1 on regression):
+
+    # baseline.json: measured on <base>, checked out in ../../bench-base
+    git worktree add ../../bench-base <base>
+    (cd ../../bench-base/backend && uv run python -m benchmarks run \
+        --output "$OLDPWD/benchmarks/results/baseline.json")
+    git worktree remove ../../bench-base
+
+    # latest.json: measured on your checkout (the default --output)
+    uv run python -m benchmarks run
+
+    # --current defaults to latest.json, i.e. your checkout vs <base>
+    uv run python -m benchmarks compare --baseline benchmarks/results/baseline.json
+
+Only cases that exist on both commits are compared.
+``benchmarks/results/`` is gitignored.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks import cases  # noqa: F401 — registers the cases
+from benchmarks.harness import compare, load, registered_cases, run, save
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results" / "latest.json"
+
+
+def _run(args: argparse.Namespace) -> int:
+    known = {bench.name for bench in registered_cases()}
+    unknown = set(args.k or ()) - known
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    # Engine INFO logging (console + debug.log) would dominate the timings.
+    logging.disable(logging.INFO)
+    try:
+        report = run(args.k, quick=args.quick)
+    finally:
+        logging.disable(logging.NOTSET)
+    for key, result in report["results"].items():
+        print(f"{key:<36} {result['median_us']:>14.2f} µs  (min {result['min_us']:.2f})")
+    save(report, args.output)
+    print(f"\nSaved {len(report['results'])} result(s) to {args.output}")
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    comparisons = compare(
+        load(args.baseline), load(args.current), threshold=args.threshold
+    )
+    if not comparisons:
+        print("No benchmarks in common between the two reports.", file=sys.stderr)
+        return 2
+
+    regressions = 0
+    for item in comparisons:
+        flag = "REGRESSION" if item.regressed else ""
+        regressions += item.regressed
+        print(
+            f"{item.key:<36} {item.baseline_us:>12.2f} → {item.current_us:>12.2f} µs "
+            f"{item.ratio:>6.2f}x {flag}"
+        )
+    print(
+        f"\n{regressions} regression(s) beyond {args.threshold:.0%} "
+        f"across {len(comparisons)} benchmark(s)"
+    )
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and save results")
+    run_parser.add_argument(
+        "-k", action="append", metavar="NAME", help="Only run this case (repeatable)"
+    )
+    run_parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    run_parser.add_argument(
+        "--quick", action="store_true", help="Smallest size only, few repetitions"
+    )
+    run_parser.set_defaults(handler=_run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="Flag regressions against a baseline"
+    )
+    compare_parser.add_argument(
+        "--baseline",
+        type=Path,
+        required=True,
+        help="Results recorded with `run --output` on the commit to compare against",
+    )
+    compare_parser.add_argument("--current", type=Path, default=DEFAULT_OUTPUT)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown before flagging, as a fraction (default 0.2 = 20%%)",
+    )
+    compare_parser.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Benchmarked hot paths of the workflow engine, on synthetic inputs.
+
+Sizes grow by roughly an order of magnitude so the results show how each path
+scales: template body size, rule count, node/edge count, MIME tree size.
+"""
+
+import asyncio
+import base64
+import random
+import re
+from typing import Any, Dict
+from uuid import uuid4
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+# Populates the SQLAlchemy registry before anything imports the services.
+import core.models  # noqa: F401
+from benchmarks.harness import case
+from benchmarks.workflows import make_tree_workflow
+from core.processors.email_trigger_index import EmailTriggerIndex
+from core.processors.gmail_history_processor import GmailHistoryProcessor
+from gmail.schemas.message import GmailMessagePart
+from orchestration.engine import clear_execution_plan_cache
+from orchestration.engine.timing import NodeTiming
+from orchestration.flows.master_flow import build_run_audit, execute_workflow_dry_run
+from utils.build_adjacency_list import build_adjacency_list
+from utils.evaluate_condition import compile_condition, evaluate_condition
+from utils.gmail_api import build_gmail_service
+from utils.resolve_variables import (
+    ResolutionMemo,
+    VariableResolutionError,
+    _parse_default,
+    resolve_variables,
+)
+from workflow.schemas import WorkflowExecutionConfig, WorkflowSchema
+from workflow.schemas.condition_nodes import IfCondition
+from workflow.schemas.edges import Edge
+
+EMAIL = {
+    "from": "Alice <alice@example.com>",
+    "subject": "Invoice October",
+    "body": "Please find attached the invoice.",
+    "message_id": "msg_001",
+    "thread_id": "thread_001",
+    "header_message_id": "<msg001@gmail.com>",
+    "references": "",
+}
+
+FILLER = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------------
+
+
+def make_condition(rules: int) -> IfCondition:
+    """ALL over ``rules`` rules that all pass, so every rule is evaluated."""
+    operators = ["contains", "equals", "exists", "greater_than"]
+    rule_list = []
+    for i in range(rules):
+        operator = operators[i % len(operators)]
+        variable, value = {
+            "contains": ("{{trigger_1.subject}}", "invoice"),
+            "equals": ("{{trigger_1.from}}", "alice@example.com"),
+            "exists": ("{{trigger_1.body}}", None),
+            "greater_than": ("{{trigger_1.amount}}", "10"),
+        }[operator]
+        rule_list.append({"variable": variable, "operator": operator, "value": value})
+    return IfCondition.model_validate(
+        {"type": "if_condition", "config": {"rules": rule_list, "match_type": "ALL"}}
+    )
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+
+def make_mime_tree(body_kb: int, attachments: int = 3) -> GmailMessagePart:
+    """multipart/mixed → (attachments…, multipart/alternative → (html, plain)).
+
+    The plain-text part is the last leaf, so extraction walks the whole tree.
+    """
+    text = (FILLER * (body_kb * 1024 // len(FILLER) + 1))[: body_kb * 1024]
+    alternative = {
+        "partId": "1",
+        "mimeType": "multipart/alternative",
+        "parts": [
+            {
+                "partId": "1.0",
+                "mimeType": "text/html",
+                "body": {"size": len(text), "data": _b64(f"<p>{text}</p>")},
+            },
+            {
+                "partId": "1.1",
+                "mimeType": "text/plain",
+                "headers": [
+                    {"name": "Content-Type", "value": 'text/plain; charset="UTF-8"'}
+                ],
+                "body": {"size": len(text), "data": _b64(text)},
+            },
+        ],
+    }
+    files = [
+        {
+            "partId": f"{i + 2}",
+            "mimeType": "application/pdf",
+            "filename": f"file{i}.pdf",
+            "body": {"size": 1024, "attachmentId": f"att{i}"},
+        }
+        for i in range(attachments)
+    ]
+    return GmailMessagePart.model_validate(
+        {"partId": "", "mimeType": "multipart/mixed", "parts": [*files, alternative]}
+    )
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+
+def make_reply_config(body_kb: int) -> Dict[str, Any]:
+    """A send_email config whose body is ``body_kb`` KB: a quoted thread with a
+    few variables and a large plain-text signature block."""
+    paragraph = (
+        "Hi {{trigger_1.from}},\n\n{{node_outputs.draft_1.body}}\n\n"
+        "> {{trigger_1.body | 'no quoted text'}}\n\n"
+    ) + FILLER * 18
+    return {
+        "to": "bob@example.com",
+        "subject": "Re: {{trigger_1.subject}}",
+        "body": paragraph * max(body_kb * 1024 // len(paragraph), 1),
+        "signature": FILLER * 72,
+    }
+
+
+REPLY_CONTEXT = {
+    "trigger_1": EMAIL,
+    "node_outputs": {"draft_1": {"body": "Thanks, we'll pay it this week."}},
+}
+
+
+def legacy_resolve_variables(value: Any, context: Dict[str, Any]) -> Any:
+    """The resolver before template compilation: ``re.sub`` with a fresh
+    closure, re-parsing each placeholder on every call."""
+    if isinstance(value, str):
+
+        def repl(match):
+            raw_match = match.group(0)
+            inner = match.group(1).strip()
+            default = None
+            has_default = "|" in inner
+            if has_default:
+                path_str, default_raw = inner.split("|", 1)
+                default = _parse_default(default_raw.strip())
+            else:
+                path_str = inner
+            current = context
+            try:
+                for p in path_str.strip().split("."):
+                    current = (
+                        current[p] if isinstance(current, dict) else getattr(current, p)
+                    )
+                return str(current)
+            except (KeyError, AttributeError, TypeError):
+                if has_default:
+                    return str(default)
+                raise VariableResolutionError(raw_match) from None
+
+        return re.sub(r"\{\{\s*(.*?)\s*\}\}", repl, value)
+    if isinstance(value, dict):
+        return {k: legacy_resolve_variables(v, context) for k, v in value.items()}
+    if isinstance(value, list):
+        return [legacy_resolve_variables(v, context) for v in value]
+    return value
+
+
+@case("resolve_variables", sizes=(1, 16, 128))
+def bench_resolve_variables(body_kb: int):
+    """Compiled templates, cached per process, as every action resolves them."""
+    config = make_reply_config(body_kb)
+    return lambda: resolve_variables(config, REPLY_CONTEXT)
+
+
+@case("resolve_variables_legacy", sizes=(1, 16, 128))
+def bench_resolve_variables_legacy(body_kb: int):
+    """The per-call regex resolver, for comparison with ``resolve_variables``."""
+    config = make_reply_config(body_kb)
+    assert legacy_resolve_variables(config, REPLY_CONTEXT) == resolve_variables(
+        config, REPLY_CONTEXT
+    )
+    return lambda: legacy_resolve_variables(config, REPLY_CONTEXT)
+
+
+@case("evaluate_condition", sizes=(1, 10, 50))
+def bench_evaluate_condition(rules: int):
+    """Compiles the rules on every call, as the executor used to."""
+    condition = make_condition(rules)
+    context = {"trigger_1": {**EMAIL, "amount": "250"}}
+    return lambda: evaluate_condition(condition, context)
+
+
+@case("compiled_condition", sizes=(1, 10, 50))
+def bench_compiled_condition(rules: int):
+    """The predicate an execution plan compiles once, for comparison with
+    ``evaluate_condition``."""
+    condition = make_condition(rules)
+    predicate = compile_condition(condition)
+    context = {"trigger_1": {**EMAIL, "amount": "250"}}
+    assert predicate(context) == evaluate_condition(condition, context)
+    return lambda: predicate(context)
+
+
+@case("condition_fan_out", sizes=(10, 100, 1000))
+def bench_condition_fan_out(branches: int):
+    """``branches`` compiled conditions testing the same fields of one run,
+    sharing the run's resolution memo as the executor does."""
+    predicates = [compile_condition(make_condition(4)) for _ in range(branches)]
+    context = {"trigger_1": {**EMAIL, "amount": "250"}}
+
+    def evaluate_all():
+        memo = ResolutionMemo()
+        return [predicate(context, memo) for predicate in predicates]
+
+    return evaluate_all
+
+
+@case("workflow_schema_validate", sizes=(10, 100, 1000))
+def bench_workflow_schema_validate(nodes: int):
+    workflow = make_tree_workflow(nodes)
+    return lambda: WorkflowSchema.model_validate(workflow)
+
+
+@case("build_adjacency_list", sizes=(100, 1000, 10000))
+def bench_build_adjacency_list(edges: int):
+    rng = random.Random(7)
+    nodes = max(edges // 5, 2)
+    edge_list = [
+        Edge(id=f"e{i}", source=f"n{rng.randrange(nodes)}", target=f"n{rng.randrange(nodes)}")
+        for i in range(edges)
+    ]
+    return lambda: build_adjacency_list(edge_list)
+
+
+@case("build_run_audit", sizes=(10, 100, 1000))
+def bench_build_run_audit(nodes: int):
+    node_outputs = {f"n{i}": {"id": f"msg_{i}", "body": FILLER} for i in range(nodes)}
+    failed = {f"n{i}": "boom" for i in range(0, nodes, 10)}
+    timings = {}
+    for node_id in node_outputs:
+        timing = NodeTiming("action", "send_email")
+        timing.finish()
+        timings[node_id] = timing
+    return lambda: build_run_audit(node_outputs, failed, timings)
+
+
+@case("get_email_body", sizes=(1, 64, 1024))
+def bench_get_email_body(body_kb: int):
+    processor = GmailHistoryProcessor(None, uuid4())  # type: ignore[arg-type]
+    payload = make_mime_tree(body_kb)
+    return lambda: processor._get_email_body(payload)
+
+
+@case("email_trigger_match", sizes=(10, 100, 1000))
+def bench_email_trigger_match(workflows: int):
+    """Matching one message against ``workflows`` active workflows, a third
+    each restricted by sender, by subject, or both."""
+    active = []
+    for i in range(workflows):
+        workflow = make_tree_workflow(2)["execution_config"]
+        criteria = workflow["nodes"]["trigger_1"]["config"]["config"]
+        if i % 3 != 1:
+            criteria["from"] = f"sender{i}@example.com"
+        if i % 3 != 0:
+            criteria["subject_contains"] = f"ticket {i}"
+        active.append((i, WorkflowExecutionConfig.model_validate(workflow)))
+    index = EmailTriggerIndex(active)
+    return lambda: index.match("Sender 5 <sender5@example.com>", "Re: ticket 5 update")
+
+
+@case("gmail_discovery_build", sizes=(1,))
+def bench_gmail_discovery_build(_: int):
+    """``build("gmail", "v1")``, which loads and parses the discovery document
+    on every call — the reference for gmail_service_build."""
+    credentials = Credentials("token")
+    return lambda: build("gmail", "v1", credentials=credentials).close()
+
+
+@case("gmail_service_build", sizes=(1,))
+def bench_gmail_service_build(_: int):
+    """The shared factory: binds credentials to the already parsed document."""
+    credentials = Credentials("token")
+    build_gmail_service(credentials).close()
+    return lambda: build_gmail_service(credentials).close()
+
+
+@case("dry_run_executor", sizes=(10, 100, 500), target_s=0.5)
+def bench_dry_run_executor(nodes: int):
+    """The executor loop end to end, with instant stub actions."""
+    workflow = make_tree_workflow(nodes)
+    trigger_context = {
+        "trigger_context": {
+            "matched_trigger_node_id": "trigger_1",
+            "original_email": EMAIL,
+        }
+    }
+    user_id = uuid4()
+    clear_execution_plan_cache()
+
+    def dry_run():
+        return asyncio.run(
+            execute_workflow_dry_run(user_id, workflow, trigger_context, "benchmark")
+        )
+
+    return dry_run
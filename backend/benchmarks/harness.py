@@ -0,0 +1,143 @@
+"""Timing, result files and baseline comparison for the benchmark suite.
+
+A case is registered with ``@case(name, sizes)``: the decorated function gets
+one input size and returns the zero-argument callable to time. Each
+(case, size) pair is timed with ``timeit`` and reported per call, so results
+from different sizes and machines stay comparable in shape.
+"""
+
+import json
+import platform
+import statistics
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# A case's setup: input size → the callable to time.
+Setup = Callable[[int], Callable[[], Any]]
+
+
+class Case:
+    """One benchmarked hot path, run at each of ``sizes``."""
+
+    def __init__(self, name: str, sizes: Sequence[int], setup: Setup, target_s: float):
+        self.name = name
+        self.sizes = tuple(sizes)
+        self.setup = setup
+        self.target_s = target_s
+
+
+_cases: Dict[str, Case] = {}
+
+
+def case(name: str, sizes: Sequence[int], *, target_s: float = 0.2):
+    """Register a benchmark. ``target_s`` is roughly how long each timed
+    repetition should take; the call count per repetition is derived from it."""
+
+    def register(setup: Setup) -> Setup:
+        if name in _cases:
+            raise ValueError(f"Benchmark '{name}' is already registered.")
+        _cases[name] = Case(name, sizes, setup, target_s)
+        return setup
+
+    return register
+
+
+def registered_cases() -> List[Case]:
+    return list(_cases.values())
+
+
+def result_key(name: str, size: int) -> str:
+    return f"{name}[{size}]"
+
+
+def measure(fn: Callable[[], Any], *, target_s: float, repeat: int) -> Dict[str, Any]:
+    """Per-call timings of ``fn`` in microseconds (best and median of ``repeat``)."""
+    timer = timeit.Timer(fn)
+    # autorange picks a call count that takes at least 0.2s; scale it to target_s.
+    number, elapsed = timer.autorange()
+    number = max(int(number * target_s / max(elapsed, 1e-9)), 1)
+    runs = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": round(min(runs), 3),
+        "median_us": round(statistics.median(runs), 3),
+    }
+
+
+def run(
+    names: Optional[Iterable[str]] = None, *, quick: bool = False
+) -> Dict[str, Any]:
+    """Run the registered cases (all, or those in ``names``).
+
+    ``quick`` only runs each case's smallest size with fewer repetitions, for
+    smoke-testing the suite itself.
+    """
+    selected = set(names) if names else None
+    results: Dict[str, Any] = {}
+    for bench in registered_cases():
+        if selected is not None and bench.name not in selected:
+            continue
+        sizes = bench.sizes[:1] if quick else bench.sizes
+        for size in sizes:
+            fn = bench.setup(size)
+            results[result_key(bench.name, size)] = measure(
+                fn,
+                target_s=0.02 if quick else bench.target_s,
+                repeat=2 if quick else 5,
+            )
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def save(report: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def load(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+class Comparison:
+    """One benchmark's current median against the baseline's."""
+
+    def __init__(self, key: str, baseline_us: float, current_us: float, threshold: float):
+        self.key = key
+        self.baseline_us = baseline_us
+        self.current_us = current_us
+        self.ratio = current_us / baseline_us if baseline_us else float("inf")
+        self.regressed = self.ratio > 1 + threshold
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], *, threshold: float
+) -> List[Comparison]:
+    """Compare the medians of the benchmarks present in both reports.
+
+    A benchmark regressed when it is more than ``threshold`` (0.2 = 20%)
+    slower than the baseline.
+    """
+    base_results = baseline.get("results", {})
+    comparisons: List[Comparison] = []
+    for key, result in current.get("results", {}).items():
+        if key not in base_results:
+            continue
+        comparisons.append(
+            Comparison(
+                key,
+                base_results[key]["median_us"],
+                result["median_us"],
+                threshold,
+            )
+        )
+    return comparisons
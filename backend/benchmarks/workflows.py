@@ -0,0 +1,108 @@
+"""Synthetic workflow definitions for the benchmarks and the engine tests.
+
+Nodes are plain dicts in the shape the API stores; ``make_workflow`` wraps them
+and their edges into the ``{"name", "description", "execution_config"}`` data a
+flow run receives.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+# (source, target) or (source, target, sourceHandle).
+EdgeSpec = Union[Tuple[str, str], Tuple[str, str, Optional[str]]]
+
+
+def trigger(node_id: str, trigger_type: str = "email_received", **config) -> dict:
+    """A trigger node; an email trigger matches every message by default."""
+    if trigger_type == "email_received":
+        config = {"from": None, "subject_contains": None, **config}
+    return {
+        "id": node_id,
+        "type": "trigger",
+        "config": {"type": trigger_type, "config": config},
+    }
+
+
+def action(node_id: str, action_type: str, **config) -> dict:
+    return {
+        "id": node_id,
+        "type": "action",
+        "config": {"type": action_type, "config": config},
+    }
+
+
+def send_email(
+    node_id: str, subject: str = "S", body: str = "B", to: str = "a@example.com"
+) -> dict:
+    return action(node_id, "send_email", to=to, subject=subject, body=body)
+
+
+def condition(
+    node_id: str,
+    variable: str,
+    operator: str = "exists",
+    value: Any = None,
+    match_type: str = "ALL",
+) -> dict:
+    """An if_condition node with a single rule."""
+    return {
+        "id": node_id,
+        "type": "condition",
+        "config": {
+            "type": "if_condition",
+            "config": {
+                "rules": [{"variable": variable, "operator": operator, "value": value}],
+                "match_type": match_type,
+            },
+        },
+    }
+
+
+def make_workflow(
+    nodes: Iterable[dict],
+    edges: Iterable[EdgeSpec] = (),
+    start_node_ids: Optional[Sequence[str]] = None,
+    *,
+    name: str = "Test workflow",
+    description: str = "",
+) -> Dict[str, Any]:
+    """Workflow data for ``nodes`` and ``edges``; by default every trigger is a
+    start node."""
+    nodes = list(nodes)
+    if start_node_ids is None:
+        start_node_ids = [node["id"] for node in nodes if node["type"] == "trigger"]
+    edge_list = []
+    for i, (source, target, *handle) in enumerate(edges):
+        edge = {"id": f"e{i}", "source": source, "target": target}
+        if handle and handle[0]:
+            edge["sourceHandle"] = handle[0]
+        edge_list.append(edge)
+    return {
+        "name": name,
+        "description": description,
+        "execution_config": {
+            "start_node_ids": list(start_node_ids),
+            "nodes": {node["id"]: node for node in nodes},
+            "edges": edge_list,
+        },
+    }
+
+
+def make_tree_workflow(nodes: int, *, fan_out: int = 4, body: str = "Hello") -> dict:
+    """A trigger followed by ``nodes - 1`` send_email actions, as a tree in
+    which each action fans out to up to ``fan_out`` children."""
+    node_list = [trigger("trigger_1")]
+    edges = []
+    for i in range(nodes - 1):
+        node_list.append(
+            send_email(
+                f"action_{i}", "Re: {{trigger_1.subject}}", body, "bob@example.com"
+            )
+        )
+        parent = node_list[i // fan_out]["id"]
+        edges.append((parent, f"action_{i}"))
+    return make_workflow(
+        node_list,
+        edges,
+        name=f"Synthetic {nodes}",
+        description="Benchmark workflow",
+    )
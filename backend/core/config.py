@@ -40,6 +40,66 @@ class Settings(BaseSettings):
     # lifespan doesn't block retrying Prefect.
     register_deployments_on_startup: bool = True
 
+    # How many compiled workflow execution plans a worker process keeps warm
+    # (orchestration/engine/execution_plan.py). Least recently used are evicted.
+    execution_plan_cache_size: int = 256
+    # Compiled {{variable}} templates kept per process (utils/resolve_variables.py).
+    template_cache_size: int = 1024
+    # Validated workflow configs kept per API process for the Gmail sync and
+    # webhook triggers (workflow/services/workflow_config_cache.py).
+    workflow_config_cache_size: int = 512
+
+    # Keep only the fields of each action output that later nodes reference
+    # ({{node_outputs.<id>.<field>}}) in a run's context, and drop them once
+    # every node reading them has started (orchestration/engine/output_references.py).
+    prune_node_outputs: bool = True
+    # Longest string kept in a node's audited output (node_results); longer
+    # strings are cut with a marker. Fields later nodes reference are kept
+    # whole so a resumed run replays them intact. 0 stores outputs untrimmed.
+    audit_output_max_chars: int = 2000
+
+    # Claim check for Prefect runs (workflow/services/trigger_payload_service.py):
+    # trigger payloads (webhook body, decoded email) larger than this many bytes
+    # of JSON are stored compressed in trigger_payloads and the flow run only
+    # gets a reference. 0 always passes them inline.
+    trigger_payload_inline_max_bytes: int = 32 * 1024
+    # How long a stored payload outlives its dispatch, so a rescheduled run can
+    # still load it.
+    trigger_payload_retention_hours: int = 72
+
+    # Deploy new workflows on the async master flow (execute_automation_flow_async),
+    # which runs Gmail calls, event publishing and the audit write on one event
+    # loop. Existing deployments keep the entrypoint they were created with.
+    async_master_flow: bool = False
+
+    # Users whose Gmail client (credentials + built service) a worker process
+    # keeps cached between action tasks (orchestration/tasks/gmail_client.py).
+    # Entries are also dropped once the access token expires.
+    gmail_client_cache_size: int = 128
+
+    # Messages fetched per Gmail batch request during a history sync
+    # (core/processors/gmail_history_processor.py). Gmail accepts up to 100 per
+    # batch but starts rate-limiting items well before that.
+    gmail_batch_size: int = 50
+    # Messages matched and triggered at once per history sync. Each holds a DB
+    # session while it runs, so keep this well under the pool size.
+    gmail_sync_concurrency: int = 4
+
+    # Inline fast path (orchestration/services/inline_execution_service.py):
+    # workflows with at most this many nodes run directly in the API process
+    # instead of through a Prefect deployment. 0 leaves it to workflows that
+    # opt in with execution_mode="inline".
+    inline_execution_max_nodes: int = 0
+    # Inline runs allowed at once per API process; beyond that runs go to Prefect.
+    inline_execution_concurrency: int = 8
+
+    # Executor limits on a run's concurrently running actions
+    # (orchestration/engine/concurrency.py). Keys are action types or the
+    # resource groups "gmail" (send/reply/label) and "llm" (smart_draft).
+    action_concurrency_limits: dict[str, int] = {"gmail": 4, "llm": 2}
+    # Cap on all of the run's user's concurrent actions; 0 disables it.
+    user_action_concurrency_limit: int = 8
+
     azure_endpoint: str
     azure_model: str
     azure_api_key: str
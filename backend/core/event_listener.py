@@ -3,7 +3,9 @@
 Runs inside the FastAPI process. A daemon thread holds a dedicated autocommit
 connection and ``LISTEN``s on the ``wf_events`` channel; each notification is
 parsed and forwarded to the right user's WebSocket via the in-memory manager.
-The worker process publishes the events (see ``core/events.py``).
+The worker process publishes the events (see ``core/events.py``). Other
+packages can consume event types that aren't meant for a socket by registering
+a handler with ``add_handler`` at startup.
 
 psycopg2 is sync, so the listen loop lives in a thread and hands work back to the
 API event loop with ``asyncio.run_coroutine_threadsafe``.
@@ -13,12 +15,13 @@ import asyncio
 import json
 import select
 import threading
+from typing import Any, Callable, Dict
 
 import psycopg2
 import psycopg2.extensions
 
 from core.database import engine
-from core.events import CHANNEL
+from core.events import CHANNEL, unpack_events
 from core.setup_logging import setup_logger
 from core.websocket_manager import manager
 
@@ -27,12 +30,21 @@ logger = setup_logger("Event Listener")
 _SELECT_TIMEOUT = 5  # seconds — bounds shutdown latency
 _RECONNECT_BACKOFF = 2  # seconds
 
+EventHandler = Callable[[Dict[str, Any]], None]
+
 
 class EventListener:
     def __init__(self) -> None:
         self._loop: asyncio.AbstractEventLoop | None = None
         self._thread: threading.Thread | None = None
         self._stop = threading.Event()
+        self._handlers: Dict[str, EventHandler] = {}
+
+    def add_handler(self, event_type: str, handler: EventHandler) -> None:
+        """Consume ``event_type`` events with ``handler`` instead of forwarding
+        them. It runs on the listener thread, so it must be quick and
+        thread-safe."""
+        self._handlers[event_type] = handler
 
     def start(self, loop: asyncio.AbstractEventLoop) -> None:
         self._loop = loop
@@ -88,13 +100,25 @@ class EventListener:
             logger.error(f"Discarding malformed event payload: {raw!r}")
             return
 
-        user_id = payload.get("user_id")
-        if not user_id or self._loop is None:
+        if self._loop is None or not isinstance(payload, dict):
             return
 
-        asyncio.run_coroutine_threadsafe(
-            manager.broadcast_to_user(user_id, payload), self._loop
-        )
+        # The worker batches a wave's events into one NOTIFY (core/events.py).
+        for event in unpack_events(payload):
+            event_type = event.get("type")
+            handler = self._handlers.get(event_type) if event_type else None
+            if handler is not None:
+                try:
+                    handler(event)
+                except Exception as e:
+                    logger.error(f"Handler for {event_type!r} failed: {e}")
+                continue
+            user_id = event.get("user_id")
+            if not user_id:
+                continue
+            asyncio.run_coroutine_threadsafe(
+                manager.broadcast_to_user(user_id, event), self._loop
+            )
 
 
 listener = EventListener()
@@ -4,9 +4,15 @@ The Prefect worker runs in a separate process from the FastAPI app that owns the
 in-memory WebSocket manager, so it cannot push to sockets directly. Instead it
 emits events on the ``wf_events`` Postgres channel; the API process listens (see
 ``core/event_listener.py``) and forwards them to the right user's WebSocket.
+
+A workflow run emits several events per node, so the master flow collects them
+in an ``EventBuffer`` and flushes once per scheduling wave: every buffered event
+goes out in one transaction, packed into as few NOTIFYs as the payload limit
+allows.
 """
 
 import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from sqlalchemy import text
 
@@ -19,25 +25,126 @@ logger = setup_logger("Event Publisher")
 # the whole JSON document stays comfortably under the limit.
 CHANNEL = "wf_events"
 _MAX_ERROR_LEN = 500
+# Payloads must be *shorter* than 8000 bytes.
+MAX_NOTIFY_BYTES = 7999
 
+# A NOTIFY carrying several events wraps them as {"events": [...]}; the
+# listener unpacks it. A lone event is still sent bare.
+BATCH_KEY = "events"
+_BATCH_PREFIX = '{"' + BATCH_KEY + '": ['
+_BATCH_SUFFIX = "]}"
+
+
+def _encode_event(payload: Dict[str, Any]) -> str:
+    if payload.get("error"):
+        payload = {**payload, "error": str(payload["error"])[:_MAX_ERROR_LEN]}
+    return json.dumps(payload)
+
+
+def pack_events(payloads: List[Dict[str, Any]]) -> List[str]:
+    """Pack events, in order, into as few NOTIFY messages as fit the size limit.
+
+    An event that can't fit a NOTIFY even on its own is dropped with an error
+    log rather than failing the rest of the batch.
+    """
+    messages: List[str] = []
+    chunk: List[str] = []
+    chunk_bytes = 0
+
+    def close_chunk() -> None:
+        if len(chunk) == 1:
+            messages.append(chunk[0])
+        elif chunk:
+            messages.append(_BATCH_PREFIX + ", ".join(chunk) + _BATCH_SUFFIX)
+
+    overhead = len(_BATCH_PREFIX) + len(_BATCH_SUFFIX)
+    for payload in payloads:
+        encoded = _encode_event(payload)
+        size = len(encoded.encode())
+        if size > MAX_NOTIFY_BYTES:
+            logger.error(
+                f"Dropping workflow event {payload.get('type')}: "
+                f"{size} bytes exceeds the NOTIFY limit"
+            )
+            continue
+
+        # Bytes this chunk would need as a batch with the new event added
+        # (", " separators between events).
+        needed = overhead + chunk_bytes + 2 * len(chunk) + size
+        if chunk and needed > MAX_NOTIFY_BYTES:
+            close_chunk()
+            chunk, chunk_bytes = [], 0
+        chunk.append(encoded)
+        chunk_bytes += size
+
+    close_chunk()
+    return messages
+
+
+def unpack_events(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse of ``pack_events`` for one decoded NOTIFY payload."""
+    events = payload.get(BATCH_KEY)
+    if isinstance(events, list):
+        return [event for event in events if isinstance(event, dict)]
+    return [payload]
 
-async def publish_event(payload: dict) -> None:
-    """Emit a workflow event on the ``wf_events`` channel.
+
+async def publish_events(payloads: List[Dict[str, Any]]) -> None:
+    """Emit events on the ``wf_events`` channel in a single transaction.
 
     Best-effort: a publish failure is logged but never propagated, so a broken
     notification can't fail a workflow run.
     """
+    if not payloads:
+        return
     try:
-        if payload.get("error"):
-            payload = {**payload, "error": str(payload["error"])[:_MAX_ERROR_LEN]}
-
-        message = json.dumps(payload)
-        # pg_notify only delivers on COMMIT, so commit immediately.
+        messages = pack_events(payloads)
+        # pg_notify only delivers on COMMIT, so commit once after queueing them all.
         async with db_session() as db:
-            await db.execute(
-                text("SELECT pg_notify(:channel, :payload)"),
-                {"channel": CHANNEL, "payload": message},
-            )
+            for message in messages:
+                await db.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CHANNEL, "payload": message},
+                )
             await db.commit()
     except Exception as e:
-        logger.error(f"Failed to publish workflow event {payload.get('type')}: {e}")
+        types = ", ".join(sorted({str(p.get("type")) for p in payloads}))
+        logger.error(f"Failed to publish {len(payloads)} workflow event(s) ({types}): {e}")
+
+
+async def publish_event(payload: dict) -> None:
+    """Emit a single workflow event on the ``wf_events`` channel (best-effort)."""
+    await publish_events([payload])
+
+
+class EventBuffer:
+    """Collects a run's events so they can be published in one round trip.
+
+    ``add`` never blocks; ``flush`` publishes everything collected so far, in
+    order. The master flow flushes at the end of each scheduling wave and after
+    ``flow_finished``. ``publish`` replaces the NOTIFY sink (dry runs collect
+    events in memory instead).
+    """
+
+    def __init__(
+        self,
+        publish: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+    ) -> None:
+        self._pending: List[Dict[str, Any]] = []
+        self._publish = publish
+
+    def add(self, payload: Dict[str, Any]) -> None:
+        self._pending.append(payload)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def discard(self) -> None:
+        """Drop everything collected so far without publishing it."""
+        self._pending = []
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        await (self._publish or publish_events)(batch)
@@ -0,0 +1,104 @@
+"""Index of a user's ``email_received`` triggers, for matching incoming mail.
+
+The history sync used to loop over every active workflow and start node for
+each message, lowercasing and ``parseaddr``-ing the trigger config every time.
+The index is built once per sync: sender-restricted triggers are looked up by
+exact address, subject-restricted ones come out of one Aho-Corasick pass over
+the subject, and unrestricted ones are a plain list. Matching a message no
+longer depends on how many workflows the user has.
+"""
+
+from email.utils import parseaddr
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.substring_matcher import SubstringMatcher
+
+
+class _TriggerEntry:
+    """One email trigger of one workflow, with its criteria normalized."""
+
+    __slots__ = ("node_id", "position", "subject", "workflow_index")
+
+    def __init__(
+        self, workflow_index: int, position: int, node_id: str, subject: Optional[str]
+    ):
+        self.workflow_index = workflow_index
+        # Order among the workflow's start nodes: the first matching one wins.
+        self.position = position
+        self.node_id = node_id
+        self.subject = subject
+
+
+def _trigger_address(from_email: Optional[str]) -> Optional[str]:
+    trigger_from = (from_email or "").strip().lower()
+    if not trigger_from:
+        return None
+    # parseaddr pulls the bare address out of a "Name <addr>" config value.
+    _, trigger_addr = parseaddr(trigger_from)
+    return trigger_addr or trigger_from
+
+
+class EmailTriggerIndex:
+    """The ``email_received`` triggers of ``workflows`` ((workflow, config) pairs)."""
+
+    def __init__(self, workflows: Sequence[Tuple[Any, Any]]):
+        self.workflows = workflows
+        self._by_sender: Dict[str, List[_TriggerEntry]] = {}
+        self._by_subject: Dict[str, List[_TriggerEntry]] = {}
+        self._catch_all: List[_TriggerEntry] = []
+
+        for workflow_index, (_, workflow_config) in enumerate(workflows):
+            nodes = workflow_config.nodes
+            for position, node_id in enumerate(workflow_config.start_node_ids):
+                node = nodes.get(node_id)
+                if (
+                    not node
+                    or node.type != "trigger"
+                    or node.config.type != "email_received"
+                ):
+                    continue
+                config = node.config.config
+                subject = (config.subject_contains or "").strip().lower() or None
+                entry = _TriggerEntry(workflow_index, position, node_id, subject)
+
+                address = _trigger_address(config.from_email)
+                if address is not None:
+                    # Exact address match, never a substring — a from_email of
+                    # "o.com" must not match almost everything.
+                    self._by_sender.setdefault(address, []).append(entry)
+                elif subject is not None:
+                    self._by_subject.setdefault(subject, []).append(entry)
+                else:
+                    self._catch_all.append(entry)
+
+        subjects = {
+            entry.subject
+            for entries in self._by_sender.values()
+            for entry in entries
+            if entry.subject
+        }
+        subjects.update(self._by_subject)
+        self._subjects = SubstringMatcher(subjects)
+
+    def match(self, sender: str, subject: str) -> List[Tuple[Any, str]]:
+        """(workflow, matched trigger node id) for every workflow ``sender`` /
+        ``subject`` triggers, in the order the workflows were given."""
+        _, sender_addr = parseaddr(sender.lower())
+        found = self._subjects.find(subject.lower()) if self._subjects else set()
+
+        candidates: List[_TriggerEntry] = list(self._catch_all)
+        for pattern in found:
+            candidates.extend(self._by_subject.get(pattern, ()))
+        for entry in self._by_sender.get(sender_addr, ()):
+            if entry.subject is None or entry.subject in found:
+                candidates.append(entry)
+
+        # Per workflow, the first matching start node.
+        best: Dict[int, _TriggerEntry] = {}
+        for entry in candidates:
+            current = best.get(entry.workflow_index)
+            if current is None or entry.position < current.position:
+                best[entry.workflow_index] = entry
+        return [
+            (self.workflows[index][0], best[index].node_id) for index in sorted(best)
+        ]
@@ -1,25 +1,31 @@
 import asyncio
 import base64
 from email.message import Message
-from email.utils import parseaddr
-from typing import Any
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from sqlalchemy.exc import IntegrityError
 
+from core.config_loader import settings
 from core.database import db_session
+from core.processors.email_trigger_index import EmailTriggerIndex
 from core.setup_logging import setup_logger
 from gmail.schemas.message import GmailMessage, GmailMessagePart
 from orchestration.services.deployment_service import DeploymentService
 from processed_messages.services import ProcessedMessageService
-from workflow.schemas import WorkflowExecutionConfig
+from utils import gmail_api
+from workflow.services.workflow_config_cache import get_workflow_config
 from workflow.services.workflow_service import WorkflowService
 
 
+# Headers trigger matching and the trigger context need; the first fetch of a
+# message asks for only these (format=metadata), not the whole MIME tree.
+METADATA_HEADERS = ["From", "Subject", "Message-ID", "References"]
+
+
 class DeploymentTriggerError(Exception):
-    """Raised when one or more deployment triggers failed during a sync pass.
+    """Raised when one or more deployment triggers failed during a sync pass,
+    or the triggered messages couldn't be recorded as processed.
 
     Propagated out of ``fetch_and_process`` so the drain loop in
     ``GmailService.handle_gmail_update`` withholds the baseline advance and the
@@ -37,13 +43,22 @@ class GmailHistoryProcessor:
         self.creds = creds
         self.user_id = user_id
         self.service: Any = None
+        # message id → raw message (or its 404) fetched by the current batch.
+        self._prefetched: Dict[str, Any] = {}
+        # Email triggers of the active workflows, built once per sync.
+        self._trigger_index: Optional[EmailTriggerIndex] = None
+        # message id → ids of the workflows it was already processed for,
+        # looked up for a whole batch at once.
+        self._processed: Dict[str, Set[UUID]] = {}
+        # Triggered (message id, workflow id) pairs not yet recorded.
+        self._unmarked: List[Tuple[str, UUID]] = []
 
     async def __aenter__(self):
-        # Discovery build does I/O and googleapiclient is synchronous — keep it
+        # The process's first build parses the discovery document — keep it
         # off the event loop, which this processor shares with the API process
         # when it runs as a webhook BackgroundTask.
         self.service = await asyncio.to_thread(
-            build, "gmail", "v1", credentials=self.creds
+            gmail_api.build_gmail_service, self.creds
         )
         self.logger = setup_logger("Gmail History Processor")
         return self
@@ -53,46 +68,115 @@ class GmailHistoryProcessor:
             self.service.close()
 
     async def fetch_and_process(self, start_history_id: str) -> None:
-        unique_message_ids: set[str] = set()
-        page_token = None
+        """
+        Trigger the workflows matching every message added since
+        ``start_history_id``.
 
+        A pipeline: history pages stream new message ids into batches, one
+        fetcher pulls each batch from Gmail in a single batch request, and up
+        to ``gmail_sync_concurrency`` workers match and trigger the fetched
+        messages while the next page / batch is still in flight.
+        """
         # Batch-level flag set by _process_single_message when a deployment
         # trigger fails. A failed trigger must not advance the sync baseline, so
-        # we raise after the loop to force the drain loop to retry next pass.
+        # we raise once the pipeline has drained to force the drain loop to
+        # retry next pass.
         self._trigger_failed = False
 
-        # history.list is paged; loop until there is no nextPageToken so messages
-        # beyond the first page (busy mailbox / after downtime) aren't dropped.
-        while True:
-            history_response = await asyncio.to_thread(
-                self.service.users()
-                .history()
-                .list(
-                    userId="me",
-                    startHistoryId=start_history_id,
-                    pageToken=page_token,
-                )
-                .execute
-            )
-            self._collect_message_ids(history_response, unique_message_ids)
-
-            page_token = history_response.get("nextPageToken")
-            if not page_token:
-                break
-
+        worker_count = max(settings.gmail_sync_concurrency, 1)
+        batch_size = max(settings.gmail_batch_size, 1)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=2)
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=batch_size)
+        # Loaded once, before the first message reaches a worker, and shared by
+        # all of them; an empty history never touches the DB.
         active_workflows = None
-        if unique_message_ids:
-            async with db_session() as db:
-                active_workflows = await self._load_active_workflows(db)
 
-        for message_id in unique_message_ids:
-            await self._process_single_message(message_id, active_workflows)
+        async def read_history() -> None:
+            seen: set[str] = set()
+            pending: List[str] = []
+            page_token = None
+            # history.list is paged; loop until there is no nextPageToken so
+            # messages beyond the first page (busy mailbox / after downtime)
+            # aren't dropped.
+            while True:
+                history_response = await self._gmail(
+                    self.service.users()
+                    .history()
+                    .list(
+                        userId="me",
+                        startHistoryId=start_history_id,
+                        pageToken=page_token,
+                    )
+                )
+                page_ids: set[str] = set()
+                self._collect_message_ids(history_response, page_ids)
+                for message_id in page_ids - seen:
+                    seen.add(message_id)
+                    pending.append(message_id)
+                    if len(pending) == batch_size:
+                        await batches.put(pending)
+                        pending = []
+
+                page_token = history_response.get("nextPageToken")
+                if not page_token:
+                    break
+            if pending:
+                await batches.put(pending)
+            await batches.put(None)
+
+        async def fetch_batches() -> None:
+            nonlocal active_workflows
+            while (batch := await batches.get()) is not None:
+                if active_workflows is None:
+                    async with db_session() as db:
+                        active_workflows = await self._load_active_workflows(db)
+                await self._prefetch_messages(batch)
+                await self._load_processed(batch, active_workflows)
+                for message_id in batch:
+                    await fetched.put(message_id)
+            for _ in range(worker_count):
+                await fetched.put(None)
+
+        async def process_messages() -> None:
+            while (message_id := await fetched.get()) is not None:
+                await self._process_single_message(message_id, active_workflows)
+                if len(self._unmarked) >= batch_size:
+                    await self._flush_processed()
+
+        stages = [
+            asyncio.create_task(read_history()),
+            asyncio.create_task(fetch_batches()),
+            *(asyncio.create_task(process_messages()) for _ in range(worker_count)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            # A failed history page (e.g. the stale-startHistoryId 404 the
+            # drain loop handles) stops the whole pipeline and propagates as is.
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        finally:
+            # Whatever was triggered is recorded, even when the pipeline failed,
+            # so the retry doesn't run those workflows again.
+            await self._flush_processed()
 
         if self._trigger_failed:
             raise DeploymentTriggerError(
-                "One or more deployment triggers failed; baseline withheld for retry."
+                "Deployment triggers failed or went unrecorded; baseline withheld for retry."
             )
 
+    @staticmethod
+    async def _gmail(request):
+        """Execute a googleapiclient request off the event loop.
+
+        The pipeline's stages run requests from several threads at once, and
+        the service's httplib2 connection isn't thread-safe: each thread uses
+        its own transport.
+        """
+        return await asyncio.to_thread(gmail_api.execute, request)
+
     def _collect_message_ids(self, history_response, sink: set[str]) -> None:
         for history_record in history_response.get("history", []):
             if "messagesAdded" not in history_record:
@@ -102,6 +186,100 @@ class GmailHistoryProcessor:
                 message_id = message_item["message"]["id"]
                 sink.add(message_id)
 
+    async def _prefetch_messages(self, message_ids: List[str]) -> None:
+        """Fetch ``message_ids`` in one Gmail batch request instead of one HTTPS
+        round trip each.
+
+        Results land in ``self._prefetched`` for ``_process_single_message``. A
+        404 is kept so that message is skipped as before; any other per-item
+        error (e.g. a rate-limited item) is left out and the message falls back
+        to its own request.
+        """
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                self._prefetched[request_id] = response
+            elif isinstance(exception, HttpError) and exception.resp.status == 404:
+                self._prefetched[request_id] = exception
+
+        batch = self.service.new_batch_http_request(callback=on_response)
+        request = None
+        for message_id in message_ids:
+            request = self._metadata_request(message_id)
+            batch.add(request, request_id=message_id)
+        try:
+            await asyncio.to_thread(
+                gmail_api.execute_batch, batch, getattr(request, "http", None)
+            )
+        except Exception as e:
+            # Whatever didn't come back is fetched message by message.
+            self.logger.warning(f"Gmail batch fetch failed, fetching singly: {e}")
+
+    async def _load_processed(self, message_ids: List[str], workflows) -> None:
+        """Look up which of the active workflows each message in the batch was
+        already processed for, in one query for the whole batch."""
+        if not workflows:
+            return
+        try:
+            async with db_session() as db:
+                pairs = await ProcessedMessageService.get_processed_pairs(
+                    db, message_ids, [workflow.id for workflow, _ in workflows]
+                )
+        except Exception as e:
+            # Each message then looks itself up when it matches a workflow.
+            self.logger.warning(f"Batch processed-message lookup failed: {e}")
+            return
+        processed: Dict[str, Set[UUID]] = {message_id: set() for message_id in message_ids}
+        for message_id, workflow_id in pairs:
+            if message_id in processed:
+                processed[message_id].add(workflow_id)
+        self._processed.update(processed)
+
+    async def _flush_processed(self) -> None:
+        """Record the triggered (message, workflow) pairs in one INSERT."""
+        pairs, self._unmarked = self._unmarked, []
+        if not pairs:
+            return
+        try:
+            async with db_session() as db:
+                inserted = await ProcessedMessageService.create_many(db, pairs)
+        except Exception as e:
+            # Withhold the baseline, as for a failed trigger: the sync must not
+            # move past messages whose handling wasn't recorded.
+            self.logger.error(f"Failed to record {len(pairs)} processed messages: {e}")
+            self._trigger_failed = True
+            return
+        if len(inserted) < len(pairs):
+            # ON CONFLICT skipped them: a concurrent sync or a re-drain raced
+            # us and already recorded these, so they count as handled.
+            self.logger.info(
+                f"{len(pairs) - len(inserted)} processed messages were already recorded"
+            )
+
+    def _metadata_request(self, message_id: str):
+        return (
+            self.service.users()
+            .messages()
+            .get(
+                userId="me",
+                id=message_id,
+                format="metadata",
+                metadataHeaders=METADATA_HEADERS,
+            )
+        )
+
+    async def _fetch_body(self, message_id: str, snippet: str) -> str:
+        """Download the full message and extract its plain-text body.
+
+        Only done once a workflow is about to be triggered with the message;
+        falls back to the snippet when there is no text/plain part.
+        """
+        raw_message = await self._gmail(
+            self.service.users().messages().get(userId="me", id=message_id)
+        )
+        payload = GmailMessagePart.model_validate(raw_message["payload"])
+        return self._get_email_body(payload) or snippet
+
     async def _load_active_workflows(self, db):
         workflows = await WorkflowService.get_by_user_id(db, self.user_id)
         active = []
@@ -109,17 +287,31 @@ class GmailHistoryProcessor:
             if not workflow.is_active:
                 continue
 
-            workflow_config = WorkflowExecutionConfig.model_validate(workflow.config)
+            # Validated when saved; cached per workflow version.
+            workflow_config = get_workflow_config(workflow)
             active.append((workflow, workflow_config))
 
         return active
 
+    def _trigger_index_for(self, workflows) -> EmailTriggerIndex:
+        # fetch_and_process loads the workflows once and passes the same list
+        # for every message, so the index is only rebuilt when it changes.
+        index = self._trigger_index
+        if index is None or index.workflows is not workflows:
+            index = self._trigger_index = EmailTriggerIndex(workflows)
+        return index
+
     async def _process_single_message(self, message_id: str, active_workflows=None):
+        processed = self._processed.pop(message_id, None)
         try:
-            raw_message = await asyncio.to_thread(
-                self.service.users().messages().get(userId="me", id=message_id).execute
-            )
-
+            raw_message = self._prefetched.pop(message_id, None)
+            if isinstance(raw_message, HttpError):
+                raise raw_message
+            if raw_message is None:
+                raw_message = await self._gmail(self._metadata_request(message_id))
+
+            # Headers and labels only: matching runs on these, and the body is
+            # downloaded later, only for a message some workflow will run on.
             message = GmailMessage.model_validate(raw_message)
 
             labels = message.label_ids
@@ -129,7 +321,6 @@ class GmailHistoryProcessor:
 
             payload = message.payload
             headers = payload.headers
-            email_body = self._get_email_body(payload)
 
             email_data = {
                 "message_id": message_id,
@@ -147,100 +338,60 @@ class GmailHistoryProcessor:
                 "references": next(
                     (h.value for h in headers if h.name.lower() == "references"), ""
                 ),
-                "body": email_body or message.snippet,
             }
 
-            email_from = email_data["from"].lower()
-            email_subject = email_data["subject"].lower()
-
-            async with db_session() as db:
-                workflows = active_workflows
-                if workflows is None:
+            workflows = active_workflows
+            if workflows is None:
+                async with db_session() as db:
                     workflows = await self._load_active_workflows(db)
 
-                for workflow, workflow_config in workflows:
-                    start_node_ids = workflow_config.start_node_ids
-                    nodes = workflow_config.nodes
-
-                    matched_trigger_node_id = None
-
-                    for node_id in start_node_ids:
-                        node = nodes.get(node_id)
-                        if not node:
-                            continue
-
-                        node_type = node.type
-                        node_config = node.config
-
-                        if (
-                            node_type == "trigger"
-                            and node_config.type == "email_received"
-                        ):
-                            trigger_from = (
-                                (node_config.config.from_email or "").strip().lower()
-                            )
-                            if trigger_from:
-                                # Match the sender's address exactly, not as a
-                                # substring — otherwise a from_email of "o.com"
-                                # matches almost anything. parseaddr pulls the
-                                # bare address out of a "Name <addr>" header.
-                                _, sender_addr = parseaddr(email_from)
-                                _, trigger_addr = parseaddr(trigger_from)
-                                trigger_addr = trigger_addr or trigger_from
-                                if sender_addr != trigger_addr:
-                                    continue
-
-                            trigger_subject = (
-                                (node_config.config.subject_contains or "")
-                                .strip()
-                                .lower()
-                            )
-                            if trigger_subject and trigger_subject not in email_subject:
-                                continue
-
-                            matched_trigger_node_id = node_id
-                            break
-
-                    if not matched_trigger_node_id:
-                        continue
-
-                    exists_processed_message = (
-                        await ProcessedMessageService.get_by_message_id_and_workflow_id(
-                            db, email_data["message_id"], workflow.id
-                        )
+            matches = self._trigger_index_for(workflows).match(
+                email_data["from"], email_data["subject"]
+            )
+            if not matches:
+                return
+
+            if processed is None:
+                # Not part of a prefetched batch: look this message up alone.
+                async with db_session() as db:
+                    pairs = await ProcessedMessageService.get_processed_pairs(
+                        db, [message_id], [workflow.id for workflow, _ in matches]
                     )
+                processed = {workflow_id for _, workflow_id in pairs}
+
+            for workflow, matched_trigger_node_id in matches:
+                if workflow.id in processed:
+                    continue
 
-                    if exists_processed_message:
-                        continue
+                if "body" not in email_data:
+                    email_data["body"] = await self._fetch_body(
+                        message_id, message.snippet
+                    )
 
-                    # We pass the context directly to the deployment run
-                    trigger_context = {
-                        "trigger_context": {
-                            "original_email": email_data,
-                            "matched_trigger_node_id": matched_trigger_node_id,
-                        }
+                # We pass the context directly to the deployment run
+                trigger_context = {
+                    "trigger_context": {
+                        "original_email": email_data,
+                        "matched_trigger_node_id": matched_trigger_node_id,
                     }
+                }
+
+                # Trigger first; only mark processed once the deployment is
+                # successfully scheduled. On failure, flag the batch and move
+                # on so the baseline is withheld and this message is retried.
+                try:
+                    await DeploymentService.run(
+                        workflow.id, trigger_context, workflow=workflow
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        f"Failed to trigger deployment for workflow {workflow.id}: {e}"
+                    )
+                    self._trigger_failed = True
+                    continue
 
-                    # Trigger first; only mark processed once the deployment is
-                    # successfully scheduled. On failure, flag the batch and move
-                    # on so the baseline is withheld and this message is retried.
-                    try:
-                        await DeploymentService.run(workflow.id, trigger_context)
-                    except Exception as e:
-                        self.logger.error(
-                            f"Failed to trigger deployment for workflow {workflow.id}: {e}"
-                        )
-                        self._trigger_failed = True
-                        continue
-
-                    try:
-                        await ProcessedMessageService.create(
-                            db, email_data["message_id"], workflow.id
-                        )
-                    except IntegrityError:
-                        # Concurrent insert or a re-drain raced us — the message is
-                        # already recorded for this workflow, so treat as handled.
-                        await db.rollback()
+                # Recorded in bulk by _flush_processed.
+                self._unmarked.append((message_id, workflow.id))
         except HttpError as e:
             if e.resp.status == 404:
                 self.logger.warning(
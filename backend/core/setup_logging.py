@@ -9,6 +9,10 @@ def setup_logger(project_name="my_project", log_file="debug.log"):
     """
     logger = logging.getLogger(project_name)
     logger.setLevel(logging.DEBUG)
+    # Called again for the same name (e.g. once per workflow run): reuse the
+    # handlers already attached instead of stacking another pair.
+    if logger.handlers:
+        return logger
 
     log_format = (
         "%(asctime)s | %(levelname)-8s | "
@@ -15,7 +15,7 @@ from gmail.services import GmailService
 from orchestration.services import DeploymentService
 from user.models.user import User
 from workflow.schemas import WorkflowExecutionConfig
-from workflow.services import WorkflowService
+from workflow.services import WorkflowService, get_workflow_config
 
 import base64
 import hmac
@@ -124,7 +124,7 @@ async def webhook_trigger(
     if not workflow or not workflow.is_active or not workflow.webhook_secret:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
 
-    config = WorkflowExecutionConfig.model_validate(workflow.config)
+    config = get_workflow_config(workflow)
     node_id = _find_webhook_trigger_node_id(config)
     if node_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
@@ -162,7 +162,9 @@ async def webhook_trigger(
         }
     }
 
-    background_tasks.add_task(DeploymentService.run, workflow.id, trigger_context)
+    background_tasks.add_task(
+        DeploymentService.run, workflow.id, trigger_context, workflow=workflow
+    )
 
     return {"status": "accepted"}
 
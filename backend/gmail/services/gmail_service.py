@@ -1,6 +1,5 @@
 import asyncio
 from datetime import datetime, timedelta, timezone
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
@@ -15,6 +14,7 @@ from core.database import db_session
 from core.processors import GmailHistoryProcessor
 from core.setup_logging import setup_logger
 from user.services.user_service import UserService
+from utils import gmail_api
 
 logger = setup_logger("Gmail Service")
 
@@ -48,10 +48,11 @@ class GmailService:
                 "labelFilterBehavior": "INCLUDE",
             }
 
-            # googleapiclient is synchronous: both the discovery build and the
+            # googleapiclient is synchronous: both the service build (which
+            # parses the discovery document on the process's first call) and the
             # HTTP round-trip would block the event loop for every other request
             # in this process, so hand them to a worker thread.
-            service = await asyncio.to_thread(build, "gmail", "v1", credentials=creds)
+            service = await asyncio.to_thread(gmail_api.build_gmail_service, creds)
             try:
                 watch_response = await asyncio.to_thread(
                     service.users().watch(userId="me", body=watch_request_body).execute
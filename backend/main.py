@@ -16,11 +16,16 @@ from core.setup_logging import setup_logger
 from scripts.register_renewal import (
     register_renewal_deployment,
     register_cleanup_deployment,
+    register_payload_cleanup_deployment,
 )
 from auth.routes import auth_router, connection_router
 from ai.routes.ai_router import ai_router
 from gmail.routes.webhook_router import webhook_router
 from workflow.routes.workflow_router import workflow_router
+from workflow.services.workflow_config_cache import (
+    WORKFLOW_CONFIG_CHANGED,
+    on_workflow_config_changed,
+)
 from user.routes import user_router
 
 # The models are imported as a top level to resolve some issues
@@ -36,6 +41,8 @@ logger = setup_logger("main")
 async def lifespan(app: FastAPI):
     # Start the Postgres LISTEN thread so worker-emitted node events reach
     # connected WebSockets. Pass the running loop for run_coroutine_threadsafe.
+    # Config-changed events evict this process's cached workflow models.
+    listener.add_handler(WORKFLOW_CONFIG_CHANGED, on_workflow_config_changed)
     listener.start(asyncio.get_running_loop())
 
     # Register the daily system-maintenance deployments. Best-effort: a Prefect
@@ -53,6 +60,12 @@ async def lifespan(app: FastAPI):
             logger.warning(
                 f"Expired-auth cleanup deployment not registered at startup: {e}"
             )
+        try:
+            await register_payload_cleanup_deployment()
+        except Exception as e:
+            logger.warning(
+                f"Trigger-payload cleanup deployment not registered at startup: {e}"
+            )
 
     try:
         yield
@@ -0,0 +1,38 @@
+from .concurrency import ActionLimiter
+from .execution_plan import (
+    ExecutionPlan,
+    PlannedNode,
+    clear_execution_plan_cache,
+    compile_execution_plan,
+    get_execution_plan,
+)
+from .output_references import OutputReferences, project, trim_output
+from .resume import ResumeError, build_resume_parameters
+from .scheduler import DagScheduler
+from .simulation import (
+    DryRunResult,
+    SimulatedActionError,
+    SimulationProfile,
+    StubAction,
+)
+from .timing import NodeTiming
+
+__all__ = [
+    "ActionLimiter",
+    "DagScheduler",
+    "DryRunResult",
+    "ExecutionPlan",
+    "NodeTiming",
+    "OutputReferences",
+    "PlannedNode",
+    "ResumeError",
+    "SimulatedActionError",
+    "SimulationProfile",
+    "StubAction",
+    "build_resume_parameters",
+    "clear_execution_plan_cache",
+    "compile_execution_plan",
+    "get_execution_plan",
+    "project",
+    "trim_output",
+]
@@ -0,0 +1,50 @@
+from typing import Dict, Iterable, Mapping, Tuple
+
+# The external quota each action type draws on. Limits can be set per action
+# type or per group, e.g. {"gmail": 4} caps every Gmail write together.
+ACTION_RESOURCES: Dict[str, Tuple[str, ...]] = {
+    "send_email": ("gmail",),
+    "reply_email": ("gmail",),
+    "label_email": ("gmail",),
+    "smart_draft": ("llm",),
+}
+
+
+class ActionLimiter:
+    """Admission control for the actions of one workflow run.
+
+    The executor only dispatches an action while its action type, each of its
+    resource groups, and the run's user are all under their limits; the rest
+    wait until a running action finishes. Bookkeeping only, no locks: the
+    executor loop is the single caller.
+    """
+
+    def __init__(self, limits: Mapping[str, int], per_user: int = 0):
+        for key, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"Concurrency limit for '{key}' must be at least 1.")
+        self._limits = dict(limits)
+        self._per_user = per_user
+        self._running: Dict[str, int] = {}
+        self._total = 0
+
+    def _keys(self, action_type: str) -> Iterable[str]:
+        yield action_type
+        yield from ACTION_RESOURCES.get(action_type, ())
+
+    def try_acquire(self, action_type: str) -> bool:
+        if self._per_user and self._total >= self._per_user:
+            return False
+        keys = [key for key in self._keys(action_type) if key in self._limits]
+        if any(self._running.get(key, 0) >= self._limits[key] for key in keys):
+            return False
+        for key in keys:
+            self._running[key] = self._running.get(key, 0) + 1
+        self._total += 1
+        return True
+
+    def release(self, action_type: str) -> None:
+        for key in self._keys(action_type):
+            if self._running.get(key):
+                self._running[key] -= 1
+        self._total = max(self._total - 1, 0)
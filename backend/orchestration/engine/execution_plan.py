@@ -0,0 +1,209 @@
+"""Compiled, process-cached execution plans for the master flow.
+
+Validating a ``WorkflowSchema`` runs the DAG validators (cycle check,
+reachability) and the executor then rebuilds the adjacency list — identical work
+for every run of the same workflow. ``get_execution_plan`` does it once per
+(workflow id, config digest) and keeps the result in an LRU cache for the
+lifetime of the worker process, so a warm run skips straight to execution.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, cast
+
+from pydantic import BaseModel
+
+from core.config_loader import settings
+from workflow.schemas import WorkflowSchema
+from workflow.schemas.edges import Edge
+from workflow.schemas.workflow_nodes import WorkflowNode
+from utils.evaluate_condition import Predicate, compile_condition
+from workflow.schemas.condition_nodes import IfCondition
+from utils.lru_cache import LRUCache
+from utils.resolve_variables import ResolutionMemo, resolve_variables
+
+from .output_references import OutputReferences, analyze_references
+
+# Actions that reply to / label / draft against the triggering email, and so
+# cannot run without an email trigger context.
+EMAIL_DEPENDENT_ACTIONS = frozenset({"reply_email", "label_email", "smart_draft"})
+
+
+class PlannedNode:
+    """A workflow node with everything the executor needs resolved up front."""
+
+    __slots__ = (
+        "action_type",
+        "config_model",
+        "evaluate",
+        "id",
+        "in_degree",
+        "kind",
+        "node",
+        "outgoing",
+        "requires_email",
+        "template_fields",
+    )
+
+    def __init__(self, node: WorkflowNode, outgoing: List[Edge], in_degree: int):
+        self.id = node.id
+        self.node = node
+        self.kind = node.type
+        self.outgoing = outgoing
+        self.in_degree = in_degree
+
+        # node.config is the Action/Condition/Trigger model; its own .config is
+        # the type-specific settings model (e.g. SendEmailConfig).
+        self.action_type: Optional[str] = (
+            node.config.type if node.type == "action" else None
+        )
+        self.config_model: Type[BaseModel] = type(node.config.config)
+        self.requires_email = self.action_type in EMAIL_DEPENDENT_ACTIONS
+        # Action nodes: the settings fields that contain {{variables}}. Only
+        # these are rendered per run; an action without any skips resolution.
+        self.template_fields: Tuple[str, ...] = (
+            _template_fields(node.config.config) if node.type == "action" else ()
+        )
+        # Condition nodes: rules compiled into a run_context → bool predicate.
+        self.evaluate: Optional[Predicate] = (
+            compile_condition(cast(IfCondition, node.config))
+            if node.type == "condition"
+            else None
+        )
+
+    def template_sources(self) -> Iterator[str]:
+        """Every template string in this node's config: the template fields of
+        an action, the rule variables of a condition."""
+        if self.kind == "condition":
+            for rule in cast(IfCondition, self.node.config).config.rules:
+                yield rule.variable
+            return
+        config = self.node.config.config
+        for name in self.template_fields:
+            yield from _strings(getattr(config, name))
+
+    def render_config(
+        self, context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+    ) -> BaseModel:
+        """The action's settings model with its template fields resolved.
+
+        A shallow copy with only the rendered fields re-validated, instead of
+        dumping and re-validating the whole model (EmailStr, colour clamping).
+        """
+        config = self.node.config.config
+        if not self.template_fields:
+            return config
+        rendered = config.model_copy()
+        validator = type(config).__pydantic_validator__
+        for name in self.template_fields:
+            validator.validate_assignment(
+                rendered, name, resolve_variables(getattr(config, name), context, memo)
+            )
+        return rendered
+
+
+def _contains_template(value: Any) -> bool:
+    if isinstance(value, str):
+        return "{{" in value
+    if isinstance(value, dict):
+        return any(_contains_template(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_template(v) for v in value)
+    return False
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _template_fields(config: BaseModel) -> Tuple[str, ...]:
+    return tuple(
+        name
+        for name in type(config).model_fields
+        if _contains_template(getattr(config, name))
+    )
+
+
+class ExecutionPlan:
+    """A validated workflow compiled into the shape the executor walks."""
+
+    def __init__(self, schema: WorkflowSchema):
+        self.schema = schema
+        self.workflow = schema.execution_config
+        # Built by the schema's graph validator in the same pass that checked
+        # for cycles and reachability.
+        self.adjacency = self.workflow.adjacency
+
+        in_degree: Dict[str, int] = dict.fromkeys(self.workflow.nodes, 0)
+        for edge in self.workflow.edges:
+            in_degree[edge.target] = in_degree.get(edge.target, 0) + 1
+
+        self.nodes: Dict[str, PlannedNode] = {
+            node_id: PlannedNode(
+                node, self.adjacency.get(node_id, []), in_degree.get(node_id, 0)
+            )
+            for node_id, node in self.workflow.nodes.items()
+        }
+        self.topological_order = self.workflow.topological_order
+        # Which fields of which outputs later nodes read, so the executor can
+        # prune the run context (orchestration/engine/output_references.py).
+        self.references: OutputReferences = analyze_references(
+            {
+                node_id: list(planned.template_sources())
+                for node_id, planned in self.nodes.items()
+            }
+        )
+
+    @property
+    def name(self) -> str:
+        return self.schema.name
+
+    @property
+    def start_node_ids(self) -> List[str]:
+        return self.workflow.start_node_ids
+
+
+def config_digest(workflow_data: Dict[str, Any]) -> str:
+    """Stable fingerprint of a workflow definition.
+
+    Part of the cache key so an edited workflow (new deployment parameters)
+    never reuses the plan compiled from its previous version.
+    """
+    canonical = json.dumps(workflow_data, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def compile_execution_plan(workflow_data: Dict[str, Any]) -> ExecutionPlan:
+    """Validate ``workflow_data`` and compile it. Raises on invalid input."""
+    return ExecutionPlan(WorkflowSchema.model_validate(workflow_data))
+
+
+_plan_cache: LRUCache[tuple, ExecutionPlan] = LRUCache(
+    settings.execution_plan_cache_size
+)
+
+
+def get_execution_plan(
+    workflow_data: Dict[str, Any], workflow_id: Optional[str] = None
+) -> ExecutionPlan:
+    """Return the compiled plan for ``workflow_data``, compiling on a cache miss.
+
+    Invalid workflows raise and are never cached.
+    """
+    key = (str(workflow_id) if workflow_id else None, config_digest(workflow_data))
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = compile_execution_plan(workflow_data)
+        _plan_cache.put(key, plan)
+    return plan
+
+
+def clear_execution_plan_cache() -> None:
+    _plan_cache.clear()
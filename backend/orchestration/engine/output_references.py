@@ -0,0 +1,108 @@
+"""Which parts of each node's output a workflow actually reads.
+
+Downstream nodes can only read an action's output through
+``{{node_outputs.<id>.<path>}}`` placeholders in their settings or condition
+rules, so the references are known as soon as the workflow is compiled. The
+executor uses them to keep just the referenced fields of an output in the run
+context, and to drop those once every node reading them has started; a large
+Gmail message resource or AI draft no longer lives for the whole run.
+
+The audit keeps its own copy of each output, with long strings trimmed
+(``trim_output``) except where a later node reads them, so a resumed run
+replays exactly the values it needs.
+"""
+
+from typing import Any, Dict, Iterable, Mapping, Sequence, Set, Tuple
+
+from utils.resolve_variables import variable_paths
+
+# A field path inside one node's output, e.g. ("payload", "subject").
+# The empty path means the whole output.
+OutputPath = Tuple[str, ...]
+
+NODE_OUTPUTS = "node_outputs"
+
+
+class OutputReferences:
+    """The ``{{node_outputs...}}`` reads of a compiled workflow."""
+
+    __slots__ = ("consumers", "inputs", "keep_all", "paths")
+
+    def __init__(self):
+        # producer id → the output paths that other nodes read.
+        self.paths: Dict[str, Set[OutputPath]] = {}
+        # producer id → the nodes reading its output.
+        self.consumers: Dict[str, Set[str]] = {}
+        # consumer id → the producers whose outputs it reads.
+        self.inputs: Dict[str, Set[str]] = {}
+        # A bare {{node_outputs}} reads everything, so nothing can be pruned.
+        self.keep_all = False
+
+    def add(self, consumer: str, path: Sequence[str]) -> None:
+        if not path or path[0] != NODE_OUTPUTS:
+            return  # Trigger payloads and other top-level keys aren't outputs.
+        if len(path) == 1:
+            self.keep_all = True
+            return
+        producer = path[1]
+        self.paths.setdefault(producer, set()).add(tuple(path[2:]))
+        self.consumers.setdefault(producer, set()).add(consumer)
+        self.inputs.setdefault(consumer, set()).add(producer)
+
+
+def analyze_references(templates: Mapping[str, Iterable[str]]) -> OutputReferences:
+    """Collect the output references of every node.
+
+    ``templates`` maps each node id to the template strings in its config
+    (action fields containing ``{{``, condition rule variables).
+    """
+    references = OutputReferences()
+    for node_id, sources in templates.items():
+        for source in sources:
+            for path in variable_paths(source):
+                references.add(node_id, path)
+    return references
+
+
+def _below(paths: Iterable[OutputPath], key: Any) -> list:
+    return [path[1:] for path in paths if path[0] == key]
+
+
+def project(value: Any, paths: Iterable[OutputPath]) -> Any:
+    """The parts of ``value`` that ``paths`` reach, dropping every other key.
+
+    Only dicts are narrowed; any other value a path goes through (attribute
+    lookups on objects) is kept whole.
+    """
+    paths = list(paths)
+    if () in paths or not isinstance(value, dict):
+        return value
+    projected = {}
+    for key in {path[0] for path in paths}:
+        if key in value:
+            projected[key] = project(value[key], _below(paths, key))
+    return projected
+
+
+def trim_output(value: Any, max_chars: int, keep: Iterable[OutputPath] = ()) -> Any:
+    """``value`` with strings longer than ``max_chars`` cut short, for the audit.
+
+    Paths in ``keep`` (the fields later nodes read) are left untouched.
+    ``max_chars`` of 0 or less disables trimming.
+    """
+    keep = list(keep)
+    if max_chars <= 0 or () in keep:
+        return value
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}… [{len(value) - max_chars} more characters]"
+    if isinstance(value, dict):
+        return {
+            key: trim_output(item, max_chars, _below(keep, key))
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        # Placeholders can't index into lists, so nothing below one is kept.
+        return [trim_output(item, max_chars) for item in value]
+    return value
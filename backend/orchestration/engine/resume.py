@@ -0,0 +1,105 @@
+"""Resuming a failed run from its persisted audit record.
+
+A resumed run starts from the same trigger with the nodes that succeeded last
+time pre-seeded: the executor replays their recorded outputs (a condition
+routes the way it did, an action is not sent again) and only executes the
+nodes that failed and everything downstream of them that never ran.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+from .execution_plan import ExecutionPlan
+
+
+class ResumeError(Exception):
+    """The run can't be resumed (nothing failed, or the plan no longer fits)."""
+
+
+def replayable_outputs(
+    plan: ExecutionPlan, node_results: Dict[str, Any]
+) -> Dict[str, Any]:
+    """The recorded outputs of the nodes that succeeded and still exist in ``plan``.
+
+    Triggers are never replayed: they have no output and always pass through.
+    """
+    outputs: Dict[str, Any] = {}
+    for node_id, entry in (node_results or {}).items():
+        planned = plan.nodes.get(node_id)
+        if planned is None or planned.kind == "trigger":
+            continue
+        if isinstance(entry, dict) and entry.get("status") == "success":
+            outputs[node_id] = entry.get("output")
+    return outputs
+
+
+def failed_node_ids(node_results: Dict[str, Any]) -> List[str]:
+    return [
+        node_id
+        for node_id, entry in (node_results or {}).items()
+        if isinstance(entry, dict) and entry.get("status") == "failed"
+    ]
+
+
+def _reachable(plan: ExecutionPlan, start: str) -> Set[str]:
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for edge in plan.adjacency.get(queue.popleft(), []):
+            if edge.target not in seen:
+                seen.add(edge.target)
+                queue.append(edge.target)
+    return seen
+
+
+def matched_trigger_node_id(
+    plan: ExecutionPlan, node_results: Dict[str, Any]
+) -> Optional[str]:
+    """The start node the recorded run went through.
+
+    The audit doesn't store it, so it's the start node whose subgraph contains
+    the recorded nodes; for the usual single-trigger workflow that's simply the
+    only start node.
+    """
+    start_ids = [node_id for node_id in plan.start_node_ids if node_id in plan.nodes]
+    if len(start_ids) <= 1:
+        return start_ids[0] if start_ids else None
+
+    recorded = set(node_results or {})
+    best, best_hits = start_ids[0], -1
+    for start_id in start_ids:
+        hits = len(recorded & _reachable(plan, start_id))
+        if hits > best_hits:
+            best, best_hits = start_id, hits
+    return best
+
+
+def build_resume_parameters(
+    plan: ExecutionPlan,
+    node_results: Dict[str, Any],
+    trigger_data: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Deployment parameters that resume a recorded run of ``plan``.
+
+    Raises ResumeError when the record has no failed node to re-execute.
+    """
+    failed = [node_id for node_id in failed_node_ids(node_results) if node_id in plan.nodes]
+    if not failed:
+        raise ResumeError("Run has no failed nodes to resume.")
+
+    trigger_id = matched_trigger_node_id(plan, node_results)
+    if trigger_id is None:
+        raise ResumeError("Workflow has no start node.")
+
+    # Rebuild the trigger context the original run received, keyed the way the
+    # matched trigger type delivers it.
+    trigger_context: Dict[str, Any] = {"matched_trigger_node_id": trigger_id}
+    if trigger_data:
+        trigger_type = plan.nodes[trigger_id].node.config.type
+        key = "webhook_payload" if trigger_type == "webhook" else "original_email"
+        trigger_context[key] = trigger_data
+
+    return {
+        "trigger_context": trigger_context,
+        "resume_outputs": replayable_outputs(plan, node_results),
+    }
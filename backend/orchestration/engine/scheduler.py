@@ -0,0 +1,95 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+
+from .execution_plan import ExecutionPlan
+
+
+class DagScheduler:
+    """Dependency-driven ready queue for one workflow run.
+
+    A node becomes ready the moment every one of its predecessors has settled
+    (completed, failed or been skipped), and runs if at least one incoming edge
+    was actually taken. Waiting on *all* parents gives join nodes a complete
+    view of their upstream outputs; requiring only *one* taken edge keeps the
+    existing "any parent routes here" semantics (e.g. the diamond DAG).
+
+    A node whose incoming edges were all left untaken — the other side of a
+    condition, or children of a failed node — is skipped, and the skip cascades
+    so downstream joins never wait on a branch that will not run.
+    """
+
+    def __init__(self, plan: ExecutionPlan, start_node_id: str):
+        self._plan = plan
+        self._remaining: Dict[str, int] = {
+            node_id: planned.in_degree for node_id, planned in plan.nodes.items()
+        }
+        self._activated: Set[str] = set()
+        self._dispatched: Set[str] = {start_node_id}
+        self._ready: Deque[str] = deque([start_node_id])
+
+        # Wall-clock timings for the run audit: when a node's first incoming
+        # edge was taken, and when its last predecessor settled.
+        now = time.time()
+        self.activated_at: Dict[str, float] = {start_node_id: now}
+        self.ready_at: Dict[str, float] = {start_node_id: now}
+
+        # Only one trigger fires per run. The others settle immediately as
+        # skipped so nodes joining several trigger paths don't wait on them.
+        for node_id in plan.start_node_ids:
+            if node_id != start_node_id:
+                self.skip(node_id)
+
+    def has_ready(self) -> bool:
+        return bool(self._ready)
+
+    def pop_ready(self) -> str:
+        return self._ready.popleft()
+
+    def complete(self, node_id: str, handle: Optional[str] = None) -> int:
+        """Settle ``node_id`` as finished and take its outgoing edges.
+
+        With ``handle`` set (condition nodes), only edges leaving through that
+        ``sourceHandle`` are taken. Returns the number of edges taken.
+        """
+        taken = 0
+        for edge in self._outgoing(node_id):
+            if handle is None or edge.sourceHandle == handle:
+                self._activated.add(edge.target)
+                self.activated_at.setdefault(edge.target, time.time())
+                taken += 1
+        self._settle_children(node_id)
+        return taken
+
+    def fail(self, node_id: str) -> None:
+        """Settle ``node_id`` as failed: none of its outgoing edges are taken."""
+        self._settle_children(node_id)
+
+    def skip(self, node_id: str) -> None:
+        """Settle a node that will not run in this run."""
+        self._dispatched.add(node_id)
+        self._settle_children(node_id)
+
+    def _outgoing(self, node_id: str):
+        planned = self._plan.nodes.get(node_id)
+        return planned.outgoing if planned else []
+
+    def _settle_children(self, node_id: str) -> None:
+        # Iterative so a long skipped chain can't hit the recursion limit.
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            for edge in self._outgoing(current):
+                target = edge.target
+                if target not in self._remaining:
+                    continue
+                self._remaining[target] -= 1
+                if self._remaining[target] > 0 or target in self._dispatched:
+                    continue
+
+                self._dispatched.add(target)
+                if target in self._activated:
+                    self.ready_at[target] = time.time()
+                    self._ready.append(target)
+                else:
+                    stack.append(target)
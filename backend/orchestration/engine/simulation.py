@@ -0,0 +1,113 @@
+"""Stub actions for dry-running workflows (execute_workflow_dry_run).
+
+A dry run drives the real executor — variable resolution, condition routing,
+event emission and audit building — but dispatches every action to a
+``StubAction`` instead of Gmail / Azure, and never goes through Prefect. That
+isolates the engine's own scheduling overhead for benchmarks and load tests.
+"""
+
+import asyncio
+import random
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+LatencyDistribution = Literal["fixed", "uniform", "exponential"]
+
+
+class SimulatedActionError(Exception):
+    """The failure a stub action injects."""
+
+
+class StubAction:
+    """Stand-in for one action type with configurable latency and failures.
+
+    Latency is ``latency_ms`` exactly ("fixed"), ``latency_ms ± jitter_ms``
+    ("uniform") or exponentially distributed around a ``latency_ms`` mean
+    ("exponential"). Each call fails with probability ``failure_rate``.
+    ``result`` builds the node output from the call's node id and action type.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        *,
+        jitter_ms: float = 0.0,
+        distribution: LatencyDistribution = "fixed",
+        failure_rate: float = 0.0,
+        error: str = "Simulated action failure",
+        result: Optional[Callable[[str, str], Any]] = None,
+    ):
+        if latency_ms < 0 or jitter_ms < 0:
+            raise ValueError("Stub latency must not be negative.")
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("failure_rate must be between 0 and 1.")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.error = error
+        self.result = result
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Seconds to wait for one call."""
+        if self.distribution == "uniform":
+            ms = rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        elif self.distribution == "exponential" and self.latency_ms > 0:
+            ms = rng.expovariate(1 / self.latency_ms)
+        else:
+            ms = self.latency_ms
+        return max(ms, 0.0) / 1000
+
+    async def run(self, rng: random.Random, node_id: str, action_type: str) -> Any:
+        delay = self.sample_latency(rng)
+        # Decide before sleeping so the outcome doesn't depend on scheduling.
+        fails = rng.random() < self.failure_rate
+        if delay:
+            await asyncio.sleep(delay)
+        else:
+            # Still yield, like a real awaited call would.
+            await asyncio.sleep(0)
+        if fails:
+            raise SimulatedActionError(self.error)
+        if self.result is not None:
+            return self.result(node_id, action_type)
+        return {"id": f"dry-run-{node_id}", "action_type": action_type}
+
+
+class SimulationProfile:
+    """Which stub each action type dispatches to during a dry run.
+
+    Action types without an entry in ``stubs`` use ``default``. ``seed`` makes
+    latency and failure draws reproducible.
+    """
+
+    def __init__(
+        self,
+        stubs: Optional[Dict[str, StubAction]] = None,
+        default: Optional[StubAction] = None,
+        seed: Optional[int] = None,
+    ):
+        self.stubs = dict(stubs or {})
+        self.default = default or StubAction()
+        self.rng = random.Random(seed)
+
+    def stub_for(self, action_type: str) -> StubAction:
+        return self.stubs.get(action_type, self.default)
+
+    async def dispatch(self, node_id: str, action_type: str) -> Any:
+        return await self.stub_for(action_type).run(self.rng, node_id, action_type)
+
+
+class DryRunResult:
+    """What a dry run produced: the audit it would have persisted, and events."""
+
+    def __init__(
+        self,
+        status: str,
+        node_results: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        duration_ms: int,
+    ):
+        self.status = status
+        self.node_results = node_results
+        self.events = events
+        self.duration_ms = duration_ms
@@ -0,0 +1,75 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round(max(end - start, 0.0) * 1000, 3)
+
+
+class NodeTiming:
+    """Wall-clock timestamps for one node of a run.
+
+    ``activated_at`` is when the first incoming edge was taken and ``queued_at``
+    when the last predecessor settled, so the gap between them is the time the
+    node sat waiting on its dependency barrier (a join waiting on a slower
+    parent). ``queued_at`` → ``started_at`` is executor overhead, and for
+    actions ``resolve_ms`` splits variable resolution out of ``duration_ms``.
+    An action held back by a concurrency limit waits between ``resolved_at``
+    and ``dispatched_at``; that ``throttle_ms`` is not counted in
+    ``duration_ms``.
+    """
+
+    __slots__ = (
+        "action_type",
+        "activated_at",
+        "dispatched_at",
+        "finished_at",
+        "node_type",
+        "queued_at",
+        "resolved_at",
+        "started_at",
+    )
+
+    def __init__(
+        self,
+        node_type: str,
+        action_type: Optional[str] = None,
+        activated_at: Optional[float] = None,
+        queued_at: Optional[float] = None,
+    ):
+        self.node_type = node_type
+        self.action_type = action_type
+        self.started_at = time.time()
+        self.activated_at = activated_at
+        self.queued_at = queued_at or self.started_at
+        self.finished_at: Optional[float] = None
+        self.resolved_at: Optional[float] = None
+        self.dispatched_at: Optional[float] = None
+
+    def finish(self) -> None:
+        self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        throttle_ms = _ms(self.resolved_at, self.dispatched_at)
+        duration_ms = _ms(self.started_at, self.finished_at)
+        if duration_ms is not None and throttle_ms:
+            duration_ms = round(max(duration_ms - throttle_ms, 0.0), 3)
+        return {
+            "node_type": self.node_type,
+            "action_type": self.action_type,
+            "queued_at": _iso(self.queued_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "duration_ms": duration_ms,
+            "queue_ms": _ms(self.queued_at, self.started_at),
+            "barrier_wait_ms": _ms(self.activated_at, self.queued_at),
+            "resolve_ms": _ms(self.started_at, self.resolved_at),
+            "throttle_ms": throttle_ms,
+        }
@@ -1,3 +1,15 @@
-from .master_flow import execute_automation_flow
+from .master_flow import (
+    InlineFallback,
+    execute_automation_flow,
+    execute_automation_flow_async,
+    execute_workflow_dry_run,
+    execute_workflow_inline,
+)
 
-__all__ = ["execute_automation_flow"]
+__all__ = [
+    "InlineFallback",
+    "execute_automation_flow",
+    "execute_automation_flow_async",
+    "execute_workflow_dry_run",
+    "execute_workflow_inline",
+]
@@ -0,0 +1,27 @@
+# The models are imported at the top level to resolve SQLAlchemy mapper
+# string resolution and circular-import issues before any DB operation.
+import core.models  # noqa: F401
+
+from prefect import flow, get_run_logger
+
+from core.setup_logging import setup_logger
+from workflow.services import TriggerPayloadService
+
+
+@flow(name="Cleanup Expired Trigger Payloads", log_prints=True)
+async def cleanup_expired_trigger_payloads():
+    """Delete claim-checked trigger payloads past their retention.
+
+    A payload is only read when its run starts, so once `expires_at` has passed
+    no run can still need it. Runs daily rather than on every offload, so the
+    webhook and Gmail trigger paths never pay for the sweep.
+    """
+    # Prefect's run logger surfaces output in the run logs; fall back to the local
+    # logger when there is no Prefect run context (e.g. unit tests calling .fn).
+    try:
+        logger = get_run_logger()
+    except Exception:
+        logger = setup_logger("Cleanup Expired Trigger Payloads")
+
+    purged = await TriggerPayloadService.purge_expired()
+    logger.info(f"Purged {purged} expired trigger_payloads row(s)")
@@ -1,45 +1,475 @@
 import asyncio
 import time
 from collections import deque
-from uuid import UUID
+from uuid import UUID, uuid4
 from prefect import flow, get_run_logger
+from prefect.futures import as_completed
 from prefect.runtime import (
     deployment as prefect_deployment,
     flow_run as prefect_flow_run,
 )
-from typing import Dict, Any, Optional, cast
+from typing import Awaitable, Callable, Deque, Dict, Any, List, NamedTuple, Optional, cast
+from core.config_loader import settings
 from core.setup_logging import setup_logger
 from core.database import db_session
-from core.events import publish_event
-from orchestration.tasks import send_message, reply_email, label_mail, smart_draft
-from utils.build_adjacency_list import build_adjacency_list
-from utils.evaluate_condition import evaluate_condition
-from utils.resolve_variables import resolve_variables
-from workflow.schemas import WorkflowSchema
+from core.events import EventBuffer, publish_events as publish_event_batch
+from orchestration.engine import DagScheduler, ExecutionPlan, get_execution_plan
+from orchestration.engine.concurrency import ActionLimiter
+from orchestration.engine.output_references import project, trim_output
+from orchestration.engine.simulation import DryRunResult, SimulationProfile
+from orchestration.engine.timing import NodeTiming
+from orchestration.tasks import (
+    label_mail,
+    label_mail_async,
+    reply_email,
+    reply_email_async,
+    send_message,
+    send_message_async,
+    smart_draft,
+    smart_draft_async,
+)
+from utils.evaluate_condition import Predicate
+from utils.resolve_variables import ResolutionMemo
 from workflow.schemas.action import (
     SendEmailConfig,
     ReplyEmailConfig,
     LabelEmailConfig,
     SmartDraftConfig,
 )
-from workflow.schemas.condition_nodes import IfCondition
-from workflow.services import WorkflowRunService
+from workflow.services import TriggerPayloadService, WorkflowRunService
 
 # Loading the models ensuring that the SQLAlchemy Base registry is fully populated before any database operation
 import core.models  # noqa: F401
 
 
-@flow(name="Master Automation Executor", log_prints=True)
-def execute_automation_flow(
-    user_id: UUID,
-    workflow_data: Dict[str, Any],
-    trigger_context: Optional[Dict[str, Any]] = None,
-    workflow_id: Optional[str] = None,
-):
+class _ActionCall(NamedTuple):
+    """An action node resolved and ready to hand to its Prefect task."""
+
+    node_id: str
+    action_type: str
+    args: tuple
+
+
+def _action_task(action_type: str, *, use_async: bool = False):
+    """The Prefect task that executes ``action_type``.
+
+    Looked up at call time (not in a module-level table) so tests can patch
+    the task names on this module.
     """
-    Executes a DAG-based workflow using a Breadth-First Search (BFS) queue.
+    if action_type == "send_email":
+        return send_message_async if use_async else send_message
+    if action_type == "reply_email":
+        return reply_email_async if use_async else reply_email
+    if action_type == "label_email":
+        return label_mail_async if use_async else label_mail
+    if action_type == "smart_draft":
+        return smart_draft_async if use_async else smart_draft
+    raise NotImplementedError(f"Unhandled action type: {action_type}")
+
+
+class _WorkflowRun:
+    """Executor state for one run, shared by the sync and async master flows.
+
+    Owns the run context, failure bookkeeping and the dependency scheduler, and
+    evaluates condition/trigger nodes inline. The flows differ only in how they
+    dispatch action tasks and wait for them to finish.
     """
-    started_at = time.monotonic()
+
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        user_id: UUID,
+        trigger_context: Optional[Dict[str, Any]],
+        workflow_id: Optional[str],
+        logger,
+        run_logger,
+        resume_outputs: Optional[Dict[str, Any]] = None,
+        inline_run_id: Optional[UUID] = None,
+    ):
+        self.plan = plan
+        self.user_id = user_id
+        self.workflow_id = workflow_id
+        self.logger = logger
+        self.run_logger = run_logger
+
+        # ♻️ todo: refactor the trigger context into a pydantic schema
+        if trigger_context and "trigger_context" in trigger_context:
+            ctx_data = trigger_context["trigger_context"]
+        else:
+            ctx_data = trigger_context or {}
+
+        self.original_email = ctx_data.get("original_email")
+        # The trigger payload bound into run_context for {{node.x}} resolution.
+        # Email triggers pass original_email; the generic webhook trigger passes
+        # webhook_payload ({body, headers, query}). Both land at the start node.
+        self.trigger_payload = self.original_email or ctx_data.get("webhook_payload")
+        matched_trigger_node_id = ctx_data.get("matched_trigger_node_id")
+
+        # Fallback for manual or scheduled triggers where the node ID might not be explicitly passed yet
+        if not matched_trigger_node_id:
+            matched_trigger_node_id = (
+                plan.start_node_ids[0] if plan.start_node_ids else None
+            )
+        self.matched_trigger_node_id: Optional[str] = matched_trigger_node_id
+
+        self.run_context: Dict[str, Any] = {
+            "trigger": self.trigger_payload or {},
+            "node_outputs": {},
+        }
+        if matched_trigger_node_id:
+            self.run_context[matched_trigger_node_id] = self.trigger_payload or {}
+
+        # Resuming a failed run: node_id → the output it recorded last time.
+        # These nodes are replayed instead of executed again.
+        self.resume_outputs: Dict[str, Any] = dict(resume_outputs or {})
+
+        # The run context only holds the output fields later nodes reference,
+        # for as long as one of them has yet to start. The audit gets its own,
+        # trimmed copy of every output.
+        self.references = plan.references
+        self.prune_outputs = (
+            settings.prune_node_outputs and not self.references.keep_all
+        )
+        self._unread: Dict[str, int] = {
+            producer: len(consumers)
+            for producer, consumers in self.references.consumers.items()
+        }
+        self.audit_outputs: Dict[str, Any] = {}
+        # Resolved {{paths}} shared by every condition and action of the run.
+        self.memo = ResolutionMemo()
+
+        # node_id → error string. Any entry here marks the whole run as Failed at the end.
+        self.failed_nodes: Dict[str, str] = {}
+        # node_id → when it queued, started and finished; stored in the audit.
+        self.timings: Dict[str, NodeTiming] = {}
+
+        # Resolve ids once so the worker can NOTIFY per-node events that the API
+        # process forwards to the user's WebSocket (core/events.py, event_listener.py).
+        self.emit_workflow_id = _runtime_id(
+            lambda: workflow_id or prefect_deployment.id
+        )
+        # An inline run has no Prefect run; it gets its own id, which also
+        # becomes the id of its audit record.
+        self.inline_run_id = inline_run_id
+        self.emit_run_id = inline_run_id or _runtime_id(lambda: prefect_flow_run.id)
+        # Events are buffered and published once per scheduling wave by the
+        # flow, instead of one NOTIFY round trip + commit per event.
+        self.events = EventBuffer()
+
+        # Dependency-driven execution: a node starts as soon as its own
+        # predecessors have settled, instead of waiting for a whole BFS wave.
+        self.scheduler = (
+            DagScheduler(plan, matched_trigger_node_id)
+            if matched_trigger_node_id
+            else None
+        )
+
+        # Resolved actions wait here until the per-type / per-user concurrency
+        # limits let them run, so a wide fan-out can't burst past API quotas.
+        self.limiter = ActionLimiter(
+            settings.action_concurrency_limits,
+            settings.user_action_concurrency_limit,
+        )
+        self._waiting: Deque[_ActionCall] = deque()
+
+    @property
+    def node_outputs(self) -> Dict[str, Any]:
+        return self.run_context["node_outputs"]
+
+    def emit(
+        self,
+        event_type,
+        node_id,
+        *,
+        node_type=None,
+        error=None,
+        status=None,
+        timing=None,
+    ):
+        self.events.add(
+            {
+                "type": event_type,
+                "user_id": str(self.user_id),
+                "workflow_id": str(self.emit_workflow_id)
+                if self.emit_workflow_id
+                else None,
+                "run_id": str(self.emit_run_id) if self.emit_run_id else None,
+                "node_id": node_id,
+                "node_type": node_type,
+                "error": error,
+                "status": status,
+                "timing": timing.to_dict() if timing else None,
+            }
+        )
+
+    def _log_path_end(self, node_id: str) -> None:
+        if not self.plan.adjacency.get(node_id):
+            self.logger.info(
+                f"🏁 Path stopped at node '{node_id}'. No further outgoing edges found."
+            )
+
+    def _start_timing(self, planned) -> NodeTiming:
+        scheduler = cast(DagScheduler, self.scheduler)
+        timing = NodeTiming(
+            planned.kind,
+            planned.action_type,
+            activated_at=scheduler.activated_at.get(planned.id),
+            queued_at=scheduler.ready_at.get(planned.id),
+        )
+        self.timings[planned.id] = timing
+        return timing
+
+    def _finish_timing(self, node_id: str) -> Optional[NodeTiming]:
+        timing = self.timings.get(node_id)
+        if timing is not None:
+            timing.finish()
+        return timing
+
+    def _record_output(self, node_id: str, output: Any) -> None:
+        self.memo.invalidate(("node_outputs", node_id))
+        paths = self.references.paths.get(node_id, ())
+        self.audit_outputs[node_id] = trim_output(
+            output, settings.audit_output_max_chars, paths
+        )
+        if not self.prune_outputs:
+            self.node_outputs[node_id] = output
+        elif self._unread.get(node_id):
+            self.node_outputs[node_id] = project(output, paths)
+
+    def _release_inputs(self, node_id: str) -> None:
+        """``node_id`` has resolved its variables: an output it read that no
+        other pending node reads leaves the run context."""
+        for producer in self.references.inputs.get(node_id, ()):
+            self._unread[producer] -= 1
+            if self.prune_outputs and not self._unread[producer]:
+                self.node_outputs.pop(producer, None)
+                self.memo.invalidate(("node_outputs", producer))
+
+    def _fail_node(self, node_id: str, node_type: str, error: Exception) -> None:
+        self._record_output(node_id, {"error": str(error)})
+        self.failed_nodes[node_id] = str(error)
+        self.emit(
+            "node_failed",
+            node_id,
+            node_type=node_type,
+            error=str(error),
+            timing=self._finish_timing(node_id),
+        )
+        # Prune: none of this node's outgoing edges are taken.
+        cast(DagScheduler, self.scheduler).fail(node_id)
+
+    def dispatchable(self) -> List[_ActionCall]:
+        """Start every ready node, then return the actions that may be
+        dispatched now without exceeding a concurrency limit."""
+        scheduler = cast(DagScheduler, self.scheduler)
+        while scheduler.has_ready():
+            call = self.start_node(scheduler.pop_ready())
+            if call is not None:
+                self._waiting.append(call)
+
+        admitted: List[_ActionCall] = []
+        still_waiting: Deque[_ActionCall] = deque()
+        for call in self._waiting:
+            if self.limiter.try_acquire(call.action_type):
+                self.timings[call.node_id].dispatched_at = time.time()
+                admitted.append(call)
+            else:
+                still_waiting.append(call)
+        self._waiting = still_waiting
+        return admitted
+
+    def release(self, call: _ActionCall) -> None:
+        """Free the concurrency slot of a finished (or failed-to-start) action."""
+        self.limiter.release(call.action_type)
+
+    def start_node(self, current_node_id: str) -> Optional[_ActionCall]:
+        """Run a ready node. Conditions and triggers finish inline; an action
+        is resolved and returned for the flow to dispatch."""
+        try:
+            return self._start_node(current_node_id)
+        finally:
+            self._release_inputs(current_node_id)
+
+    def _start_node(self, current_node_id: str) -> Optional[_ActionCall]:
+        scheduler = cast(DagScheduler, self.scheduler)
+        planned = self.plan.nodes.get(current_node_id)
+        if not planned:
+            scheduler.skip(current_node_id)
+            return None
+        node = planned.node
+        if current_node_id in self.resume_outputs:
+            self._replay(current_node_id, planned)
+            return None
+        timing = self._start_timing(planned)
+
+        if node.type == "condition":
+            self.emit("node_started", current_node_id, node_type="condition")
+            try:
+                # Rules were compiled into a predicate with the plan.
+                condition_result = cast(Predicate, planned.evaluate)(
+                    self.run_context, self.memo
+                )
+                self._record_output(current_node_id, {"result": condition_result})
+                self.emit(
+                    "node_completed",
+                    current_node_id,
+                    node_type="condition",
+                    timing=self._finish_timing(current_node_id),
+                )
+            except Exception as e:
+                self.run_logger.error(
+                    f"Condition node '{current_node_id}' failed to evaluate: {e}"
+                )
+                # Route neither handle.
+                self._fail_node(current_node_id, "condition", e)
+                return None
+
+            expected_handle = "true_path" if condition_result else "false_path"
+            if not scheduler.complete(current_node_id, handle=expected_handle):
+                self.logger.info(
+                    f"🚦 Path stopped at condition node '{current_node_id}'. "
+                    f"Evaluated to '{expected_handle}', but no edges are connected to this path."
+                )
+            return None
+
+        if node.type == "action":
+            # node.config is the Action model, node.config.config is the actual action data
+            action_type = cast(str, planned.action_type)
+            self.emit("node_started", current_node_id, node_type="action")
+            try:
+                args = self._action_args(current_node_id, planned)
+                timing.resolved_at = time.time()
+                return _ActionCall(current_node_id, action_type, args)
+            except Exception as e:
+                self.action_failed(current_node_id, action_type, e)
+                return None
+
+        # Trigger nodes (and any other non-condition/action type) pass
+        # straight through to their outgoing edges.
+        timing.finish()
+        self._log_path_end(current_node_id)
+        scheduler.complete(current_node_id)
+        return None
+
+    def _replay(self, node_id: str, planned) -> None:
+        """Settle a node that succeeded in the run being resumed, from its
+        recorded output: conditions route as they did, actions don't re-run."""
+        output = self.resume_outputs[node_id]
+        # Recorded outputs were trimmed when first audited; not again.
+        self.audit_outputs[node_id] = output
+        self.memo.invalidate(("node_outputs", node_id))
+        if not self.prune_outputs or self._unread.get(node_id):
+            self.node_outputs[node_id] = output
+        handle = None
+        if planned.kind == "condition":
+            result = output.get("result") if isinstance(output, dict) else None
+            handle = "true_path" if result else "false_path"
+        self.logger.info(f"⏩ Replaying recorded output of node '{node_id}'")
+        cast(DagScheduler, self.scheduler).complete(node_id, handle=handle)
+
+    def _action_args(self, current_node_id: str, planned) -> tuple:
+        action_type = planned.action_type
+
+        # Resolution happens inside the caller's try so that a reference to an
+        # already-failed node ({{failed.body}}) surfaces as this node's
+        # failure instead of crashing the whole run. Only the fields the plan
+        # found templates in are rendered and re-validated.
+        action_data = planned.render_config(self.run_context, self.memo)
+
+        if planned.requires_email and not self.original_email:
+            self.logger.error(
+                f"Action '{action_type}' on node '{current_node_id}' requires an email trigger context but none was provided."
+            )
+            raise ValueError(
+                "Action requires an email trigger context, but none was provided."
+            )
+
+        # The guard above already ensures original_email is truthy
+        # whenever the action requires an email trigger context.
+        email_context = cast(Dict[str, Any], self.original_email)
+
+        if action_type == "send_email":
+            email_config = cast(SendEmailConfig, action_data)
+            return (
+                self.user_id,
+                email_config.to,
+                email_config.subject,
+                email_config.body,
+            )
+
+        if action_type == "reply_email":
+            reply_config = cast(ReplyEmailConfig, action_data)
+            return (self.user_id, reply_config.body, email_context)
+
+        if action_type == "label_email":
+            label_config = cast(LabelEmailConfig, action_data)
+            return (self.user_id, label_config.label_info, email_context)
+
+        if action_type == "smart_draft":
+            smart_draft_config = cast(SmartDraftConfig, action_data)
+            return (self.user_id, email_context, smart_draft_config.user_prompt)
+
+        if action_type == "send_slack_message" or action_type == "create_document":
+            raise NotImplementedError()
+
+        raise NotImplementedError(f"Unhandled action type: {action_type}")
+
+    def action_succeeded(self, node_id: str, result: Any) -> None:
+        self._record_output(node_id, result)
+        self.emit(
+            "node_completed",
+            node_id,
+            node_type="action",
+            timing=self._finish_timing(node_id),
+        )
+        self._log_path_end(node_id)
+        cast(DagScheduler, self.scheduler).complete(node_id)
+
+    def action_failed(self, node_id: str, action_type: str, error: Exception) -> None:
+        self.run_logger.error(
+            f"Action '{action_type}' on node '{node_id}' failed: {error}"
+        )
+        self._fail_node(node_id, "action", error)
+
+    def persist_kwargs(self, started_at: float) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "workflow_id": self.workflow_id,
+            "trigger_data": self.trigger_payload or None,
+            "node_outputs": self.audit_outputs,
+            "failed_nodes": self.failed_nodes,
+            "timings": self.timings,
+            "duration_ms": int((time.monotonic() - started_at) * 1000),
+            "inline_run_id": self.inline_run_id,
+        }
+
+    def finish(self) -> None:
+        """Log the outcome; raise so Prefect marks the run Failed if any node failed."""
+        if self.failed_nodes:
+            # Independent branches have finished; now fail the run so the frontend
+            # (which polls Prefect run state) flags it and the user sees the reasons
+            # in the run logs above.
+            summary = "; ".join(
+                f"{nid}: {err}" for nid, err in self.failed_nodes.items()
+            )
+            self.run_logger.error(
+                f"Workflow '{self.plan.name}' finished with {len(self.failed_nodes)} "
+                f"failed node(s): {summary}"
+            )
+            raise RuntimeError(f"Workflow failed on node(s) — {summary}")
+
+        self.logger.info(f"✅ Workflow '{self.plan.name}' execution completed.")
+
+
+def _start_run(
+    user_id: UUID,
+    workflow_data: Dict[str, Any],
+    trigger_context: Optional[Dict[str, Any]],
+    workflow_id: Optional[str],
+    resume_outputs: Optional[Dict[str, Any]] = None,
+    inline_run_id: Optional[UUID] = None,
+) -> Optional[_WorkflowRun]:
+    """Compile the plan and set up run state. None means there is nothing to run."""
     logger = setup_logger("Master flow")
     # Prefect's run logger so node failures land in get_run_logs (History → View Logs),
     # unlike the local setup_logger which only writes to debug.log. Falls back to the
@@ -49,296 +479,312 @@ def execute_automation_flow(
     except Exception:
         run_logger = logger
 
+    # Validation, adjacency and per-node dispatch info are compiled once per
+    # workflow version and cached in the worker (orchestration/engine).
     try:
-        schema = WorkflowSchema.model_validate(workflow_data)
+        plan = get_execution_plan(workflow_data, workflow_id)
     except Exception as e:
         logger.error(f"Invalid workflow data for user {user_id}: {e}")
         raise Exception("Invalid workflow data.") from e
 
-    workflow = schema.execution_config
+    logger.info(f"🚀 Starting Workflow: {plan.name}")
 
-    logger.info(f"🚀 Starting Workflow: {schema.name}")
+    run = _WorkflowRun(
+        plan,
+        user_id,
+        trigger_context,
+        workflow_id,
+        logger,
+        run_logger,
+        resume_outputs,
+        inline_run_id,
+    )
+    if not run.matched_trigger_node_id:
+        logger.error("No valid starting node found for this workflow.")
+        return None
+    return run
 
-    # ♻️ todo: refactor the trigger context into a pydantic schema
-    if trigger_context and "trigger_context" in trigger_context:
-        ctx_data = trigger_context["trigger_context"]
-    else:
-        ctx_data = trigger_context or {}
-
-    original_email = ctx_data.get("original_email")
-    # The trigger payload bound into run_context for {{node.x}} resolution.
-    # Email triggers pass original_email; the generic webhook trigger passes
-    # webhook_payload ({body, headers, query}). Both land at the start node.
-    trigger_payload = original_email or ctx_data.get("webhook_payload")
-    matched_trigger_node_id = ctx_data.get("matched_trigger_node_id")
-
-    # Fallback for manual or scheduled triggers where the node ID might not be explicitly passed yet
-    if not matched_trigger_node_id:
-        matched_trigger_node_id = (
-            workflow.start_node_ids[0] if workflow.start_node_ids else None
+
+@flow(name="Master Automation Executor", log_prints=True)
+def execute_automation_flow(
+    user_id: UUID,
+    workflow_data: Dict[str, Any],
+    trigger_context: Optional[Dict[str, Any]] = None,
+    workflow_id: Optional[str] = None,
+    resume_outputs: Optional[Dict[str, Any]] = None,
+):
+    """
+    Executes a DAG-based workflow, starting each node as soon as its
+    predecessors have finished.
+
+    ``resume_outputs`` (node_id → recorded output) resumes a failed run: those
+    nodes are replayed and only the rest execute (orchestration/engine/resume.py).
+    """
+    started_at = time.monotonic()
+
+    # A single event loop for every async bridge call in this run (loading a
+    # claim-checked trigger payload, an event flush per scheduling wave, and
+    # _persist_run() once at the end). asyncpg connections are bound to the
+    # event loop that created them, so a fresh asyncio.run() per call would
+    # hand the second call a pooled connection tied to the first call's
+    # already-closed loop — reusing one loop for the whole run keeps the shared
+    # `engine`'s connection pool valid throughout.
+    bridge_loop = asyncio.new_event_loop()
+    try:
+        trigger_context = bridge_loop.run_until_complete(
+            TriggerPayloadService.load(trigger_context)
+        )
+        run = _start_run(
+            user_id, workflow_data, trigger_context, workflow_id, resume_outputs
         )
+    except Exception:
+        bridge_loop.close()
+        raise
+    if run is None:
+        bridge_loop.close()
+        return
 
-    if not matched_trigger_node_id:
-        logger.error("No valid starting node found for this workflow.")
+    # Submitted-but-unfinished action tasks → their resolved call.
+    in_flight: Dict[Any, _ActionCall] = {}
+
+    while True:
+        # Start everything that is ready before blocking, so independent
+        # siblings are all submitted and run concurrently (up to the
+        # per-action-type limits).
+        for call in run.dispatchable():
+            try:
+                # Don't wait here — the task runs on Prefect's default
+                # ThreadPoolTaskRunner while the scheduler keeps starting
+                # every other ready node.
+                future = _action_task(call.action_type).submit(*call.args)
+            except Exception as e:
+                run.release(call)
+                run.action_failed(call.node_id, call.action_type, e)
+                continue
+            in_flight[future] = call
+
+        if not in_flight:
+            break
+
+        # Publish this wave's node events in one round trip before blocking.
+        bridge_loop.run_until_complete(run.events.flush())
+
+        # Block only until the *first* in-flight task finishes, then loop to
+        # start whatever that unblocked — a slow branch never holds up a fast one.
+        future = next(as_completed(list(in_flight)))
+        call = in_flight.pop(future)
+        run.release(call)
+        try:
+            result = future.result()
+        except Exception as e:
+            run.action_failed(call.node_id, call.action_type, e)
+        else:
+            run.action_succeeded(call.node_id, result)
+
+    # Persist a per-node audit record so the failure is durable and the WS poll
+    # loop can surface a node_failed event. Wrapped so an audit-write failure
+    # never masks the real run outcome.
+    _persist_run(run.run_logger, bridge_loop, **run.persist_kwargs(started_at))
+
+    _, overall_status = build_run_audit(run.audit_outputs, run.failed_nodes)
+    run.emit("flow_finished", None, status=overall_status)
+    bridge_loop.run_until_complete(run.events.flush())
+    bridge_loop.close()
+
+    run.finish()
+
+
+# Same flow name as the sync executor so runs of either show up together in
+# Prefect and in the run history.
+@flow(name="Master Automation Executor", log_prints=True)
+async def execute_automation_flow_async(
+    user_id: UUID,
+    workflow_data: Dict[str, Any],
+    trigger_context: Optional[Dict[str, Any]] = None,
+    workflow_id: Optional[str] = None,
+    resume_outputs: Optional[Dict[str, Any]] = None,
+):
+    """
+    Async-native twin of execute_automation_flow.
+
+    Runs on the flow's own event loop: the async Gmail tasks, event publishing
+    and the audit write all share that loop and the process-wide DB engine
+    pool, with no per-event run_until_complete bridging and no per-task
+    asyncio.run().
+    """
+    started_at = time.monotonic()
+    # A large payload arrives as a reference (TriggerPayloadService.offload).
+    trigger_context = await TriggerPayloadService.load(trigger_context)
+    run = _start_run(
+        user_id, workflow_data, trigger_context, workflow_id, resume_outputs
+    )
+    if run is None:
         return
+    await _drive_async(
+        run,
+        lambda call: _action_task(call.action_type, use_async=True)(*call.args),
+    )
+    await _finish_async(run, started_at)
 
-    queue = deque([matched_trigger_node_id])
-    visited = (
-        set()
-    )  # To prevent infinite loops if the user accidentally created a cycle
 
-    run_context = {"trigger": trigger_payload or {}, "node_outputs": {}}
+class InlineFallback(Exception):
+    """An inline run handed back to Prefect before any side effect happened."""
 
-    if matched_trigger_node_id:
-        run_context[matched_trigger_node_id] = trigger_payload or {}
 
-    email_dependent_actions = {"reply_email", "label_email", "smart_draft"}
-    adjacency_list = build_adjacency_list(workflow.edges)
+async def execute_workflow_inline(
+    user_id: UUID,
+    workflow_data: Dict[str, Any],
+    trigger_context: Optional[Dict[str, Any]] = None,
+    workflow_id: Optional[str] = None,
+) -> None:
+    """
+    Run a workflow in the calling process, outside Prefect.
+
+    Same engine, events and audit record as the master flows, but action
+    tasks are awaited as plain coroutines: no deployment scheduling, worker
+    subprocess or per-task state API calls. There are no task retries either,
+    so when the first and only started action fails this raises
+    InlineFallback and the caller re-dispatches the run to Prefect, which
+    retries it.
+    """
+    started_at = time.monotonic()
+    run = _start_run(
+        user_id, workflow_data, trigger_context, workflow_id, inline_run_id=uuid4()
+    )
+    if run is None:
+        return
+    await _drive_async(
+        run,
+        lambda call: _action_task(call.action_type, use_async=True).fn(*call.args),
+        fallback_on_first_failure=True,
+    )
+    await _finish_async(run, started_at)
 
-    # node_id → error string. Any entry here marks the whole run as Failed at the end.
-    failed_nodes: Dict[str, str] = {}
 
-    # Resolve ids once so the worker can NOTIFY per-node events that the API
-    # process forwards to the user's WebSocket (core/events.py, event_listener.py).
-    emit_workflow_id = _runtime_id(lambda: workflow_id or prefect_deployment.id)
-    emit_run_id = _runtime_id(lambda: prefect_flow_run.id)
+async def execute_workflow_dry_run(
+    user_id: UUID,
+    workflow_data: Dict[str, Any],
+    trigger_context: Optional[Dict[str, Any]] = None,
+    workflow_id: Optional[str] = None,
+    *,
+    profile: Optional[SimulationProfile] = None,
+    publish_events: bool = False,
+    persist: bool = False,
+) -> Optional[DryRunResult]:
+    """
+    Run a workflow against stub actions, outside Prefect.
+
+    Variable resolution, condition routing, event emission and audit building
+    all run for real; only the actions are replaced, by ``profile``'s stubs
+    (instant success by default). Events are collected into the result and only
+    NOTIFYd with ``publish_events``; the audit is only written with ``persist``.
+    Injected failures fail their node as usual but never raise — they show up
+    in the result's status. Returns None when the workflow has no start node.
+    """
+    started_at = time.monotonic()
+    run = _start_run(user_id, workflow_data, trigger_context, workflow_id)
+    if run is None:
+        return None
+    profile = profile or SimulationProfile()
 
-    # A single event loop for every async bridge call in this run (emit() fires
-    # once per node event, and _persist_run() fires once at the end). asyncpg
-    # connections are bound to the event loop that created them, so a fresh
-    # asyncio.run() per call would hand the second call a pooled connection
-    # tied to the first call's already-closed loop — reusing one loop for the
-    # whole run keeps the shared `engine`'s connection pool valid throughout.
-    bridge_loop = asyncio.new_event_loop()
+    collected: List[Dict[str, Any]] = []
 
-    def emit(event_type, node_id, *, node_type=None, error=None, status=None):
-        bridge_loop.run_until_complete(
-            publish_event(
-                {
-                    "type": event_type,
-                    "user_id": str(user_id),
-                    "workflow_id": str(emit_workflow_id) if emit_workflow_id else None,
-                    "run_id": str(emit_run_id) if emit_run_id else None,
-                    "node_id": node_id,
-                    "node_type": node_type,
-                    "error": error,
-                    "status": status,
-                }
-            )
-        )
+    async def sink(batch: List[Dict[str, Any]]) -> None:
+        collected.extend(batch)
+        if publish_events:
+            await publish_event_batch(batch)
 
-    while queue:
-        # Process one BFS level (wave) at a time: submit every action node's
-        # task in this wave before waiting on any of them, so independent
-        # branches actually run concurrently on Prefect's default
-        # ThreadPoolTaskRunner instead of one-at-a-time.
-        level_size = len(queue)
-        pending_actions: Dict[str, Dict[str, Any]] = {}
+    run.events = EventBuffer(sink)
 
-        for _ in range(level_size):
-            current_node_id = queue.popleft()
+    await _drive_async(
+        run, lambda call: profile.dispatch(call.node_id, call.action_type)
+    )
 
-            if current_node_id in visited:
-                continue
-            visited.add(current_node_id)
+    if persist:
+        await _persist_run_async(run.run_logger, **run.persist_kwargs(started_at))
+    node_results, overall_status = build_run_audit(
+        run.audit_outputs, run.failed_nodes, run.timings
+    )
+    run.emit("flow_finished", None, status=overall_status)
+    await run.events.flush()
+
+    return DryRunResult(
+        overall_status,
+        node_results,
+        collected,
+        int((time.monotonic() - started_at) * 1000),
+    )
 
-            node = workflow.nodes.get(current_node_id)
-            if not node:
-                continue
 
-            if node.type == "condition":
-                emit("node_started", current_node_id, node_type="condition")
-                try:
-                    condition_result = evaluate_condition(
-                        cast(IfCondition, node.config), run_context
-                    )
-                    run_context["node_outputs"][current_node_id] = {
-                        "result": condition_result
-                    }
-                    emit("node_completed", current_node_id, node_type="condition")
-                except Exception as e:
-                    run_logger.error(
-                        f"Condition node '{current_node_id}' failed to evaluate: {e}"
-                    )
-                    run_context["node_outputs"][current_node_id] = {"error": str(e)}
-                    failed_nodes[current_node_id] = str(e)
-                    emit(
-                        "node_failed",
-                        current_node_id,
-                        node_type="condition",
-                        error=str(e),
-                    )
-                    # Prune: route neither handle, don't queue downstream.
-                    continue
-
-                outgoing_edges = adjacency_list.get(current_node_id, [])
-                expected_handle = "true_path" if condition_result else "false_path"
-                path_continued = False
-
-                for edge in outgoing_edges:
-                    if edge.sourceHandle == expected_handle:
-                        queue.append(edge.target)
-                        path_continued = True
-
-                if not path_continued:
-                    logger.info(
-                        f"🚦 Path stopped at condition node '{current_node_id}'. "
-                        f"Evaluated to '{expected_handle}', but no edges are connected to this path."
-                    )
-                continue
+async def _drive_async(
+    run: _WorkflowRun,
+    dispatch: Callable[[_ActionCall], Awaitable[Any]],
+    *,
+    fallback_on_first_failure: bool = False,
+) -> None:
+    """Run the scheduler to completion on the current event loop.
 
-            elif node.type == "action":
-                # node.config is the Action model, node.config.config is the actual action data
-                action_type = node.config.type
-                raw_action_data = node.config.config
-
-                emit("node_started", current_node_id, node_type="action")
-                try:
-                    # Resolution lives inside the try so that a reference to an
-                    # already-failed node ({{failed.body}}) surfaces as this node's
-                    # failure instead of crashing the whole run.
-                    resolved_dict = resolve_variables(
-                        raw_action_data.model_dump(), run_context
-                    )
-                    action_data = type(raw_action_data)(**resolved_dict)
-
-                    if action_type in email_dependent_actions and not original_email:
-                        logger.error(
-                            f"Action '{action_type}' on node '{current_node_id}' requires an email trigger context but none was provided."
-                        )
-                        raise ValueError(
-                            "Action requires an email trigger context, but none was provided."
-                        )
-
-                    # The guard above already ensures original_email is truthy
-                    # whenever action_type is one of email_dependent_actions.
-                    email_context = cast(Dict[str, Any], original_email)
-
-                    if action_type == "send_email":
-                        email_config = cast(SendEmailConfig, action_data)
-                        future = send_message.submit(
-                            user_id,
-                            email_config.to,
-                            email_config.subject,
-                            email_config.body,
-                        )
-
-                    elif action_type == "reply_email":
-                        reply_config = cast(ReplyEmailConfig, action_data)
-                        future = reply_email.submit(
-                            user_id, reply_config.body, email_context
-                        )
-
-                    elif action_type == "label_email":
-                        label_config = cast(LabelEmailConfig, action_data)
-                        future = label_mail.submit(
-                            user_id, label_config.label_info, email_context
-                        )
-
-                    elif action_type == "smart_draft":
-                        smart_draft_config = cast(SmartDraftConfig, action_data)
-                        future = smart_draft.submit(
-                            user_id, email_context, smart_draft_config.user_prompt
-                        )
-
-                    elif (
-                        action_type == "send_slack_message"
-                        or action_type == "create_document"
-                    ):
-                        raise NotImplementedError()
-
-                    else:
-                        raise NotImplementedError(
-                            f"Unhandled action type: {action_type}"
-                        )
-
-                    # Don't wait here — stash the future and resolve it after the
-                    # whole level has been submitted, so siblings run concurrently.
-                    pending_actions[current_node_id] = {
-                        "future": future,
-                        "action_type": action_type,
-                    }
-
-                except Exception as e:
-                    run_logger.error(
-                        f"Action '{action_type}' on node '{current_node_id}' failed: {e}"
-                    )
-                    run_context["node_outputs"][current_node_id] = {"error": str(e)}
-                    failed_nodes[current_node_id] = str(e)
-                    emit(
-                        "node_failed", current_node_id, node_type="action", error=str(e)
-                    )
-                    # Prune: don't queue this node's downstream children.
+    ``dispatch`` turns a resolved action into the awaitable that executes it:
+    the Prefect task, its bare coroutine (inline) or a stub (dry run).
+    """
+    in_flight: Dict[asyncio.Future, _ActionCall] = {}
+    actions_started = 0
+    # While the run may still be handed to Prefect, its events are held back:
+    # the Prefect run emits the same nodes again under its own run id.
+    may_fall_back = fallback_on_first_failure
+
+    while True:
+        for call in run.dispatchable():
+            try:
+                task = asyncio.ensure_future(dispatch(call))
+            except Exception as e:
+                run.release(call)
+                run.action_failed(call.node_id, call.action_type, e)
                 continue
+            in_flight[task] = call
+            actions_started += 1
 
-            else:
-                # Trigger nodes (and any other non-condition/action type) pass
-                # straight through to their outgoing edges.
-                outgoing_edges = adjacency_list.get(current_node_id, [])
-                if not outgoing_edges:
-                    logger.info(
-                        f"🏁 Path stopped at node '{current_node_id}'. No further outgoing edges found."
-                    )
-                for edge in outgoing_edges:
-                    queue.append(edge.target)
-
-        # Resolve this level's action tasks. Every one was already submitted
-        # above, so Prefect's ThreadPoolTaskRunner (the flow's default) runs
-        # them concurrently — these .result() calls just wait for completion.
-        for current_node_id, pending in pending_actions.items():
-            action_type = pending["action_type"]
-            try:
-                result = pending["future"].result()
-                run_context["node_outputs"][current_node_id] = result
-                emit("node_completed", current_node_id, node_type="action")
-
-                outgoing_edges = adjacency_list.get(current_node_id, [])
-                if not outgoing_edges:
-                    logger.info(
-                        f"🏁 Path stopped at node '{current_node_id}'. No further outgoing edges found."
-                    )
-                for edge in outgoing_edges:
-                    queue.append(edge.target)
+        if not in_flight:
+            break
+
+        may_fall_back = may_fall_back and actions_started == 1
+        if not may_fall_back:
+            # In-flight tasks keep running on the loop while the wave's events go out.
+            await run.events.flush()
 
+        finished, _ = await asyncio.wait(
+            in_flight, return_when=asyncio.FIRST_COMPLETED
+        )
+        for future in finished:
+            call = in_flight.pop(future)
+            run.release(call)
+            try:
+                result = future.result()
             except Exception as e:
-                run_logger.error(
-                    f"Action '{action_type}' on node '{current_node_id}' failed: {e}"
-                )
-                run_context["node_outputs"][current_node_id] = {"error": str(e)}
-                failed_nodes[current_node_id] = str(e)
-                emit("node_failed", current_node_id, node_type="action", error=str(e))
-                # Prune: don't queue this node's downstream children.
+                if may_fall_back:
+                    # Nothing has had a side effect yet, so the whole run can
+                    # safely start over under Prefect's retries. None of its
+                    # events went out, so it is as if it never ran inline.
+                    run.events.discard()
+                    raise InlineFallback(
+                        f"Action '{call.action_type}' on node '{call.node_id}' failed inline: {e}"
+                    ) from e
+                run.action_failed(call.node_id, call.action_type, e)
+            else:
+                run.action_succeeded(call.node_id, result)
+            may_fall_back = False
 
-    # Persist a per-node audit record so the failure is durable and the WS poll
-    # loop can surface a node_failed event. Wrapped so an audit-write failure
-    # never masks the real run outcome.
-    _persist_run(
-        run_logger,
-        bridge_loop,
-        user_id=user_id,
-        workflow_id=workflow_id,
-        trigger_data=trigger_payload or None,
-        node_outputs=run_context["node_outputs"],
-        failed_nodes=failed_nodes,
-        duration_ms=int((time.monotonic() - started_at) * 1000),
-    )
 
-    _, overall_status = build_run_audit(run_context["node_outputs"], failed_nodes)
-    emit("flow_finished", None, status=overall_status)
-    bridge_loop.close()
+async def _finish_async(run: _WorkflowRun, started_at: float) -> None:
+    # Persist before flow_finished goes out, as the sync flow does, so a client
+    # refetching on that event sees the audit record.
+    await _persist_run_async(run.run_logger, **run.persist_kwargs(started_at))
 
-    if failed_nodes:
-        # Independent branches have finished; now fail the run so the frontend
-        # (which polls Prefect run state) flags it and the user sees the reasons
-        # in the run logs above.
-        summary = "; ".join(f"{nid}: {err}" for nid, err in failed_nodes.items())
-        run_logger.error(
-            f"Workflow '{schema.name}' finished with {len(failed_nodes)} "
-            f"failed node(s): {summary}"
-        )
-        raise RuntimeError(f"Workflow failed on node(s) — {summary}")
+    _, overall_status = build_run_audit(run.audit_outputs, run.failed_nodes)
+    run.emit("flow_finished", None, status=overall_status)
+    await run.events.flush()
 
-    logger.info(f"✅ Workflow '{schema.name}' execution completed.")
+    run.finish()
 
 
 def _json_safe(value: Any) -> Any:
@@ -353,10 +799,14 @@ def _json_safe(value: Any) -> Any:
 
 
 def build_run_audit(
-    node_outputs: Dict[str, Any], failed_nodes: Dict[str, str]
+    node_outputs: Dict[str, Any],
+    failed_nodes: Dict[str, str],
+    timings: Optional[Dict[str, NodeTiming]] = None,
 ) -> tuple[Dict[str, Any], str]:
     """Build the per-node results map and the overall run status.
 
+    With ``timings``, each node's entry also carries its queue/start/finish
+    timestamps and durations under ``timing``.
     Pure (no I/O) so it can be unit-tested in isolation.
     """
     node_results: Dict[str, Any] = {}
@@ -373,6 +823,8 @@ def build_run_audit(
                 "status": "success",
                 "error": None,
             }
+        if timings and node_id in timings:
+            node_results[node_id]["timing"] = timings[node_id].to_dict()
 
     success_count = len(node_outputs) - len(failed_nodes)
     if not failed_nodes:
@@ -394,9 +846,8 @@ def _runtime_id(accessor) -> Optional[UUID]:
         return None
 
 
-def _persist_run(
+async def _persist_run_async(
     run_logger,
-    bridge_loop: asyncio.AbstractEventLoop,
     *,
     user_id: UUID,
     workflow_id: Optional[str],
@@ -404,6 +855,8 @@ def _persist_run(
     node_outputs: Dict[str, Any],
     failed_nodes: Dict[str, str],
     duration_ms: int,
+    timings: Optional[Dict[str, NodeTiming]] = None,
+    inline_run_id: Optional[UUID] = None,
 ) -> None:
     # The Workflow DB id equals the Prefect deployment id; fall back to it when
     # the flow runs inside a Prefect deployment (the common path).
@@ -413,9 +866,9 @@ def _persist_run(
         # skip persistence rather than violate the NOT NULL workflow_id.
         return
 
-    node_results, status = build_run_audit(node_outputs, failed_nodes)
+    node_results, status = build_run_audit(node_outputs, failed_nodes, timings)
 
-    async def _persist():
+    try:
         async with db_session() as db:
             await WorkflowRunService.create(
                 db,
@@ -424,13 +877,20 @@ def _persist_run(
                 node_results=node_results,
                 status=status,
                 prefect_run_id=(
-                    UUID(str(prefect_flow_run.id)) if prefect_flow_run.id else None
+                    UUID(str(prefect_flow_run.id))
+                    if prefect_flow_run.id and not inline_run_id
+                    else None
                 ),
                 trigger_data=trigger_data,
                 duration_ms=duration_ms,
+                id=inline_run_id,
+                inline=inline_run_id is not None,
             )
-
-    try:
-        bridge_loop.run_until_complete(_persist())
     except Exception as e:
         run_logger.error(f"Failed to persist workflow run audit record: {e}")
+
+
+def _persist_run(
+    run_logger, bridge_loop: asyncio.AbstractEventLoop, **record: Any
+) -> None:
+    bridge_loop.run_until_complete(_persist_run_async(run_logger, **record))
@@ -1,5 +1,7 @@
 from .deployment_service import DeploymentService
+from .inline_execution_service import InlineExecutionService
 
 __all__ = [
     "DeploymentService",
+    "InlineExecutionService",
 ]
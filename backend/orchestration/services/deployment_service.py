@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 from prefect import get_client
@@ -14,16 +15,48 @@ from prefect.client.schemas.sorting import FlowRunSort, LogSort
 from prefect.deployments import run_deployment
 from prefect.client.schemas.actions import DeploymentUpdate
 from prefect.schedules import Cron
+from core.config_loader import settings
+from core.database import db_session
 from core.setup_logging import setup_logger
-from orchestration.flows.master_flow import execute_automation_flow
-from utils.translate_workflow_runs_schema import translate_flow_runs_schema
+from orchestration.engine import (
+    ResumeError,
+    build_resume_parameters,
+    get_execution_plan,
+)
+from orchestration.flows.master_flow import (
+    execute_automation_flow,
+    execute_automation_flow_async,
+)
+from orchestration.services.inline_execution_service import InlineExecutionService
+from utils.translate_workflow_runs_schema import (
+    translate_flow_runs_schema,
+    translate_inline_runs_schema,
+)
 from workflow.schemas import (
     WorkflowRun,
 )
+from workflow.models.workflow import Workflow
+from workflow.models.workflow_run_record import WorkflowRunRecord
 from workflow.schemas import WorkflowSchema
+from workflow.services import TriggerPayloadService, WorkflowRunService
 
 logger = setup_logger("Deployment Service")
 
+# Runs listed per history request.
+HISTORY_LIMIT = 50
+
+
+def _merge_history(flow_runs, inline_runs) -> List[WorkflowRun]:
+    """Prefect's runs and the inline ones, newest first, up to HISTORY_LIMIT."""
+    runs = translate_flow_runs_schema(flow_runs) + translate_inline_runs_schema(
+        inline_runs
+    )
+    runs.sort(
+        key=lambda run: run.start_time or datetime.min.replace(tzinfo=timezone.utc),
+        reverse=True,
+    )
+    return runs[:HISTORY_LIMIT]
+
 
 class DeploymentService:
     @staticmethod
@@ -42,11 +75,24 @@ class DeploymentService:
         return f"user-{user_id}" in (run.tags or [])
 
     @staticmethod
-    async def run(workflow_id: UUID, config: Optional[Dict[str, Any]] = None):
+    async def run(
+        workflow_id: UUID,
+        config: Optional[Dict[str, Any]] = None,
+        workflow: Optional[Workflow] = None,
+    ):
         """
-        Run a prefect deployment
+        Run a prefect deployment.
+        When the caller passes the ``workflow`` entity, short workflows that
+        qualify for the inline fast path run in this process instead.
         """
+        if workflow is not None and InlineExecutionService.try_start(
+            workflow, config, fallback=lambda: DeploymentService.run(workflow_id, config)
+        ):
+            return
+
         try:
+            # Large trigger payloads go out of line; the run gets a reference.
+            config = await TriggerPayloadService.offload(workflow_id, config)
             # timeout=0 returns as soon as the flow run is scheduled instead of
             # blocking until it completes. The caller treats "scheduled" (not "ran
             # to success") as the signal to mark the message processed, so a
@@ -57,6 +103,32 @@ class DeploymentService:
             logger.error(f"Unexpected error occurred: \n{e}")
             raise e
 
+    @staticmethod
+    async def resume(workflow: Workflow, record: WorkflowRunRecord) -> Dict[str, Any]:
+        """
+        Re-run a failed run of ``workflow`` from its failed nodes.
+        The nodes that succeeded replay their recorded outputs instead of
+        running again. Always goes through the Prefect deployment.
+        Returns the parameters the new run was started with.
+        Raises ResumeError when the record can't be resumed.
+        """
+        try:
+            plan = get_execution_plan(
+                InlineExecutionService.workflow_data(workflow), str(workflow.id)
+            )
+        except Exception as e:
+            raise ResumeError("Workflow configuration is no longer valid.") from e
+
+        parameters = build_resume_parameters(
+            plan, record.node_results or {}, record.trigger_data
+        )
+        await DeploymentService.run(workflow.id, parameters)
+        logger.info(
+            f"Resuming run {record.prefect_run_id} of workflow {workflow.id}, "
+            f"replaying {len(parameters['resume_outputs'])} node(s)"
+        )
+        return parameters
+
     @staticmethod
     async def create_deployment_for_workflow(
         user_id: UUID, schema: WorkflowSchema
@@ -87,9 +159,16 @@ class DeploymentService:
         deployment_name = f"user-{user_id}-{safe_name}"
         workflow_data = workflow.model_dump()
 
-        flow_from_source = await execute_automation_flow.from_source(  # type: ignore[misc]  # pyright: ignore[reportGeneralTypeIssues]
+        if settings.async_master_flow:
+            master_flow = execute_automation_flow_async
+            entrypoint = "orchestration/flows/master_flow.py:execute_automation_flow_async"
+        else:
+            master_flow = execute_automation_flow
+            entrypoint = "orchestration/flows/master_flow.py:execute_automation_flow"
+
+        flow_from_source = await master_flow.from_source(  # type: ignore[misc]  # pyright: ignore[reportGeneralTypeIssues]
             source=".",
-            entrypoint="orchestration/flows/master_flow.py:execute_automation_flow",
+            entrypoint=entrypoint,
         )
 
         deployment_id = await flow_from_source.deploy(  # pyright: ignore[reportGeneralTypeIssues]
@@ -172,25 +251,33 @@ class DeploymentService:
                         any_=[f"user-{user_id}", f"user_{user_id}"],
                     ),
                 ),
-                limit=50,
+                limit=HISTORY_LIMIT,
                 sort=FlowRunSort.START_TIME_DESC,
             )
 
-            return translate_flow_runs_schema(flow_runs)
+        async with db_session() as db:
+            inline_runs = await WorkflowRunService.get_inline_runs(
+                db, user_id, limit=HISTORY_LIMIT
+            )
+        return _merge_history(flow_runs, inline_runs)
 
     @staticmethod
-    async def get_workflow_history(id: UUID) -> List[WorkflowRun]:
+    async def get_workflow_history(id: UUID, user_id: UUID) -> List[WorkflowRun]:
         async with get_client() as client:
             flow_runs = await client.read_flow_runs(
                 flow_run_filter=FlowRunFilter(
                     deployment_id=FlowRunFilterDeploymentId(any_=[id]),
                     tags=FlowRunFilterTags(all_=["user-generated"]),
                 ),
-                limit=50,
+                limit=HISTORY_LIMIT,
                 sort=FlowRunSort.START_TIME_DESC,
             )
 
-            return translate_flow_runs_schema(flow_runs)
+        async with db_session() as db:
+            inline_runs = await WorkflowRunService.get_inline_runs(
+                db, user_id, workflow_id=id, limit=HISTORY_LIMIT
+            )
+        return _merge_history(flow_runs, inline_runs)
 
     @staticmethod
     async def get_run_logs(run_id: UUID) -> List[Log]:
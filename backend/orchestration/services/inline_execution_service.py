@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID
+
+from core.config_loader import settings
+from core.setup_logging import setup_logger
+from orchestration.engine import ExecutionPlan, get_execution_plan
+from orchestration.flows.master_flow import InlineFallback, execute_workflow_inline
+from workflow.models.workflow import Workflow
+
+logger = setup_logger("Inline Execution Service")
+
+# Long-running actions (an LLM generation) stay on Prefect workers even for a
+# workflow that opts in, so they never tie up the API process.
+INLINE_EXCLUDED_ACTIONS = frozenset({"smart_draft"})
+
+# Strong references to running inline runs; asyncio only keeps weak ones.
+_running: Set[asyncio.Task] = set()
+
+
+class InlineExecutionService:
+    @staticmethod
+    def workflow_data(workflow: Workflow) -> Dict[str, Any]:
+        """The WorkflowSchema-shaped payload the master flow engine expects."""
+        return {
+            "name": workflow.name,
+            "description": workflow.description or "",
+            "execution_config": workflow.config,
+        }
+
+    @staticmethod
+    def is_eligible(plan: ExecutionPlan) -> bool:
+        """
+        Inline when the workflow opts in with execution_mode="inline", or is
+        within the inline_execution_max_nodes threshold and hasn't opted out
+        with "prefect". Workflows with a long-running action never are.
+        """
+        mode = plan.workflow.execution_mode
+        if mode == "prefect":
+            return False
+        if any(
+            planned.action_type in INLINE_EXCLUDED_ACTIONS
+            for planned in plan.nodes.values()
+        ):
+            return False
+        if mode == "inline":
+            return True
+        threshold = settings.inline_execution_max_nodes
+        return threshold > 0 and len(plan.nodes) <= threshold
+
+    @staticmethod
+    def try_start(
+        workflow: Workflow,
+        trigger_context: Optional[Dict[str, Any]],
+        fallback: Callable[[], Awaitable[Any]],
+    ) -> bool:
+        """
+        Start ``workflow`` inline in the background if it qualifies.
+        Returns False (and starts nothing) when it should go to Prefect instead.
+        ``fallback`` re-dispatches the run to Prefect if the inline attempt
+        hands it back.
+        """
+        if len(_running) >= settings.inline_execution_concurrency:
+            return False
+
+        workflow_data = InlineExecutionService.workflow_data(workflow)
+        try:
+            plan = get_execution_plan(workflow_data, str(workflow.id))
+        except Exception as e:
+            # Let the Prefect run surface the invalid config as a failed run.
+            logger.error(f"Workflow {workflow.id} can't be planned for inline run: {e}")
+            return False
+        if not InlineExecutionService.is_eligible(plan):
+            return False
+
+        # Plain values only: the ORM object's session may be gone by the time
+        # the background run reads them.
+        task = asyncio.create_task(
+            InlineExecutionService._run(
+                workflow.id, workflow.user_id, workflow_data, trigger_context, fallback
+            )
+        )
+        _running.add(task)
+        task.add_done_callback(_running.discard)
+        logger.info(f"Running workflow {workflow.id} inline")
+        return True
+
+    @staticmethod
+    async def _run(
+        workflow_id: UUID,
+        user_id: UUID,
+        workflow_data: Dict[str, Any],
+        trigger_context: Optional[Dict[str, Any]],
+        fallback: Callable[[], Awaitable[Any]],
+    ) -> None:
+        try:
+            await execute_workflow_inline(
+                user_id, workflow_data, trigger_context, str(workflow_id)
+            )
+        except InlineFallback as e:
+            logger.info(f"{e} — handing workflow {workflow_id} to Prefect")
+            try:
+                await fallback()
+            except Exception as fallback_error:
+                logger.error(
+                    f"Prefect fallback for workflow {workflow_id} failed: {fallback_error}"
+                )
+        except Exception as e:
+            # The run's own failure is already in the audit record and events.
+            logger.error(f"Inline run of workflow {workflow_id} failed: {e}")
@@ -1,3 +1,21 @@
-from .gmail_tasks import send_message, reply_email, label_mail, smart_draft
+from .gmail_tasks import (
+    label_mail,
+    label_mail_async,
+    reply_email,
+    reply_email_async,
+    send_message,
+    send_message_async,
+    smart_draft,
+    smart_draft_async,
+)
 
-__all__ = ["label_mail", "reply_email", "send_message", "smart_draft"]
+__all__ = [
+    "label_mail",
+    "label_mail_async",
+    "reply_email",
+    "reply_email_async",
+    "send_message",
+    "send_message_async",
+    "smart_draft",
+    "smart_draft_async",
+]
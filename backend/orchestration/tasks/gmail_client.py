@@ -0,0 +1,143 @@
+"""Per-user Gmail API clients shared by every action task in a worker process.
+
+Loading a client means a DB session, decrypting (and possibly refreshing) the
+user's OAuth tokens, looking up their address and building the service — work
+that used to be repeated by every Gmail node of a run. Clients are cached per
+user until their access token expires, so a run with five Gmail actions loads
+credentials and builds the service once.
+
+Services are built by ``utils.gmail_api.build_gmail_service``. A cached
+service is shared across Prefect's task threads, so its requests go through
+``utils.gmail_api.execute``, which gives each thread its own transport.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from auth.services.auth_service import AuthService
+from core.config_loader import settings
+from core.database import db_session
+from core.setup_logging import setup_logger
+from utils.gmail_api import build_gmail_service
+from user.services.user_service import UserService
+from utils.lru_cache import LRUCache
+
+logger = setup_logger("Gmail Client Cache")
+
+PROVIDER = "google"
+
+DEFAULT_SCOPES = [
+    "https://www.googleapis.com/auth/gmail.send",
+    "https://www.googleapis.com/auth/gmail.compose",
+    "https://www.googleapis.com/auth/gmail.modify",
+    "https://www.googleapis.com/auth/gmail.readonly",
+]
+
+
+class GmailClient:
+    """A user's built Gmail service plus the credentials and address behind it."""
+
+    __slots__ = ("credentials", "service", "user_email")
+
+    def __init__(self, credentials: Credentials, user_email: Optional[str], service):
+        self.credentials = credentials
+        self.user_email = user_email
+        self.service = service
+
+    @property
+    def valid(self) -> bool:
+        # google-auth treats a token as expired slightly before its real expiry,
+        # so a cached client is never handed out with a token about to lapse.
+        return bool(self.credentials.valid)
+
+
+_clients: LRUCache[UUID, GmailClient] = LRUCache(settings.gmail_client_cache_size)
+
+# One load per user at a time: concurrently started sibling actions wait for
+# the first one's load instead of each doing their own.
+_load_locks: Dict[UUID, threading.Lock] = {}
+_load_locks_guard = threading.Lock()
+_async_load_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[UUID, asyncio.Lock]]" = weakref.WeakKeyDictionary()
+
+
+async def _fetch_credentials(user_id: UUID) -> Tuple[Credentials, Optional[str]]:
+    async with db_session() as db:
+        creds = await AuthService.get_google_credentials(
+            db, user_id, PROVIDER, DEFAULT_SCOPES
+        )
+        user_email = await UserService.get_email(db, user_id)
+        return creds, user_email
+
+
+def _build_client(creds: Credentials, user_email: Optional[str]) -> GmailClient:
+    return GmailClient(creds, user_email, build_gmail_service(creds))
+
+
+def _cached(user_id: UUID) -> Optional[GmailClient]:
+    client = _clients.get(user_id)
+    if client is not None and client.valid:
+        return client
+    return None
+
+
+def get_gmail_client(user_id: UUID) -> GmailClient:
+    """Return ``user_id``'s cached client, loading it on a miss or expiry.
+
+    Blocking: a miss runs the credential load on a private event loop, as the
+    sync Gmail tasks always have.
+    """
+    client = _cached(user_id)
+    if client is not None:
+        return client
+
+    with _load_locks_guard:
+        lock = _load_locks.setdefault(user_id, threading.Lock())
+    with lock:
+        client = _cached(user_id)
+        if client is None:
+            creds, user_email = asyncio.run(_fetch_credentials(user_id))
+            client = _build_client(creds, user_email)
+            _clients.put(user_id, client)
+        return client
+
+
+async def get_gmail_client_async(user_id: UUID) -> GmailClient:
+    """Async twin of ``get_gmail_client``: credentials load on the caller's loop."""
+    client = _cached(user_id)
+    if client is not None:
+        return client
+
+    locks = _async_load_locks.setdefault(asyncio.get_running_loop(), {})
+    lock = locks.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        client = _cached(user_id)
+        if client is None:
+            creds, user_email = await _fetch_credentials(user_id)
+            # The first build of the process parses the discovery document.
+            client = await asyncio.to_thread(_build_client, creds, user_email)
+            _clients.put(user_id, client)
+        return client
+
+
+def is_auth_error(error: BaseException) -> bool:
+    """Whether ``error`` means the cached credentials themselves are bad."""
+    if isinstance(error, RefreshError):
+        return True
+    return isinstance(error, HttpError) and error.resp.status == 401
+
+
+def invalidate_gmail_client(user_id: UUID) -> None:
+    """Drop a user's cached client so the next task reloads credentials."""
+    if _clients.pop(user_id) is not None:
+        logger.info(f"Evicted cached Gmail client for user {user_id}")
+
+
+def clear_gmail_client_cache() -> None:
+    _clients.clear()
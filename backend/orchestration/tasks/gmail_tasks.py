@@ -1,17 +1,14 @@
 import asyncio
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from email.message import EmailMessage
 from typing import Any, Dict, Optional
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from uuid import UUID
 
 from prefect import task
 
 from ai.services.ai_service import AiService
-from auth.services.auth_service import AuthService
 from core.config_loader import settings
-from core.database import db_session
 from core.setup_logging import setup_logger
 from gmail.schemas.label import (
     GmailLabel,
@@ -19,41 +16,186 @@ from gmail.schemas.label import (
     LabelType,
     MessageListVisibility,
 )
-from user.services.user_service import UserService
+from orchestration.tasks.gmail_client import (
+    get_gmail_client,
+    get_gmail_client_async,
+    invalidate_gmail_client,
+    is_auth_error,
+)
+from utils.gmail_api import execute
 
 import base64
 
 logger = setup_logger("Prefect Gmail Task")
 
-PROVIDER = "google"
-
-DEFAULT_SCOPES = [
-    "https://www.googleapis.com/auth/gmail.send",
-    "https://www.googleapis.com/auth/gmail.compose",
-    "https://www.googleapis.com/auth/gmail.modify",
-    "https://www.googleapis.com/auth/gmail.readonly",
-]
-
 
 @contextmanager
 def _get_gmail_service(user_id: UUID):
     """
-    Private helper to handle DB session, credentials, and service building.
-    Uses a context manager to ensure the service is built and closed correctly.
+    Private helper yielding the user's Gmail service and address.
+    The client comes from the per-user cache (gmail_client.py), so only the
+    first Gmail task of a run pays for credential loading and the discovery
+    build. Bad credentials evict it, and the task's retry reloads them.
+    """
+    client = get_gmail_client(user_id)
+    try:
+        yield client.service, client.user_email
+    except Exception as error:
+        if is_auth_error(error):
+            invalidate_gmail_client(user_id)
+        raise
+
+
+@asynccontextmanager
+async def _get_gmail_service_async(user_id: UUID):
+    """
+    Async twin of _get_gmail_service for the async master flow. A cache miss
+    loads credentials on the caller's event loop — and so through the shared
+    engine's connection pool — instead of a throwaway asyncio.run() loop.
     """
+    client = await get_gmail_client_async(user_id)
+    try:
+        yield client.service, client.user_email
+    except Exception as error:
+        if is_auth_error(error):
+            invalidate_gmail_client(user_id)
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Gmail operations. Plain blocking functions over an already-built service so
+# the sync tasks can call them directly and the async tasks via to_thread.
+# Requests go through execute() because the cached service is shared by
+# concurrently running tasks.
+# ---------------------------------------------------------------------------
+
+
+def _reply_headers(message: EmailMessage, original_email: Dict[str, Any]) -> None:
+    """Address ``message`` as a threaded reply to ``original_email``."""
+    # subject should start with Re if it doesn't already
+    subject = original_email["subject"]
+    if not subject.lower().startswith("re:"):
+        subject = f"Re: {subject}"
+
+    message["To"] = original_email["from"]
+    message["Subject"] = subject
+
+    message["In-Reply-To"] = original_email["header_message_id"]
+    old_refs = original_email["references"]
+    message["References"] = f"{old_refs} {original_email['header_message_id']}".strip()
+
+
+def _encode(message: EmailMessage) -> str:
+    return base64.urlsafe_b64encode(message.as_bytes()).decode()
+
+
+def _insert_draft(
+    service, user_email: Optional[str], body: str, original_email: Dict[str, Any]
+):
+    message = EmailMessage()
+    message.set_content(body)
+    _reply_headers(message, original_email)
+    message["From"] = user_email
+
+    create_message = {
+        "message": {
+            "raw": _encode(message),
+            "threadId": original_email["thread_id"],
+        }
+    }
+
+    draft = execute(service.users().drafts().create(userId="me", body=create_message))
+
+    logger.info(f"Draft id: {draft['id']}\nDraft message: {draft['message']}")
+    return draft
+
+
+def _send_new_message(
+    service, user_email: Optional[str], to: str, subject: str, body: str
+):
+    message = EmailMessage()
+
+    message.set_content(body)
+
+    message["To"] = to
+    message["From"] = user_email
+    message["Subject"] = subject
+
+    create_message = {"raw": _encode(message)}
+
+    sent = execute(service.users().messages().send(userId="me", body=create_message))
+    logger.info(f"Message Id: {sent['id']}")
+    return sent
+
+
+def _send_reply(service, body: str, original_email: Dict[str, Any]):
+    message = EmailMessage()
+    message.set_content(body)
+    _reply_headers(message, original_email)
 
-    async def _fetch():
-        async with db_session() as db:
-            creds = await AuthService.get_google_credentials(
-                db, user_id, PROVIDER, DEFAULT_SCOPES
+    create_message = {
+        "raw": _encode(message),
+        "threadId": original_email["thread_id"],  # Crucial for Gmail UI threading
+    }
+
+    return execute(service.users().messages().send(userId="me", body=create_message))
+
+
+def _apply_label(service, label_info: GmailLabel, original_email: Dict[str, Any]):
+    response = execute(service.users().labels().list(userId="me"))
+    labels = response.get("labels", [])
+    label_exists = next(
+        (label for label in labels if label["name"] == label_info.name), None
+    )
+
+    if not label_exists:
+        logger.info(f"Label {label_info.name} doesn't exists, we're creating it...")
+
+        if not label_info.labelListVisibility:
+            label_info.labelListVisibility = LabelListVisibility.LABEL_SHOW
+        if not label_info.messageListVisibility:
+            label_info.messageListVisibility = MessageListVisibility.SHOW
+        if not label_info.type:
+            label_info.type = LabelType.USER
+
+        label_exists = execute(
+            service.users()
+            .labels()
+            .create(
+                userId="me",
+                body=label_info.model_dump(mode="json", exclude_none=True),
             )
-            user_email = await UserService.get_email(db, user_id)
-            return creds, user_email
+        )
+
+        logger.info("The label is created with success")
+
+    label_id = label_exists.get("id", None)
+    message_id = original_email.get("message_id")
+
+    if not message_id or not label_id:
+        raise ValueError("Either label id or message id is none.")
+
+    request = {"addLabelIds": [label_id]}
+
+    return execute(
+        service.users().messages().modify(userId="me", id=message_id, body=request)
+    )
 
-    creds, user_email = asyncio.run(_fetch())
-    # Service build as a context manager (supported by google-api-python-client)
-    with build("gmail", "v1", credentials=creds) as service:
-        yield service, user_email
+
+def _smart_draft_input(
+    email_data: Dict[str, Any], context_instruction: Optional[str]
+) -> str:
+    specific_instruction = (
+        f"Instruction: {context_instruction}\n" if context_instruction else ""
+    )
+
+    return (
+        f"{specific_instruction}"
+        f"Incoming Email Subject: {email_data.get('subject')}\n"
+        f"Incoming Email From: {email_data.get('from')}\n"
+        f"Incoming Email Body:\n{email_data.get('body')}\n\n"
+        "Draft a reply:"
+    )
 
 
 def create_draft(user_id: UUID, body: str, original_email: Dict[str, Any]):
@@ -65,47 +207,11 @@ def create_draft(user_id: UUID, body: str, original_email: Dict[str, Any]):
 
     try:
         with _get_gmail_service(user_id) as (service, user_email):
-            message = EmailMessage()
-            message.set_content(body)
-
-            # subject should start with Re if it doesn't already
-            subject = original_email["subject"]
-            if not subject.lower().startswith("re:"):
-                subject = f"Re: {subject}"
-
-            message["To"] = original_email["from"]
-            message["Subject"] = subject
-            message["From"] = user_email
-
-            message["In-Reply-To"] = original_email["header_message_id"]
-            old_refs = original_email["references"]
-            message["References"] = (
-                f"{old_refs} {original_email['header_message_id']}".strip()
-            )
-
-            encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-
-            create_message = {
-                "message": {
-                    "raw": encoded_message,
-                    "threadId": original_email["thread_id"],
-                }
-            }
-
-            draft = (
-                service.users()
-                .drafts()
-                .create(userId="me", body=create_message)
-                .execute()
-            )
-
-            logger.info(f"Draft id: {draft['id']}\nDraft message: {draft['message']}")
+            return _insert_draft(service, user_email, body, original_email)
     except HttpError as error:
         logger.error(f"Http error occurred while creating draft: {error}")
         raise error
 
-    return draft
-
 
 @task(name="Send email message", retries=2, retry_delay_seconds=30, log_prints=True)
 def send_message(user_id: UUID, to: str, subject: str, body: str):
@@ -116,25 +222,7 @@ def send_message(user_id: UUID, to: str, subject: str, body: str):
     """
     try:
         with _get_gmail_service(user_id) as (service, user_email):
-            message = EmailMessage()
-
-            message.set_content(body)
-
-            message["To"] = to
-            message["From"] = user_email
-            message["Subject"] = subject
-
-            encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-
-            create_message = {"raw": encoded_message}
-
-            send_message = (
-                service.users()
-                .messages()
-                .send(userId="me", body=create_message)
-                .execute()
-            )
-            logger.info(f"Message Id: {send_message['id']}")
+            return _send_new_message(service, user_email, to, subject, body)
     except HttpError as error:
         logger.error(f"Http error occurred: \n {error}")
         raise error
@@ -142,8 +230,6 @@ def send_message(user_id: UUID, to: str, subject: str, body: str):
         logger.error(f"Unhandled error occurred: \n {error}")
         raise error
 
-    return send_message
-
 
 @task(name="Replay email", retries=2, retry_delay_seconds=30, log_prints=True)
 def reply_email(user_id: UUID, body: str, original_email: Dict[str, Any]):
@@ -154,38 +240,7 @@ def reply_email(user_id: UUID, body: str, original_email: Dict[str, Any]):
 
     try:
         with _get_gmail_service(user_id) as (service, _user_email):
-            message = EmailMessage()
-            message.set_content(body)
-
-            # subject should start with Re if it doesn't already
-            subject = original_email["subject"]
-            if not subject.lower().startswith("re:"):
-                subject = f"Re: {subject}"
-
-            message["To"] = original_email["from"]
-            message["Subject"] = subject
-
-            message["In-Reply-To"] = original_email["header_message_id"]
-            old_refs = original_email["references"]
-            message["References"] = (
-                f"{old_refs} {original_email['header_message_id']}".strip()
-            )
-
-            encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-
-            create_message = {
-                "raw": encoded_message,
-                "threadId": original_email[
-                    "thread_id"
-                ],  # Crucial for Gmail UI threading
-            }
-
-            return (
-                service.users()
-                .messages()
-                .send(userId="me", body=create_message)
-                .execute()
-            )
+            return _send_reply(service, body, original_email)
     except HttpError as error:
         logger.error(f"Http error occurred: \n {error}")
         raise error
@@ -207,52 +262,7 @@ def label_mail(
 
     try:
         with _get_gmail_service(user_id) as (service, _user_email):
-            response = service.users().labels().list(userId="me").execute()
-            labels = response.get("labels", [])
-            label_exists = next(
-                (label for label in labels if label["name"] == label_info.name), None
-            )
-
-            if not label_exists:
-                logger.info(
-                    f"Label {label_info.name} doesn't exists, we're creating it..."
-                )
-
-                if not label_info.labelListVisibility:
-                    label_info.labelListVisibility = LabelListVisibility.LABEL_SHOW
-                if not label_info.messageListVisibility:
-                    label_info.messageListVisibility = MessageListVisibility.SHOW
-                if not label_info.type:
-                    label_info.type = LabelType.USER
-
-                label_exists = (
-                    service.users()
-                    .labels()
-                    .create(
-                        userId="me",
-                        body=label_info.model_dump(mode="json", exclude_none=True),
-                    )
-                    .execute()
-                )
-
-                logger.info("The label is created with success")
-
-            label_id = label_exists.get("id", None)
-            message_id = original_email.get("message_id")
-
-            if not message_id or not label_id:
-                raise ValueError("Either label id or message id is none.")
-
-            request = {"addLabelIds": [label_id]}
-
-            modify_result = (
-                service.users()
-                .messages()
-                .modify(userId="me", id=message_id, body=request)
-                .execute()
-            )
-
-        return modify_result
+            return _apply_label(service, label_info, original_email)
     except HttpError as error:
         logger.error(f"Http error occurred: \n {error}")
         raise error
@@ -270,17 +280,7 @@ def smart_draft(
     """
     Create a draft with an AI generated message
     """
-    specific_instruction = (
-        f"Instruction: {context_instruction}\n" if context_instruction else ""
-    )
-
-    user_input = (
-        f"{specific_instruction}"
-        f"Incoming Email Subject: {email_data.get('subject')}\n"
-        f"Incoming Email From: {email_data.get('from')}\n"
-        f"Incoming Email Body:\n{email_data.get('body')}\n\n"
-        "Draft a reply:"
-    )
+    user_input = _smart_draft_input(email_data, context_instruction)
 
     try:
         generated_body = AiService.ask_ai(user_input, settings.smart_draft_prompt)
@@ -294,3 +294,75 @@ def smart_draft(
     except Exception as e:
         logger.error(f"Failed to generate Smart Draft: {e}")
         raise e
+
+
+# ---------------------------------------------------------------------------
+# Async variants, used by execute_automation_flow_async. They run on the flow's
+# own event loop, so credential loading shares its DB pool and only the blocking
+# googleapiclient / Azure calls are pushed to worker threads.
+# ---------------------------------------------------------------------------
+
+
+@task(name="Send email message", retries=2, retry_delay_seconds=30, log_prints=True)
+async def send_message_async(user_id: UUID, to: str, subject: str, body: str):
+    try:
+        async with _get_gmail_service_async(user_id) as (service, user_email):
+            return await asyncio.to_thread(
+                _send_new_message, service, user_email, to, subject, body
+            )
+    except Exception as error:
+        logger.error(f"Failed to send email message: \n {error}")
+        raise error
+
+
+@task(name="Replay email", retries=2, retry_delay_seconds=30, log_prints=True)
+async def reply_email_async(user_id: UUID, body: str, original_email: Dict[str, Any]):
+    try:
+        async with _get_gmail_service_async(user_id) as (service, _user_email):
+            return await asyncio.to_thread(_send_reply, service, body, original_email)
+    except Exception as error:
+        logger.error(f"Failed to reply to email: \n {error}")
+        raise error
+
+
+@task(name="Label email", retries=2, retry_delay_seconds=30, log_prints=True)
+async def label_mail_async(
+    user_id: UUID,
+    label_info: GmailLabel,
+    original_email: Dict[str, Any],
+):
+    try:
+        async with _get_gmail_service_async(user_id) as (service, _user_email):
+            return await asyncio.to_thread(
+                _apply_label, service, label_info, original_email
+            )
+    except Exception as error:
+        logger.error(f"Failed to label email: {error}")
+        raise error
+
+
+@task(name="Write a draft with AI", retries=2, retry_delay_seconds=30, log_prints=True)
+async def smart_draft_async(
+    user_id: UUID,
+    email_data: Dict[str, Any],
+    context_instruction: Optional[str] = None,
+):
+    user_input = _smart_draft_input(email_data, context_instruction)
+
+    try:
+        generated_body = await asyncio.to_thread(
+            AiService.ask_ai, user_input, settings.smart_draft_prompt
+        )
+        logger.info(f"AI response: {generated_body}")
+
+        async with _get_gmail_service_async(user_id) as (service, user_email):
+            draft_result = await asyncio.to_thread(
+                _insert_draft, service, user_email, generated_body, email_data
+            )
+
+        logger.info(f"Smart Draft created successfully. ID: {draft_result['id']}")
+        return draft_result
+
+    except Exception as e:
+        logger.error(f"Failed to generate Smart Draft: {e}")
+        raise e
@@ -1,31 +1,55 @@
-from typing import Optional
+from typing import Iterable, Set, Tuple
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from processed_messages.models.processed_messages import ProcessedMessages
 
+# A (Gmail message id, workflow id) pair — one row of processed_messages.
+MessageWorkflowPair = Tuple[str, UUID]
+
 
 class ProcessedMessageService:
     @staticmethod
-    async def create(db: AsyncSession, message_id: str, workflow_id: UUID):
-        new_processed_message = ProcessedMessages(
-            message_id=message_id, workflow_id=workflow_id
+    async def create_many(
+        db: AsyncSession, pairs: Iterable[MessageWorkflowPair]
+    ) -> Set[MessageWorkflowPair]:
+        """
+        Record every pair in one INSERT ... ON CONFLICT DO NOTHING.
+        Returns the pairs actually inserted; the others were already recorded
+        (e.g. by a concurrent sync of the same mailbox).
+        """
+        rows = [
+            {"message_id": message_id, "workflow_id": workflow_id}
+            for message_id, workflow_id in dict.fromkeys(pairs)
+        ]
+        if not rows:
+            return set()
+        result = await db.execute(
+            insert(ProcessedMessages)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_message_workflow_pair")
+            .returning(ProcessedMessages.message_id, ProcessedMessages.workflow_id)
         )
-        db.add(new_processed_message)
+        inserted = {(row.message_id, row.workflow_id) for row in result}
         await db.commit()
-        await db.refresh(new_processed_message)
-        return new_processed_message
+        return inserted
 
     @staticmethod
-    async def get_by_message_id_and_workflow_id(
-        db: AsyncSession, message_id: str, workflow_id: UUID
-    ) -> Optional[ProcessedMessages]:
+    async def get_processed_pairs(
+        db: AsyncSession, message_ids: Iterable[str], workflow_ids: Iterable[UUID]
+    ) -> Set[MessageWorkflowPair]:
+        """The (message, workflow) pairs among ``message_ids`` x ``workflow_ids``
+        that are already recorded, in one query."""
+        message_ids, workflow_ids = list(message_ids), list(workflow_ids)
+        if not message_ids or not workflow_ids:
+            return set()
         result = await db.execute(
-            select(ProcessedMessages).where(
-                ProcessedMessages.message_id == message_id,
-                ProcessedMessages.workflow_id == workflow_id,
+            select(ProcessedMessages.message_id, ProcessedMessages.workflow_id).where(
+                ProcessedMessages.message_id.in_(message_ids),
+                ProcessedMessages.workflow_id.in_(workflow_ids),
             )
         )
-        return result.scalar_one_or_none()
+        return {(row.message_id, row.workflow_id) for row in result}
@@ -15,6 +15,7 @@ from prefect.schedules import Cron
 
 from orchestration.flows.renew_watches_flow import renew_gmail_watches
 from orchestration.flows.cleanup_auth_flow import cleanup_expired_auth
+from orchestration.flows.cleanup_payloads_flow import cleanup_expired_trigger_payloads
 
 
 async def register_renewal_deployment(retries: int = 5, delay: float = 3.0):
@@ -82,11 +83,46 @@ async def register_cleanup_deployment(retries: int = 5, delay: float = 3.0):
     raise last_err
 
 
+async def register_payload_cleanup_deployment(retries: int = 5, delay: float = 3.0):
+    """Register (or refresh) the daily expired-trigger-payload cleanup deployment.
+
+    Same idempotent-upsert + retry contract as `register_renewal_deployment`.
+    """
+    flow_from_source = await cleanup_expired_trigger_payloads.from_source(  # type: ignore[misc]  # pyright: ignore[reportGeneralTypeIssues]
+        source=".",
+        entrypoint="orchestration/flows/cleanup_payloads_flow.py:cleanup_expired_trigger_payloads",
+    )
+
+    last_err = None
+    for _ in range(retries):
+        try:
+            return await flow_from_source.deploy(  # pyright: ignore[reportGeneralTypeIssues]
+                name="cleanup-trigger-payloads-daily",
+                schedule=Cron("30 3 * * *", timezone="UTC"),  # daily 03:30 UTC
+                tags=["system", "workflow-maintenance"],
+                work_pool_name="my-process-pool",
+                build=False,
+            )
+        except Exception as e:  # prefect API not up yet / transient
+            last_err = e
+            await asyncio.sleep(delay)
+
+    if last_err is None:
+        raise RuntimeError(
+            f"Deployment registration never attempted (retries={retries})."
+        )
+    raise last_err
+
+
 async def main():
     renewal_id = await register_renewal_deployment()
     print(f"✅ Deployment registered: renew-gmail-watches-daily (ID: {renewal_id})")
     cleanup_id = await register_cleanup_deployment()
     print(f"✅ Deployment registered: cleanup-expired-auth-daily (ID: {cleanup_id})")
+    payloads_id = await register_payload_cleanup_deployment()
+    print(
+        f"✅ Deployment registered: cleanup-trigger-payloads-daily (ID: {payloads_id})"
+    )
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 from unittest.mock import AsyncMock, patch
 from uuid import uuid4
 
+import pytest
+
 
 # ---------------------------------------------------------------------------
 # Minimal valid WorkflowSchema JSON body
@@ -558,3 +560,164 @@ async def test_run_audit_other_user_returns_404(
 async def test_run_audit_requires_auth(client):
     resp = await client.get(f"/api/workflow/runs/{uuid4()}/audit")
     assert resp.status_code == 401
+
+
+# ---------------------------------------------------------------------------
+# GET /api/workflow/runs/latency — p50/p95 per action type from node timings
+# ---------------------------------------------------------------------------
+
+
+async def test_action_latency_percentiles(client, db_session, test_user, auth_headers):
+    from workflow.models.workflow import Workflow
+    from workflow.services import WorkflowRunService
+
+    workflow = Workflow(
+        id=uuid4(), user_id=test_user.id, name="WF", description="d", config={}
+    )
+    db_session.add(workflow)
+    await db_session.flush()
+
+    for duration in (10.0, 20.0, 30.0, 40.0):
+        await WorkflowRunService.create(
+            db_session,
+            workflow_id=workflow.id,
+            user_id=test_user.id,
+            node_results={
+                "t1": {
+                    "output": {},
+                    "status": "success",
+                    "error": None,
+                    "timing": {"action_type": None, "duration_ms": 0.1},
+                },
+                "a1": {
+                    "output": {},
+                    "status": "success",
+                    "error": None,
+                    "timing": {"action_type": "send_email", "duration_ms": duration},
+                },
+                # Recorded before timing existed — ignored.
+                "old": {"output": {}, "status": "success", "error": None},
+            },
+            status="success",
+        )
+
+    resp = await client.get("/api/workflow/runs/latency", headers=auth_headers)
+
+    assert resp.status_code == 200
+    (stats,) = resp.json()
+    assert stats["action_type"] == "send_email"
+    assert stats["count"] == 4
+    assert stats["p50_ms"] == 25.0
+    assert stats["p95_ms"] == pytest.approx(38.5)
+
+
+# ---------------------------------------------------------------------------
+# POST /api/workflow/runs/{run_id}/resume — re-run a failed run's failed nodes
+# ---------------------------------------------------------------------------
+
+
+async def _create_failed_run(db_session, user, *, prefect_run_id):
+    """A run of VALID_WORKFLOW extended with a second action that failed."""
+    from workflow.models.workflow import Workflow
+    from workflow.services import WorkflowRunService
+
+    config = {
+        **VALID_WORKFLOW["execution_config"],
+        "nodes": {
+            **VALID_WORKFLOW["execution_config"]["nodes"],
+            "action_2": {
+                "id": "action_2",
+                "type": "action",
+                "config": {
+                    "type": "send_email",
+                    "config": {
+                        "to": "other@example.com",
+                        "subject": "Second",
+                        "body": "Hello",
+                    },
+                },
+            },
+        },
+        "edges": [
+            *VALID_WORKFLOW["execution_config"]["edges"],
+            {"id": "e2", "source": "trigger_1", "target": "action_2"},
+        ],
+    }
+    workflow = Workflow(
+        id=uuid4(), user_id=user.id, name="WF", description="d", config=config
+    )
+    db_session.add(workflow)
+    await db_session.flush()
+    return await WorkflowRunService.create(
+        db_session,
+        workflow_id=workflow.id,
+        user_id=user.id,
+        node_results={
+            "action_1": {"output": {"id": "m1"}, "status": "success", "error": None},
+            "action_2": {"output": None, "status": "failed", "error": "boom"},
+        },
+        status="partial",
+        prefect_run_id=prefect_run_id,
+        trigger_data={"from": "a@b.com"},
+        duration_ms=120,
+    )
+
+
+async def test_resume_run_replays_succeeded_nodes(
+    client, db_session, test_user, auth_headers
+):
+    prefect_run_id = uuid4()
+    record = await _create_failed_run(
+        db_session, test_user, prefect_run_id=prefect_run_id
+    )
+
+    with patch(
+        "orchestration.services.deployment_service.DeploymentService.run",
+        new=AsyncMock(),
+    ) as run:
+        resp = await client.post(
+            f"/api/workflow/runs/{prefect_run_id}/resume", headers=auth_headers
+        )
+
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "resumed", "replayed_nodes": ["action_1"]}
+    workflow_id, parameters = run.await_args.args
+    assert workflow_id == record.workflow_id
+    assert parameters["resume_outputs"] == {"action_1": {"id": "m1"}}
+    assert parameters["trigger_context"] == {
+        "matched_trigger_node_id": "trigger_1",
+        "original_email": {"from": "a@b.com"},
+    }
+
+
+async def test_resume_successful_run_returns_409(
+    client, db_session, test_user, auth_headers
+):
+    from workflow.models.workflow import Workflow
+
+    prefect_run_id = uuid4()
+    record = await _create_run_record(
+        db_session, test_user, prefect_run_id=prefect_run_id
+    )
+    workflow = await db_session.get(Workflow, record.workflow_id)
+    workflow.config = VALID_WORKFLOW["execution_config"]
+    await db_session.flush()
+
+    resp = await client.post(
+        f"/api/workflow/runs/{prefect_run_id}/resume", headers=auth_headers
+    )
+
+    assert resp.status_code == 409
+
+
+async def test_resume_other_user_returns_404(
+    client, db_session, second_user, auth_headers
+):
+    prefect_run_id = uuid4()
+    await _create_failed_run(db_session, second_user, prefect_run_id=prefect_run_id)
+
+    resp = await client.post(
+        f"/api/workflow/runs/{prefect_run_id}/resume", headers=auth_headers
+    )
+
+    assert resp.status_code == 404
@@ -87,9 +87,7 @@ async def test_get_undelivered_failures_scoped_to_user(
     assert rows == []
 
 
-async def test_get_by_prefect_run_id_returns_owner_record(
-    db_session, test_user, test_workflow
-):
+async def test_get_by_run_id_returns_owner_record(db_session, test_user, test_workflow):
     prefect_run_id = uuid4()
     record = await WorkflowRunService.create(
         db_session,
@@ -100,7 +98,7 @@ async def test_get_by_prefect_run_id_returns_owner_record(
         prefect_run_id=prefect_run_id,
     )
 
-    found = await WorkflowRunService.get_by_prefect_run_id(
+    found = await WorkflowRunService.get_by_run_id(
         db_session, prefect_run_id, test_user.id
     )
 
@@ -108,7 +106,7 @@ async def test_get_by_prefect_run_id_returns_owner_record(
     assert found.id == record.id
 
 
-async def test_get_by_prefect_run_id_scoped_to_user(
+async def test_get_by_run_id_scoped_to_user(
     db_session, test_user, second_user, test_workflow
 ):
     prefect_run_id = uuid4()
@@ -121,22 +119,86 @@ async def test_get_by_prefect_run_id_scoped_to_user(
         prefect_run_id=prefect_run_id,
     )
 
-    found = await WorkflowRunService.get_by_prefect_run_id(
+    found = await WorkflowRunService.get_by_run_id(
         db_session, prefect_run_id, second_user.id
     )
 
     assert found is None
 
 
-async def test_get_by_prefect_run_id_unknown_returns_none(db_session, test_user):
+async def test_get_by_run_id_unknown_returns_none(db_session, test_user):
+    assert (
+        await WorkflowRunService.get_by_run_id(db_session, uuid4(), test_user.id)
+        is None
+    )
+
+
+async def test_get_by_run_id_finds_inline_run_by_record_id(
+    db_session, test_user, test_workflow
+):
+    run_id = uuid4()
+    record = await WorkflowRunService.create(
+        db_session,
+        workflow_id=test_workflow.id,
+        user_id=test_user.id,
+        node_results=_node_results("success"),
+        status="success",
+        id=run_id,
+        inline=True,
+    )
+
+    found = await WorkflowRunService.get_by_run_id(db_session, run_id, test_user.id)
+
+    assert found is not None
+    assert found.id == record.id
+    assert found.prefect_run_id is None
+
+
+async def test_get_by_run_id_ignores_record_id_of_prefect_runs(
+    db_session, test_user, test_workflow
+):
+    record = await WorkflowRunService.create(
+        db_session,
+        workflow_id=test_workflow.id,
+        user_id=test_user.id,
+        node_results=_node_results("success"),
+        status="success",
+        prefect_run_id=uuid4(),
+    )
+
     assert (
-        await WorkflowRunService.get_by_prefect_run_id(
-            db_session, uuid4(), test_user.id
-        )
+        await WorkflowRunService.get_by_run_id(db_session, record.id, test_user.id)
         is None
     )
 
 
+async def test_get_inline_runs_lists_only_inline_runs(
+    db_session, test_user, test_workflow
+):
+    inline = await WorkflowRunService.create(
+        db_session,
+        workflow_id=test_workflow.id,
+        user_id=test_user.id,
+        node_results=_node_results("success"),
+        status="success",
+        inline=True,
+    )
+    await WorkflowRunService.create(
+        db_session,
+        workflow_id=test_workflow.id,
+        user_id=test_user.id,
+        node_results=_node_results("success"),
+        status="success",
+        prefect_run_id=uuid4(),
+    )
+
+    rows = await WorkflowRunService.get_inline_runs(
+        db_session, test_user.id, test_workflow.id
+    )
+
+    assert [r.id for r in rows] == [inline.id]
+
+
 async def test_mark_notified_flips_flag(db_session, test_user, test_workflow):
     record = await WorkflowRunService.create(
         db_session,
@@ -1,12 +1,15 @@
+import asyncio
 import base64
+import threading
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
-from sqlalchemy.exc import IntegrityError
+from googleapiclient.errors import HttpError
 
 from core.processors import GmailHistoryProcessor
+from workflow.schemas import WorkflowExecutionConfig
 from core.processors.gmail_history_processor import DeploymentTriggerError
 
 
@@ -87,6 +90,10 @@ def create_mock_workflow(active=True, trigger_from=None, trigger_subject=None):
     return workflow
 
 
+def _config(workflow):
+    return WorkflowExecutionConfig.model_validate(workflow.config)
+
+
 def create_email_payload(
     message_id, labels=None, subject="Hello", sender="test@example.com"
 ):
@@ -171,9 +178,7 @@ async def test_process_message_success_trigger(
 
     mock_db = _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[matching_workflow])
-    mock_processed_service.get_by_message_id_and_workflow_id = AsyncMock(
-        return_value=None
-    )
+    mock_processed_service.get_processed_pairs = AsyncMock(return_value=set())
 
     # The record must be created only AFTER the deployment is triggered.
     order = []
@@ -181,16 +186,18 @@ async def test_process_message_success_trigger(
     async def fake_run(*a, **k):
         order.append("trigger")
 
-    async def fake_create(*a, **k):
+    async def fake_create(_db, pairs):
         order.append("create")
+        return set(pairs)
 
     mock_deployment_service.run = AsyncMock(side_effect=fake_run)
-    mock_processed_service.create = AsyncMock(side_effect=fake_create)
+    mock_processed_service.create_many = AsyncMock(side_effect=fake_create)
 
     await processor._process_single_message(message_id)
+    await processor._flush_processed()
 
-    mock_processed_service.create.assert_called_once_with(
-        mock_db, message_id, matching_workflow.id
+    mock_processed_service.create_many.assert_called_once_with(
+        mock_db, [(message_id, matching_workflow.id)]
     )
     mock_deployment_service.run.assert_called_once()
     call_args = mock_deployment_service.run.call_args[0]
@@ -362,12 +369,12 @@ async def test_process_message_skips_mismatch_trigger(
     _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
     mock_deployment_service.run = AsyncMock()
-    mock_processed_service.create = AsyncMock()
+    mock_processed_service.create_many = AsyncMock()
 
     await processor._process_single_message(message_id)
 
     mock_deployment_service.run.assert_not_called()
-    mock_processed_service.create.assert_not_called()
+    mock_processed_service.create_many.assert_not_called()
 
 
 @patch(_DEPLOYMENT_SVC)
@@ -395,12 +402,12 @@ async def test_process_message_from_email_is_not_substring_matched(
     _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
     mock_deployment_service.run = AsyncMock()
-    mock_processed_service.create = AsyncMock()
+    mock_processed_service.create_many = AsyncMock()
 
     await processor._process_single_message(message_id)
 
     mock_deployment_service.run.assert_not_called()
-    mock_processed_service.create.assert_not_called()
+    mock_processed_service.create_many.assert_not_called()
 
 
 @patch(_DEPLOYMENT_SVC)
@@ -426,17 +433,16 @@ async def test_process_message_from_email_matches_address_inside_display_name(
 
     mock_db = _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
-    mock_processed_service.get_by_message_id_and_workflow_id = AsyncMock(
-        return_value=None
-    )
+    mock_processed_service.get_processed_pairs = AsyncMock(return_value=set())
     mock_deployment_service.run = AsyncMock()
-    mock_processed_service.create = AsyncMock()
+    mock_processed_service.create_many = AsyncMock()
 
     await processor._process_single_message(message_id)
+    await processor._flush_processed()
 
     mock_deployment_service.run.assert_called_once()
-    mock_processed_service.create.assert_called_once_with(
-        mock_db, message_id, workflow.id
+    mock_processed_service.create_many.assert_called_once_with(
+        mock_db, [(message_id, workflow.id)]
     )
 
 
@@ -463,16 +469,16 @@ async def test_process_message_skips_already_processed(
 
     _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
-    mock_processed_service.get_by_message_id_and_workflow_id = AsyncMock(
-        return_value=MagicMock()
+    mock_processed_service.get_processed_pairs = AsyncMock(
+        return_value={(message_id, workflow.id)}
     )
     mock_deployment_service.run = AsyncMock()
-    mock_processed_service.create = AsyncMock()
+    mock_processed_service.create_many = AsyncMock()
 
     await processor._process_single_message(message_id)
 
     mock_deployment_service.run.assert_not_called()
-    mock_processed_service.create.assert_not_called()
+    mock_processed_service.create_many.assert_not_called()
 
 
 @patch(_DB_SESSION)
@@ -544,16 +550,15 @@ async def test_trigger_failure_does_not_create_record_and_flags_batch(
 
     _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
-    mock_processed_service.get_by_message_id_and_workflow_id = AsyncMock(
-        return_value=None
-    )
-    mock_processed_service.create = AsyncMock()
+    mock_processed_service.get_processed_pairs = AsyncMock(return_value=set())
+    mock_processed_service.create_many = AsyncMock()
 
     mock_deployment_service.run = AsyncMock(side_effect=RuntimeError("prefect down"))
 
     await processor._process_single_message(message_id)
+    await processor._flush_processed()
 
-    mock_processed_service.create.assert_not_called()
+    mock_processed_service.create_many.assert_not_called()
     assert processor._trigger_failed is True
 
 
@@ -595,7 +600,7 @@ async def test_fetch_does_not_raise_when_all_triggers_succeed(
 @patch(_PROCESSED_SVC)
 @patch(_WORKFLOW_SVC)
 @patch(_DB_SESSION)
-async def test_create_integrity_error_is_swallowed(
+async def test_already_recorded_pair_is_not_a_failure(
     mock_db_session,
     mock_workflow_service,
     mock_processed_service,
@@ -603,33 +608,369 @@ async def test_create_integrity_error_is_swallowed(
     processor,
     mock_service,
 ):
-    """A concurrent insert (IntegrityError on create) is treated as already
-    handled — it must not propagate or flag the batch as failed."""
+    """A pair a concurrent sync recorded first (skipped by ON CONFLICT) is
+    treated as already handled — it must not raise or flag the batch."""
     message_id = "msg-dup-insert"
     email_payload = create_email_payload(message_id, sender="me@test.com")
     mock_service.users.return_value.messages.return_value.get.return_value.execute.return_value = email_payload
 
     workflow = create_mock_workflow(active=True, trigger_from="me@test.com")
 
-    mock_db = _mock_db_session_ctx(mock_db_session)
-    mock_db.rollback = AsyncMock()
+    _mock_db_session_ctx(mock_db_session)
     mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
-    mock_processed_service.get_by_message_id_and_workflow_id = AsyncMock(
-        return_value=None
-    )
-    mock_processed_service.create = AsyncMock(
-        side_effect=IntegrityError("stmt", {}, Exception("dup"))
-    )
+    mock_processed_service.get_processed_pairs = AsyncMock(return_value=set())
+    mock_processed_service.create_many = AsyncMock(return_value=set())
     mock_deployment_service.run = AsyncMock()
 
     processor._trigger_failed = False
-    await processor._process_single_message(message_id)  # must not raise
+    await processor._process_single_message(message_id)
+    await processor._flush_processed()  # must not raise
 
     mock_deployment_service.run.assert_called_once()
-    mock_db.rollback.assert_called_once()
+    mock_processed_service.create_many.assert_called_once()
+    assert processor._unmarked == []
     assert processor._trigger_failed is False
 
 
+@patch(_DEPLOYMENT_SVC)
+@patch(_PROCESSED_SVC)
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_failed_bulk_record_withholds_the_baseline(
+    mock_db_session,
+    mock_workflow_service,
+    mock_processed_service,
+    mock_deployment_service,
+    processor,
+    mock_service,
+):
+    """Triggered pairs that couldn't be recorded must not let the sync advance
+    past their messages, just like a failed trigger."""
+    _set_history_pages(mock_service, [_page(["m1"])])
+    _use_batches(mock_service, {"m1": create_email_payload("m1", sender="me@test.com")})
+    mock_service.users.return_value.messages.return_value.get.return_value.execute.return_value = _with_body(
+        create_email_payload("m1", sender="me@test.com"), "Body"
+    )
+    workflow = create_mock_workflow(active=True, trigger_from="me@test.com")
+    _mock_db_session_ctx(mock_db_session)
+    mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
+    mock_processed_service.get_processed_pairs = AsyncMock(return_value=set())
+    mock_processed_service.create_many = AsyncMock(side_effect=RuntimeError("db down"))
+    mock_deployment_service.run = AsyncMock()
+
+    with pytest.raises(DeploymentTriggerError):
+        await processor.fetch_and_process("100")
+
+    mock_deployment_service.run.assert_awaited_once()
+    mock_processed_service.create_many.assert_awaited_once()
+
+
+@patch(_DEPLOYMENT_SVC)
+@patch(_PROCESSED_SVC)
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_catch_up_dedups_and_records_each_batch_in_one_statement(
+    mock_db_session,
+    mock_workflow_service,
+    mock_processed_service,
+    mock_deployment_service,
+    processor,
+    mock_service,
+):
+    """200 new messages: one processed-pairs lookup per Gmail batch and one
+    bulk insert per batch of triggers, instead of a query and an insert each."""
+    ids = [f"m{i}" for i in range(200)]
+    _set_history_pages(mock_service, [_page(ids[:120], "p2"), _page(ids[120:])])
+    _use_batches(
+        mock_service,
+        {mid: create_email_payload(mid, sender="me@test.com") for mid in ids},
+    )
+    # The full download for the body, once a message matches.
+    mock_service.users.return_value.messages.return_value.get.return_value.execute.return_value = _with_body(
+        create_email_payload("m0", sender="me@test.com"), "Body"
+    )
+    workflow = create_mock_workflow(active=True, trigger_from="me@test.com")
+    _mock_db_session_ctx(mock_db_session)
+    mock_workflow_service.get_by_user_id = AsyncMock(return_value=[workflow])
+    mock_processed_service.get_processed_pairs = AsyncMock(
+        return_value={("m0", workflow.id)}
+    )
+    mock_processed_service.create_many = AsyncMock(return_value=set())
+    mock_deployment_service.run = AsyncMock()
+
+    with patch(f"{_BASE}.settings.gmail_batch_size", 50):
+        await processor.fetch_and_process("100")
+
+    assert mock_processed_service.get_processed_pairs.await_count == 4
+    assert mock_deployment_service.run.await_count == 199
+    recorded = [
+        pair
+        for call in mock_processed_service.create_many.await_args_list
+        for pair in call.args[1]
+    ]
+    assert sorted(recorded) == sorted((mid, workflow.id) for mid in ids[1:])
+    assert mock_processed_service.create_many.await_count <= 5
+
+
+# ---------------------------------------------------------------------------
+# Pipelined, concurrent processing
+# ---------------------------------------------------------------------------
+
+
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_messages_are_processed_concurrently_up_to_the_cap(
+    mock_db_session, mock_workflow_service, processor, mock_service
+):
+    _mock_db_session_ctx(mock_db_session)
+    mock_workflow_service.get_by_user_id = AsyncMock(return_value=[])
+    _set_history_pages(mock_service, [_page([f"m{i}" for i in range(10)])])
+    running = 0
+    peak = 0
+
+    async def fake_process(_mid, _active_workflows=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    processor._process_single_message = fake_process
+
+    with patch(f"{_BASE}.settings.gmail_sync_concurrency", 3):
+        await processor.fetch_and_process("100")
+
+    assert peak == 3
+
+
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_first_page_is_processed_while_later_pages_are_read(
+    mock_db_session, mock_workflow_service, processor, mock_service
+):
+    _mock_db_session_ctx(mock_db_session)
+    mock_workflow_service.get_by_user_id = AsyncMock(return_value=[])
+    first_processed = threading.Event()
+    pages_read = []
+
+    def list_page(**kwargs):
+        request = MagicMock()
+
+        def execute():
+            token = kwargs.get("pageToken")
+            pages_read.append(token)
+            if token is None:
+                return _page(["m1"], "t2")
+            # Page 2 is only served once page 1's message was processed.
+            assert first_processed.wait(timeout=2)
+            return _page(["m2"])
+
+        request.execute = execute
+        return request
+
+    mock_service.users.return_value.history.return_value.list.side_effect = list_page
+
+    async def fake_process(mid, _active_workflows=None):
+        if mid == "m1":
+            first_processed.set()
+
+    processor._process_single_message = fake_process
+
+    with patch(f"{_BASE}.settings.gmail_batch_size", 1):
+        await processor.fetch_and_process("100")
+
+    assert pages_read == [None, "t2"]
+
+
+async def test_history_http_error_stops_the_pipeline_and_propagates(
+    processor, mock_service
+):
+    """The drain loop resets a stale baseline on a history.list 404, so the
+    HttpError itself must come out of fetch_and_process."""
+    _set_history_pages(mock_service, [_page(["m1"], "t2"), _http_error(404)])
+    processor._process_single_message = AsyncMock()
+
+    with (
+        patch(f"{_BASE}.db_session") as mock_db_session,
+        patch(f"{_WORKFLOW_SVC}.get_by_user_id", AsyncMock(return_value=[])),
+        patch(f"{_BASE}.settings.gmail_batch_size", 1),
+        pytest.raises(HttpError),
+    ):
+        _mock_db_session_ctx(mock_db_session)
+        await processor.fetch_and_process("100")
+
+
+# ---------------------------------------------------------------------------
+# Batched message fetches
+# ---------------------------------------------------------------------------
+
+
+def _http_error(status: int) -> HttpError:
+    return HttpError(MagicMock(status=status), b"")
+
+
+class FakeBatch:
+    """Stands in for BatchHttpRequest: answers each added request on execute."""
+
+    def __init__(self, responses, callback):
+        self.responses = responses
+        self.callback = callback
+        self.request_ids = []
+
+    def add(self, _request, request_id):
+        self.request_ids.append(request_id)
+
+    def execute(self):
+        for request_id in self.request_ids:
+            result = self.responses[request_id]
+            if isinstance(result, Exception):
+                self.callback(request_id, None, result)
+            else:
+                self.callback(request_id, result, None)
+
+
+def _use_batches(mock_service, responses):
+    batches = []
+
+    def new_batch(callback):
+        batches.append(FakeBatch(responses, callback))
+        return batches[-1]
+
+    mock_service.new_batch_http_request.side_effect = new_batch
+    return batches
+
+
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_fetch_gets_messages_in_batches(
+    mock_db_session, mock_workflow_service, processor, mock_service
+):
+    _mock_db_session_ctx(mock_db_session)
+    mock_workflow_service.get_by_user_id = AsyncMock(return_value=[])
+    ids = [f"m{i}" for i in range(5)]
+    _set_history_pages(mock_service, [_page(ids)])
+    batches = _use_batches(
+        mock_service, {mid: create_email_payload(mid, labels=["SENT"]) for mid in ids}
+    )
+    get_execute = mock_service.users.return_value.messages.return_value.get.return_value.execute
+
+    with patch(f"{_BASE}.settings.gmail_batch_size", 2):
+        await processor.fetch_and_process("100")
+
+    assert [len(batch.request_ids) for batch in batches] == [2, 2, 1]
+    assert sorted(mid for batch in batches for mid in batch.request_ids) == ids
+    get_execute.assert_not_called()
+    assert processor._prefetched == {}
+
+
+async def test_batched_404_is_skipped_and_other_errors_refetch_singly(
+    processor, mock_service
+):
+    _use_batches(
+        mock_service,
+        {"gone": _http_error(404), "limited": _http_error(429)},
+    )
+    get_execute = mock_service.users.return_value.messages.return_value.get.return_value.execute
+    get_execute.return_value = create_email_payload("limited", labels=["SENT"])
+
+    await processor._prefetch_messages(["gone", "limited"])
+    await processor._process_single_message("gone")
+    await processor._process_single_message("limited")
+
+    processor.logger.warning.assert_called_once()
+    assert "gone" in processor.logger.warning.call_args[0][0]
+    # Only the rate-limited item needed its own request.
+    get_execute.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Metadata-first fetch, lazy body
+# ---------------------------------------------------------------------------
+
+
+def _serve_by_format(mock_service, metadata, full):
+    """messages.get answers format=metadata and full fetches separately."""
+    requests = {"metadata": MagicMock(), "full": MagicMock()}
+    requests["metadata"].execute.return_value = metadata
+    requests["full"].execute.return_value = full
+    mock_service.users.return_value.messages.return_value.get.side_effect = (
+        lambda **kwargs: requests[kwargs.get("format", "full")]
+    )
+    return requests
+
+
+def _with_body(payload, text):
+    payload["payload"]["body"] = {
+        "size": len(text),
+        "data": base64.urlsafe_b64encode(text.encode()).decode(),
+    }
+    return payload
+
+
+@patch(_DEPLOYMENT_SVC)
+@patch(_PROCESSED_SVC)
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_unmatched_message_never_downloads_the_body(
+    mock_db_session,
+    mock_workflow_service,
+    mock_processed_service,
+    mock_deployment_service,
+    processor,
+    mock_service,
+):
+    metadata = create_email_payload("msg-1", subject="Newsletter")
+    requests = _serve_by_format(mock_service, metadata, metadata)
+    workflow = create_mock_workflow(active=True, trigger_subject="Urgent")
+    _mock_db_session_ctx(mock_db_session)
+    mock_deployment_service.run = AsyncMock()
+
+    await processor._process_single_message("msg-1", [(workflow, _config(workflow))])
+
+    get = mock_service.users.return_value.messages.return_value.get
+    assert get.call_args.kwargs["metadataHeaders"] == [
+        "From",
+        "Subject",
+        "Message-ID",
+        "References",
+    ]
+    requests["full"].execute.assert_not_called()
+    mock_deployment_service.run.assert_not_called()
+
+
+@patch(_DEPLOYMENT_SVC)
+@patch(_PROCESSED_SVC)
+@patch(_WORKFLOW_SVC)
+@patch(_DB_SESSION)
+async def test_body_downloaded_once_for_all_matching_workflows(
+    mock_db_session,
+    mock_workflow_service,
+    mock_processed_service,
+    mock_deployment_service,
+    processor,
+    mock_service,
+):
+    metadata = create_email_payload("msg-2", sender="me@test.com")
+    full = _with_body(create_email_payload("msg-2", sender="me@test.com"), "Full text")
+    requests = _serve_by_format(mock_service, metadata, full)
+    workflows = [
+        create_mock_workflow(active=True, trigger_from="me@test.com") for _ in range(2)
+    ]
+    _mock_db_session_ctx(mock_db_session)
+    mock_processed_service.get_processed_pairs = AsyncMock(return_value=set())
+    mock_processed_service.create_many = AsyncMock()
+    mock_deployment_service.run = AsyncMock()
+
+    await processor._process_single_message(
+        "msg-2", [(w, _config(w)) for w in workflows]
+    )
+
+    requests["full"].execute.assert_called_once()
+    assert mock_deployment_service.run.call_count == 2
+    context = mock_deployment_service.run.call_args[0][1]["trigger_context"]
+    assert context["original_email"]["body"] == "Full text"
+
+
 # ---------------------------------------------------------------------------
 # _get_email_body decoding
 # ---------------------------------------------------------------------------
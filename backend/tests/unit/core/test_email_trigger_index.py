@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+from core.processors.email_trigger_index import EmailTriggerIndex
+from workflow.schemas import WorkflowExecutionConfig
+
+
+def _trigger(from_email=None, subject=None):
+    return {
+        "type": "trigger",
+        "config": {
+            "type": "email_received",
+            "config": {"from": from_email, "subject_contains": subject},
+        },
+    }
+
+
+ACTION = {
+    "id": "action_1",
+    "type": "action",
+    "config": {
+        "type": "send_email",
+        "config": {"to": "out@example.com", "subject": "Auto reply", "body": "Hi"},
+    },
+}
+
+
+def _workflow(*triggers):
+    """A workflow whose start nodes are ``triggers``, each feeding one action."""
+    nodes = {f"t{i}": {"id": f"t{i}", **trigger} for i, trigger in enumerate(triggers)}
+    edges = [
+        {"id": f"e{i}", "source": node_id, "target": "action_1"}
+        for i, node_id in enumerate(nodes)
+    ]
+    config = WorkflowExecutionConfig.model_validate(
+        {
+            "start_node_ids": list(nodes),
+            "nodes": {**nodes, "action_1": ACTION},
+            "edges": edges,
+        }
+    )
+    return MagicMock(name="workflow"), config
+
+
+def test_matches_sender_exactly_not_as_substring():
+    exact = _workflow(_trigger(from_email="Alice <Alice@Example.com>"))
+    suffix = _workflow(_trigger(from_email="ice@example.com"))
+    index = EmailTriggerIndex([exact, suffix])
+
+    assert index.match("alice@example.com", "Hi") == [(exact[0], "t0")]
+    assert index.match("Alice <ALICE@example.com>", "Hi") == [(exact[0], "t0")]
+    assert index.match("bob@example.com", "Hi") == []
+
+
+def test_subject_only_and_catch_all():
+    invoices = _workflow(_trigger(subject="Invoice"))
+    everything = _workflow(_trigger())
+    index = EmailTriggerIndex([invoices, everything])
+
+    assert index.match("a@b.com", "Your INVOICE #12") == [
+        (invoices[0], "t0"),
+        (everything[0], "t0"),
+    ]
+    assert index.match("a@b.com", "Receipt") == [(everything[0], "t0")]
+
+
+def test_sender_and_subject_must_both_match():
+    workflow = _workflow(_trigger(from_email="billing@shop.com", subject="refund"))
+    index = EmailTriggerIndex([workflow])
+
+    assert index.match("billing@shop.com", "Refund issued") == [(workflow[0], "t0")]
+    assert index.match("billing@shop.com", "Order shipped") == []
+    assert index.match("other@shop.com", "Refund issued") == []
+
+
+def test_first_matching_start_node_wins_per_workflow():
+    workflow = _workflow(
+        _trigger(from_email="a@b.com", subject="nope"),
+        _trigger(subject="report"),
+        _trigger(),
+    )
+    index = EmailTriggerIndex([workflow])
+
+    assert index.match("a@b.com", "Weekly report") == [(workflow[0], "t1")]
+    assert index.match("a@b.com", "Hello") == [(workflow[0], "t2")]
+
+
+def test_ignores_non_email_start_nodes():
+    workflow = _workflow(
+        {"type": "trigger", "config": {"type": "webhook", "config": {}}}
+    )
+
+    assert EmailTriggerIndex([workflow]).match("a@b.com", "Hi") == []
@@ -0,0 +1,85 @@
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.events import (
+    MAX_NOTIFY_BYTES,
+    EventBuffer,
+    pack_events,
+    publish_events,
+    unpack_events,
+)
+
+
+def _event(i: int, **extra) -> dict:
+    return {"type": "node_completed", "user_id": "u1", "node_id": f"n{i}", **extra}
+
+
+def _fake_session(db):
+    @asynccontextmanager
+    async def session():
+        yield db
+
+    return session
+
+
+def test_single_event_is_sent_bare():
+    (message,) = pack_events([_event(1)])
+    assert json.loads(message) == _event(1)
+
+
+def test_events_coalesce_into_one_message_in_order():
+    events = [_event(i) for i in range(5)]
+    (message,) = pack_events(events)
+    assert unpack_events(json.loads(message)) == events
+
+
+def test_large_batches_split_under_notify_limit():
+    events = [_event(i, error="x" * 400) for i in range(100)]
+    messages = pack_events(events)
+
+    assert len(messages) > 1
+    assert all(len(m.encode()) <= MAX_NOTIFY_BYTES for m in messages)
+    unpacked = [e for m in messages for e in unpack_events(json.loads(m))]
+    assert [e["node_id"] for e in unpacked] == [f"n{i}" for i in range(100)]
+
+
+def test_oversized_event_is_dropped_not_the_batch():
+    huge = _event(1, node_type="y" * MAX_NOTIFY_BYTES)
+    messages = pack_events([_event(0), huge, _event(2)])
+    unpacked = [e for m in messages for e in unpack_events(json.loads(m))]
+    assert [e["node_id"] for e in unpacked] == ["n0", "n2"]
+
+
+async def test_publish_events_uses_one_transaction():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    with patch("core.events.db_session", _fake_session(db)):
+        await publish_events([_event(i) for i in range(3)])
+
+    db.execute.assert_awaited_once()
+    db.commit.assert_awaited_once()
+
+
+async def test_publish_events_is_best_effort():
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=RuntimeError("db down"))
+
+    with patch("core.events.db_session", _fake_session(db)):
+        # Must not raise.
+        await publish_events([_event(1)])
+
+
+async def test_buffer_flush_publishes_pending_once():
+    buffer = EventBuffer()
+    buffer.add(_event(1))
+    buffer.add(_event(2))
+
+    with patch("core.events.publish_events", new=AsyncMock()) as publish:
+        await buffer.flush()
+        await buffer.flush()
+
+    publish.assert_awaited_once_with([_event(1), _event(2)])
+    assert len(buffer) == 0
@@ -0,0 +1,51 @@
+import pytest
+
+from orchestration.engine import ActionLimiter
+
+
+def test_resource_group_limit_spans_action_types():
+    limiter = ActionLimiter({"gmail": 2})
+
+    assert limiter.try_acquire("send_email")
+    assert limiter.try_acquire("label_email")
+    assert not limiter.try_acquire("reply_email")
+    # Other resources are unaffected.
+    assert limiter.try_acquire("smart_draft")
+
+    limiter.release("send_email")
+    assert limiter.try_acquire("reply_email")
+
+
+def test_action_type_limit():
+    limiter = ActionLimiter({"send_email": 1})
+
+    assert limiter.try_acquire("send_email")
+    assert not limiter.try_acquire("send_email")
+    assert limiter.try_acquire("label_email")
+
+
+def test_per_user_limit_caps_all_actions():
+    limiter = ActionLimiter({}, per_user=2)
+
+    assert limiter.try_acquire("send_email")
+    assert limiter.try_acquire("smart_draft")
+    assert not limiter.try_acquire("label_email")
+
+    limiter.release("smart_draft")
+    assert limiter.try_acquire("label_email")
+
+
+def test_rejected_acquire_takes_no_slots():
+    limiter = ActionLimiter({"gmail": 5, "send_email": 1})
+    assert limiter.try_acquire("send_email")
+    assert not limiter.try_acquire("send_email")
+
+    # The failed attempt must not have consumed a "gmail" slot.
+    for _ in range(4):
+        assert limiter.try_acquire("label_email")
+    assert not limiter.try_acquire("label_email")
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        ActionLimiter({"gmail": 0})
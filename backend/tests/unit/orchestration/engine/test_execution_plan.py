@@ -0,0 +1,129 @@
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from orchestration.engine import (
+    clear_execution_plan_cache,
+    compile_execution_plan,
+    get_execution_plan,
+)
+from orchestration.engine import execution_plan as plan_module
+from tests import workflow_factories as factories
+from tests.workflow_factories import action, condition, send_email, trigger
+
+
+def make_workflow(subject: str = "Hi") -> dict:
+    """trigger → condition → (true) send_email, (false) reply_email."""
+    return factories.make_workflow(
+        [
+            trigger("trigger_1"),
+            condition("cond_1", "{{trigger_1.subject}}", "contains", "invoice"),
+            send_email("send", subject, "x"),
+            action("reply", "reply_email", body="Thanks"),
+        ],
+        [
+            ("trigger_1", "cond_1"),
+            ("cond_1", "send", "true_path"),
+            ("cond_1", "reply", "false_path"),
+        ],
+        name="Plan Test",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_execution_plan_cache()
+    yield
+    clear_execution_plan_cache()
+
+
+def test_plan_resolves_adjacency_and_topological_order():
+    plan = compile_execution_plan(make_workflow())
+
+    assert plan.name == "Plan Test"
+    assert [e.target for e in plan.adjacency["trigger_1"]] == ["cond_1"]
+    order = plan.topological_order
+    assert order[0] == "trigger_1"
+    assert order.index("cond_1") < order.index("send")
+    assert order.index("cond_1") < order.index("reply")
+
+
+def test_plan_resolves_per_node_dispatch_info():
+    plan = compile_execution_plan(make_workflow())
+
+    assert plan.nodes["trigger_1"].action_type is None
+    assert plan.nodes["send"].action_type == "send_email"
+    assert plan.nodes["send"].requires_email is False
+    assert plan.nodes["reply"].requires_email is True
+    assert plan.nodes["cond_1"].in_degree == 1
+    assert plan.nodes["trigger_1"].in_degree == 0
+
+
+def test_warm_lookup_skips_validation():
+    data = make_workflow()
+    first = get_execution_plan(data, "wf-1")
+
+    with patch.object(plan_module, "compile_execution_plan") as compile_mock:
+        second = get_execution_plan(data, "wf-1")
+
+    compile_mock.assert_not_called()
+    assert second is first
+
+
+def test_changed_config_recompiles():
+    first = get_execution_plan(make_workflow("v1"), "wf-1")
+    second = get_execution_plan(make_workflow("v2"), "wf-1")
+
+    assert second is not first
+    assert second.nodes["send"].node.config.config.subject == "v2"
+
+
+def test_same_config_different_workflow_ids_are_distinct_entries():
+    data = make_workflow()
+
+    assert get_execution_plan(data, "wf-1") is not get_execution_plan(data, "wf-2")
+
+
+def test_invalid_workflow_raises_and_is_not_cached():
+    with pytest.raises(ValidationError, match="execution_config"):
+        get_execution_plan({"bad": "data"}, "wf-1")
+
+    assert len(plan_module._plan_cache) == 0
+
+
+def test_only_template_fields_are_rendered():
+    plan = compile_execution_plan(make_workflow(subject="Re: {{trigger_1.subject}}"))
+    send = plan.nodes["send"]
+
+    assert send.template_fields == ("subject",)
+    rendered = send.render_config({"trigger_1": {"subject": "Invoice"}})
+
+    assert rendered.subject == "Re: Invoice"
+    assert rendered.to == "a@example.com"
+    # The plan's own config keeps its template for the next run.
+    assert send.node.config.config.subject == "Re: {{trigger_1.subject}}"
+
+
+def test_action_without_templates_skips_resolution():
+    plan = compile_execution_plan(make_workflow())
+    reply = plan.nodes["reply"]
+
+    assert reply.template_fields == ()
+    assert reply.render_config({}) is reply.node.config.config
+
+
+def test_untouched_fields_are_not_revalidated():
+    workflow = make_workflow()
+    workflow["execution_config"]["nodes"]["reply"]["config"] = {
+        "type": "label_email",
+        "config": {"label_name": "{{trigger_1.subject}}"},
+    }
+    label = compile_execution_plan(workflow).nodes["reply"]
+
+    with patch("workflow.schemas.action.clamp_background_color") as clamp:
+        rendered = label.render_config({"trigger_1": {"subject": "Offers"}})
+
+    assert rendered.label_name == "Offers"
+    assert rendered.background_color == label.node.config.config.background_color
+    clamp.assert_not_called()
@@ -0,0 +1,79 @@
+from orchestration.engine import compile_execution_plan
+from orchestration.engine.output_references import (
+    analyze_references,
+    project,
+    trim_output,
+)
+from tests import workflow_factories as factories
+from tests.workflow_factories import condition, send_email, trigger
+
+
+def make_workflow() -> dict:
+    """trigger → draft → cond → send, with cond and send reading draft's output."""
+    return factories.make_workflow(
+        [
+            trigger("trigger_1"),
+            send_email("draft", "Re: {{trigger_1.subject}}", "Hello"),
+            condition("cond", "{{node_outputs.draft.labelIds}}", "contains", "SENT"),
+            send_email(
+                "send",
+                "Sent {{node_outputs.draft.id}}",
+                "{{node_outputs.draft.payload.snippet | 'none'}}",
+            ),
+        ],
+        [
+            ("trigger_1", "draft"),
+            ("draft", "cond"),
+            ("cond", "send", "true_path"),
+        ],
+    )
+
+
+def test_plan_collects_output_references_from_actions_and_conditions():
+    references = compile_execution_plan(make_workflow()).references
+
+    assert references.paths == {
+        "draft": {("labelIds",), ("id",), ("payload", "snippet")}
+    }
+    assert references.consumers == {"draft": {"cond", "send"}}
+    assert references.inputs == {"cond": {"draft"}, "send": {"draft"}}
+    assert references.keep_all is False
+
+
+def test_trigger_references_are_not_output_references():
+    references = analyze_references({"a": ["{{trigger_1.subject}} {{trigger.body}}"]})
+
+    assert references.paths == {}
+    assert references.inputs == {}
+
+
+def test_whole_output_and_bare_node_outputs_references():
+    references = analyze_references(
+        {"a": ["{{node_outputs.x}}"], "b": ["{{node_outputs}}"]}
+    )
+
+    assert references.paths == {"x": {()}}
+    assert references.keep_all is True
+
+
+def test_project_keeps_only_referenced_fields():
+    output = {"id": "1", "payload": {"snippet": "hi", "body": "x" * 100}, "raw": "y"}
+
+    assert project(output, [("id",), ("payload", "snippet")]) == {
+        "id": "1",
+        "payload": {"snippet": "hi"},
+    }
+    assert project(output, [()]) is output
+    assert project(output, [("missing",)]) == {}
+
+
+def test_trim_output_cuts_long_strings_but_keeps_referenced_ones():
+    output = {"body": "a" * 50, "draft": "b" * 50, "items": ["c" * 50], "n": 3}
+
+    trimmed = trim_output(output, 10, [("draft",)])
+
+    assert trimmed["body"] == "a" * 10 + "… [40 more characters]"
+    assert trimmed["draft"] == "b" * 50
+    assert trimmed["items"] == ["c" * 10 + "… [40 more characters]"]
+    assert trimmed["n"] == 3
+    assert trim_output(output, 0) is output
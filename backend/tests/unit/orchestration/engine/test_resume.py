@@ -0,0 +1,67 @@
+import pytest
+
+from orchestration.engine import ResumeError, build_resume_parameters
+from orchestration.engine.resume import matched_trigger_node_id
+from tests import workflow_factories as factories
+from tests.workflow_factories import send_email, trigger
+
+
+def make_plan(trigger_type: str = "email_received"):
+    """Two triggers, each with its own action: t1 → a1, t2 → a2 → a3."""
+    return factories.make_plan(
+        [
+            trigger("t1"),
+            trigger("t2", trigger_type),
+            send_email("a1"),
+            send_email("a2"),
+            send_email("a3"),
+        ],
+        [("t1", "a1"), ("t2", "a2"), ("a2", "a3")],
+    )
+
+
+def test_parameters_replay_successes_and_rebuild_trigger_context():
+    results = {
+        "a2": {"output": {"id": "m2"}, "status": "success", "error": None},
+        "a3": {"output": None, "status": "failed", "error": "boom"},
+    }
+
+    params = build_resume_parameters(make_plan(), results, {"subject": "Hi"})
+
+    assert params["resume_outputs"] == {"a2": {"id": "m2"}}
+    assert params["trigger_context"] == {
+        "matched_trigger_node_id": "t2",
+        "original_email": {"subject": "Hi"},
+    }
+
+
+def test_webhook_trigger_payload_is_restored_as_webhook_payload():
+    results = {"a2": {"output": None, "status": "failed", "error": "boom"}}
+
+    params = build_resume_parameters(make_plan("webhook"), results, {"body": {}})
+
+    assert params["trigger_context"]["webhook_payload"] == {"body": {}}
+    assert "original_email" not in params["trigger_context"]
+
+
+def test_nodes_removed_from_the_workflow_are_not_replayed():
+    results = {
+        "gone": {"output": {}, "status": "success", "error": None},
+        "a1": {"output": None, "status": "failed", "error": "boom"},
+    }
+
+    params = build_resume_parameters(make_plan(), results, None)
+
+    assert params["resume_outputs"] == {}
+    assert params["trigger_context"] == {"matched_trigger_node_id": "t1"}
+
+
+def test_run_without_failures_cannot_be_resumed():
+    results = {"a1": {"output": {}, "status": "success", "error": None}}
+
+    with pytest.raises(ResumeError):
+        build_resume_parameters(make_plan(), results, None)
+
+
+def test_matched_trigger_defaults_to_first_start_node():
+    assert matched_trigger_node_id(make_plan(), {}) == "t1"
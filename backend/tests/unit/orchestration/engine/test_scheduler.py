@@ -0,0 +1,169 @@
+from orchestration.engine import DagScheduler
+from tests.workflow_factories import condition, make_plan, send_email, trigger
+
+
+def _condition(node_id: str) -> dict:
+    return condition(node_id, "{{t.x}}")
+
+
+def drain(scheduler: DagScheduler) -> list:
+    ready = []
+    while scheduler.has_ready():
+        ready.append(scheduler.pop_ready())
+    return ready
+
+
+def test_siblings_become_ready_together():
+    plan = make_plan(
+        [trigger("t"), send_email("a"), send_email("b")],
+        [("t", "a", None), ("t", "b", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+
+    assert drain(scheduler) == ["t"]
+    scheduler.complete("t")
+    assert sorted(drain(scheduler)) == ["a", "b"]
+
+
+def test_child_starts_without_waiting_for_unrelated_sibling():
+    # t → slow, t → fast → child: child is ready while slow is still running.
+    plan = make_plan(
+        [trigger("t"), send_email("slow"), send_email("fast"), send_email("child")],
+        [("t", "slow", None), ("t", "fast", None), ("fast", "child", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    drain(scheduler)
+
+    scheduler.complete("fast")
+
+    assert drain(scheduler) == ["child"]
+
+
+def test_join_waits_for_every_parent():
+    # t → a → b → join and t → join: join must wait for the deeper parent b.
+    plan = make_plan(
+        [trigger("t"), send_email("a"), send_email("b"), send_email("join")],
+        [("t", "a", None), ("a", "b", None), ("b", "join", None), ("t", "join", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    assert drain(scheduler) == ["a"]
+
+    scheduler.complete("a")
+    assert drain(scheduler) == ["b"]
+    scheduler.complete("b")
+    assert drain(scheduler) == ["join"]
+
+
+def test_join_runs_when_one_parent_failed():
+    plan = make_plan(
+        [trigger("t"), send_email("a"), send_email("b"), send_email("join")],
+        [("t", "a", None), ("t", "b", None), ("a", "join", None), ("b", "join", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    drain(scheduler)
+
+    scheduler.fail("b")
+    assert drain(scheduler) == []
+    scheduler.complete("a")
+    assert drain(scheduler) == ["join"]
+
+
+def test_failed_node_prunes_its_descendants():
+    plan = make_plan(
+        [trigger("t"), send_email("a"), send_email("b"), send_email("c")],
+        [("t", "a", None), ("a", "b", None), ("b", "c", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    drain(scheduler)
+
+    scheduler.fail("a")
+
+    assert not scheduler.has_ready()
+
+
+def test_condition_only_takes_matching_handle_and_skips_the_other_branch():
+    # The false branch is skipped, and the skip cascades into the join so it
+    # only waits on the true branch.
+    plan = make_plan(
+        [
+            trigger("t"),
+            _condition("c"),
+            send_email("yes"),
+            send_email("no"),
+            send_email("j"),
+        ],
+        [
+            ("t", "c", None),
+            ("c", "yes", "true_path"),
+            ("c", "no", "false_path"),
+            ("yes", "j", None),
+            ("no", "j", None),
+        ],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    drain(scheduler)
+
+    assert scheduler.complete("c", handle="true_path") == 1
+    assert drain(scheduler) == ["yes"]
+    scheduler.complete("yes")
+    assert drain(scheduler) == ["j"]
+
+
+def test_unmatched_trigger_does_not_block_shared_downstream():
+    plan = make_plan(
+        [trigger("t"), trigger("t2"), send_email("a")],
+        [("t", "a", None), ("t2", "a", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+
+    scheduler.complete("t")
+
+    assert drain(scheduler) == ["a"]
+
+
+def test_long_skipped_chain_does_not_recurse():
+    length = 5_000
+    nodes = [trigger("t"), _condition("c")] + [
+        send_email(f"n{i}") for i in range(length)
+    ]
+    edges = [("t", "c", None), ("c", "n0", "false_path")] + [
+        (f"n{i}", f"n{i + 1}", None) for i in range(length - 1)
+    ]
+    scheduler = DagScheduler(make_plan(nodes, edges), "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    drain(scheduler)
+
+    scheduler.complete("c", handle="true_path")
+
+    assert not scheduler.has_ready()
+
+
+def test_join_records_barrier_timestamps():
+    # t → a → join and t → join: join is activated by t's edge but only
+    # queued once a settles.
+    plan = make_plan(
+        [trigger("t"), send_email("a"), send_email("join")],
+        [("t", "a", None), ("a", "join", None), ("t", "join", None)],
+    )
+    scheduler = DagScheduler(plan, "t")
+    drain(scheduler)
+    scheduler.complete("t")
+    drain(scheduler)
+    assert "join" in scheduler.activated_at
+    assert "join" not in scheduler.ready_at
+
+    scheduler.complete("a")
+    assert drain(scheduler) == ["join"]
+    assert scheduler.ready_at["join"] >= scheduler.activated_at["join"]
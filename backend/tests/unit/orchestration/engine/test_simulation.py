@@ -0,0 +1,114 @@
+import random
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from orchestration.engine import SimulationProfile, StubAction
+from orchestration.flows import execute_workflow_dry_run
+from tests.workflow_factories import (
+    action,
+    condition,
+    make_workflow,
+    send_email,
+    trigger,
+)
+
+
+def _workflow() -> dict:
+    """trigger → condition(subject contains invoice) → true: send_email, false: label."""
+    return make_workflow(
+        [
+            trigger("t1"),
+            condition("cond", "{{t1.subject}}", "contains", "invoice"),
+            send_email("send", "Re: {{t1.subject}}", "thanks", "bob@example.com"),
+            action("label", "label_email", label_name="Other"),
+        ],
+        [
+            ("t1", "cond"),
+            ("cond", "send", "true_path"),
+            ("cond", "label", "false_path"),
+        ],
+        name="Dry run",
+        description="Dry run test",
+    )
+
+
+def _ctx(subject="Invoice 42") -> dict:
+    return {
+        "trigger_context": {
+            "matched_trigger_node_id": "t1",
+            "original_email": {
+                "from": "alice@example.com",
+                "subject": subject,
+                "message_id": "m1",
+            },
+        }
+    }
+
+
+async def test_dry_run_routes_and_audits_without_real_actions():
+    with (
+        patch("orchestration.flows.master_flow.send_message_async") as real_send,
+        patch("core.events.publish_events", new=AsyncMock()) as notify,
+    ):
+        result = await execute_workflow_dry_run(uuid4(), _workflow(), _ctx())
+
+    real_send.assert_not_called()
+    notify.assert_not_awaited()
+    assert result.status == "success"
+    assert set(result.node_results) == {"cond", "send"}
+    assert result.node_results["send"]["output"]["action_type"] == "send_email"
+    assert result.node_results["send"]["timing"]["duration_ms"] is not None
+    assert [e["type"] for e in result.events][-1] == "flow_finished"
+
+
+async def test_dry_run_stub_receives_resolved_false_branch():
+    result = await execute_workflow_dry_run(uuid4(), _workflow(), _ctx("Hello"))
+
+    assert "label" in result.node_results
+    assert "send" not in result.node_results
+
+
+async def test_injected_failures_fail_the_node_not_the_call():
+    profile = SimulationProfile(
+        stubs={"send_email": StubAction(failure_rate=1.0, error="smtp down")}
+    )
+
+    result = await execute_workflow_dry_run(
+        uuid4(), _workflow(), _ctx(), profile=profile
+    )
+
+    assert result.status == "partial"
+    assert result.node_results["send"]["error"] == "smtp down"
+    assert any(e["type"] == "node_failed" for e in result.events)
+
+
+async def test_stub_latency_is_applied():
+    profile = SimulationProfile(default=StubAction(latency_ms=30))
+
+    result = await execute_workflow_dry_run(
+        uuid4(), _workflow(), _ctx(), profile=profile
+    )
+
+    assert result.node_results["send"]["timing"]["duration_ms"] >= 25
+
+
+def test_latency_distributions():
+    rng = random.Random(1)
+    assert StubAction(50).sample_latency(rng) == 0.05
+
+    uniform = StubAction(50, jitter_ms=10, distribution="uniform")
+    samples = [uniform.sample_latency(rng) for _ in range(200)]
+    assert all(0.04 <= s <= 0.06 for s in samples)
+
+    exponential = StubAction(50, distribution="exponential")
+    mean = sum(exponential.sample_latency(rng) for _ in range(2000)) / 2000
+    assert 0.04 < mean < 0.06
+
+
+def test_invalid_stub_config_is_rejected():
+    with pytest.raises(ValueError):
+        StubAction(failure_rate=1.5)
+    with pytest.raises(ValueError):
+        StubAction(latency_ms=-1)
@@ -56,3 +56,20 @@ def test_non_serializable_output_is_coerced_to_str():
 
     assert status == "success"
     assert node_results["a"]["output"] == "weird-repr"
+
+
+def test_timings_are_attached_per_node():
+    from orchestration.engine.timing import NodeTiming
+
+    timing = NodeTiming("action", "send_email", activated_at=1.0, queued_at=1.5)
+    timing.started_at = 2.0
+    timing.finished_at = 2.25
+
+    node_results, _ = build_run_audit({"a": {"id": "1"}}, {}, {"a": timing})
+
+    recorded = node_results["a"]["timing"]
+    assert recorded["action_type"] == "send_email"
+    assert recorded["duration_ms"] == 250.0
+    assert recorded["queue_ms"] == 500.0
+    assert recorded["barrier_wait_ms"] == 500.0
+    assert recorded["started_at"].startswith("1970-01-01T00:00:02")
@@ -0,0 +1,15 @@
+from unittest.mock import AsyncMock, patch
+
+from orchestration.flows.cleanup_payloads_flow import cleanup_expired_trigger_payloads
+
+
+async def test_purges_expired_trigger_payloads():
+    purge = AsyncMock(return_value=2)
+
+    with patch(
+        "orchestration.flows.cleanup_payloads_flow.TriggerPayloadService.purge_expired",
+        purge,
+    ):
+        await cleanup_expired_trigger_payloads.fn()
+
+    purge.assert_awaited_once()
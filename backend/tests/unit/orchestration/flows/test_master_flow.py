@@ -1,8 +1,21 @@
-from typing import Optional
-from unittest.mock import MagicMock, patch
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
-from orchestration.flows.master_flow import execute_automation_flow
+from prefect.futures import PrefectConcurrentFuture
+
+from core.config_loader import settings
+from orchestration.engine import compile_execution_plan
+from orchestration.flows.master_flow import (
+    _WorkflowRun,
+    execute_automation_flow,
+    execute_automation_flow_async,
+)
+from tests.workflow_factories import action, make_workflow, send_email, trigger
 
 
 # ---------------------------------------------------------------------------
@@ -603,3 +616,434 @@ def test_invalid_workflow_data_raises():
 
     with pytest.raises(Exception, match="Invalid workflow data"):
         execute_automation_flow.fn(USER_ID, {"bad": "data"}, None)
+
+
+# ---------------------------------------------------------------------------
+# Dependency-driven scheduling — a node starts as soon as its own parents are
+# done, not when the whole BFS wave (including a slow unrelated sibling) is.
+# ---------------------------------------------------------------------------
+
+
+def task_future(
+    fn: Callable[[], dict], pool: Optional[ThreadPoolExecutor] = None
+) -> PrefectConcurrentFuture:
+    """The future Prefect's ThreadPoolTaskRunner hands back, running ``fn`` on
+    ``pool`` (or right away without one), so the flow's completion-order wait
+    goes through Prefect's own future."""
+    if pool is not None:
+        wrapped = pool.submit(fn)
+    else:
+        wrapped = Future()
+        try:
+            wrapped.set_result(fn())
+        except Exception as e:
+            wrapped.set_exception(e)
+    return PrefectConcurrentFuture(task_run_id=uuid4(), wrapped_future=wrapped)
+
+
+def make_unbalanced_workflow() -> dict:
+    """trigger → slow (smart_draft); trigger → fast → fast_child (send_email)."""
+    return make_workflow(
+        [
+            trigger("trigger_1"),
+            send_email("node_a", "A", "ok", "a@example.com"),
+            action("node_b", "smart_draft", user_prompt="draft it"),
+            send_email("fast_child", "C", "ok", "child@example.com"),
+        ],
+        [
+            ("trigger_1", "node_a"),
+            ("trigger_1", "node_b"),
+            ("node_a", "fast_child"),
+        ],
+    )
+
+
+def test_fast_branch_child_starts_before_slow_sibling_finishes():
+    child_submitted = threading.Event()
+    slow_saw_child = []
+
+    def slow_draft():
+        # Under wave barriers the child can't be submitted until this returns,
+        # so the wait would time out.
+        slow_saw_child.append(child_submitted.wait(timeout=5))
+        return {"id": "draft"}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        mock_send = MagicMock()
+
+        def fake_send(_user_id, to, *_args):
+            if to == "child@example.com":
+                child_submitted.set()
+            return task_future(lambda: {"id": f"sent-{to}"}, pool)
+
+        mock_send.submit.side_effect = fake_send
+        mock_draft = MagicMock()
+        mock_draft.submit.side_effect = lambda *a: task_future(slow_draft, pool)
+
+        with (
+            patch("orchestration.flows.master_flow.send_message", mock_send),
+            patch("orchestration.flows.master_flow.smart_draft", mock_draft),
+        ):
+            execute_automation_flow.fn(
+                USER_ID, make_unbalanced_workflow(), make_trigger_context("trigger_1")
+            )
+
+    assert slow_saw_child == [True]
+    assert mock_send.submit.call_count == 2
+
+
+def test_join_node_waits_for_its_deeper_parent():
+    """trigger → A → B → C and trigger → C: C must not start before B is done."""
+    workflow = make_workflow(
+        [
+            trigger("trigger_1"),
+            *(
+                send_email(node_id, node_id, "ok", f"{node_id}@example.com")
+                for node_id in ("node_a", "node_b", "node_c")
+            ),
+        ],
+        [
+            ("trigger_1", "node_a"),
+            ("node_a", "node_b"),
+            ("node_b", "node_c"),
+            ("trigger_1", "node_c"),
+        ],
+    )
+
+    events = []
+    mock_send = MagicMock()
+
+    def fake_submit(_user_id, to, *_args):
+        events.append(f"submit:{to}")
+        return task_future(lambda: events.append(f"result:{to}") or {})
+
+    mock_send.submit.side_effect = fake_submit
+
+    with patch("orchestration.flows.master_flow.send_message", mock_send):
+        execute_automation_flow.fn(USER_ID, workflow, make_trigger_context("trigger_1"))
+
+    assert events.index("result:node_b@example.com") < events.index(
+        "submit:node_c@example.com"
+    )
+    assert events.count("submit:node_c@example.com") == 1
+
+
+# ---------------------------------------------------------------------------
+# Async master flow — same executor semantics, async tasks on one event loop.
+# ---------------------------------------------------------------------------
+
+
+async def test_async_flow_awaits_async_send_task():
+    mock_send = AsyncMock(return_value={"id": "sent_async"})
+
+    with patch("orchestration.flows.master_flow.send_message_async", mock_send):
+        await execute_automation_flow_async.fn(
+            USER_ID, make_send_email_workflow(), make_trigger_context("trigger_1")
+        )
+
+    mock_send.assert_awaited_once()
+    args = mock_send.await_args[0]
+    assert args[0] == USER_ID
+    assert args[1] == "bob@example.com"
+
+
+async def test_async_flow_runs_siblings_concurrently():
+    both_started = asyncio.Event()
+    started = []
+
+    async def record(name):
+        started.append(name)
+        if len(started) == 2:
+            both_started.set()
+        # Each sibling only returns once the other has started too.
+        await asyncio.wait_for(both_started.wait(), timeout=5)
+        return {"id": name}
+
+    async def fake_send(*_args):
+        return await record("send")
+
+    async def fake_draft(*_args):
+        return await record("draft")
+
+    mock_send = AsyncMock(side_effect=fake_send)
+    mock_draft = AsyncMock(side_effect=fake_draft)
+
+    with (
+        patch("orchestration.flows.master_flow.send_message_async", mock_send),
+        patch("orchestration.flows.master_flow.smart_draft_async", mock_draft),
+    ):
+        await execute_automation_flow_async.fn(
+            USER_ID,
+            make_parallel_siblings_workflow(),
+            make_trigger_context("trigger_1"),
+        )
+
+    assert sorted(started) == ["draft", "send"]
+
+
+async def test_async_flow_failed_action_fails_run():
+    import pytest
+
+    mock_send = AsyncMock(side_effect=RuntimeError("Gmail down"))
+
+    with patch("orchestration.flows.master_flow.send_message_async", mock_send):
+        with pytest.raises(RuntimeError, match="action_1: Gmail down"):
+            await execute_automation_flow_async.fn(
+                USER_ID, make_send_email_workflow(), make_trigger_context("trigger_1")
+            )
+
+
+def test_events_are_published_per_wave_and_flushed_at_finish():
+    mock_send = mock_task({"id": "sent"})
+    publish = AsyncMock()
+
+    with (
+        patch("orchestration.flows.master_flow.send_message", mock_send),
+        patch("core.events.publish_events", publish),
+    ):
+        execute_automation_flow.fn(
+            USER_ID, make_send_email_workflow(), make_trigger_context("trigger_1")
+        )
+
+    batches = [c.args[0] for c in publish.await_args_list]
+    # One wave (action submitted) + the final flush; never one call per event.
+    assert [[e["type"] for e in batch] for batch in batches] == [
+        ["node_started"],
+        ["node_completed", "flow_finished"],
+    ]
+
+
+def test_node_completed_events_carry_timing():
+    mock_send = mock_task({"id": "sent"})
+    publish = AsyncMock()
+
+    with (
+        patch("orchestration.flows.master_flow.send_message", mock_send),
+        patch("core.events.publish_events", publish),
+    ):
+        execute_automation_flow.fn(
+            USER_ID, make_send_email_workflow(), make_trigger_context("trigger_1")
+        )
+
+    events = [e for c in publish.await_args_list for e in c.args[0]]
+    (completed,) = [e for e in events if e["type"] == "node_completed"]
+    timing = completed["timing"]
+    assert timing["action_type"] == "send_email"
+    assert timing["duration_ms"] >= 0
+    assert timing["resolve_ms"] is not None
+    assert timing["started_at"] <= timing["finished_at"]
+
+
+# ---------------------------------------------------------------------------
+# Per-action-type concurrency limits — a wide fan-out is throttled by the
+# executor instead of firing every Gmail call at once.
+# ---------------------------------------------------------------------------
+
+
+def make_fan_out_workflow(width: int) -> dict:
+    """trigger → ``width`` independent send_email actions."""
+    sends = [
+        send_email(f"send_{i}", "Hi", "Hello", "bob@example.com") for i in range(width)
+    ]
+    return make_workflow(
+        [trigger("trigger_1"), *sends],
+        [("trigger_1", node["id"]) for node in sends],
+    )
+
+
+async def test_gmail_fan_out_respects_concurrency_limit():
+    running = 0
+    peak = 0
+
+    async def fake_send(*_args):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"id": "sent"}
+
+    mock_send = AsyncMock(side_effect=fake_send)
+
+    with (
+        patch("orchestration.flows.master_flow.send_message_async", mock_send),
+        patch(
+            "orchestration.flows.master_flow.settings.action_concurrency_limits",
+            {"gmail": 3},
+        ),
+    ):
+        await execute_automation_flow_async.fn(
+            USER_ID, make_fan_out_workflow(10), make_trigger_context("trigger_1")
+        )
+
+    assert mock_send.await_count == 10
+    assert peak == 3
+
+
+def test_sync_flow_throttles_submissions():
+    mock_send = MagicMock()
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def send():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return {"id": "x"}
+
+    with (
+        ThreadPoolExecutor(max_workers=6) as pool,
+        patch("orchestration.flows.master_flow.send_message", mock_send),
+        patch(
+            "orchestration.flows.master_flow.settings.action_concurrency_limits",
+            {"send_email": 2},
+        ),
+    ):
+        mock_send.submit.side_effect = lambda *_args: task_future(send, pool)
+        execute_automation_flow.fn(
+            USER_ID, make_fan_out_workflow(6), make_trigger_context("trigger_1")
+        )
+
+    assert mock_send.submit.call_count == 6
+    assert peak == 2
+
+
+# ---------------------------------------------------------------------------
+# Resuming a failed run — recorded outputs are replayed, not re-executed
+# ---------------------------------------------------------------------------
+
+
+def make_chain_workflow() -> dict:
+    """trigger → node_a → node_b, where node_b uses node_a's output."""
+    return make_workflow(
+        [
+            trigger("trigger_1"),
+            send_email("node_a", "Hi", "Hello", "bob@example.com"),
+            send_email(
+                "node_b",
+                "Follow-up",
+                "Sent {{node_outputs.node_a.id}}",
+                "b@example.com",
+            ),
+        ],
+        [("trigger_1", "node_a"), ("node_a", "node_b")],
+    )
+
+
+def test_resume_reexecutes_only_the_failed_nodes():
+    mock_send = mock_task({"id": "sent_b"})
+
+    with patch("orchestration.flows.master_flow.send_message", mock_send):
+        execute_automation_flow.fn(
+            USER_ID,
+            make_chain_workflow(),
+            make_trigger_context("trigger_1"),
+            resume_outputs={"node_a": {"id": "sent_a"}},
+        )
+
+    # node_a succeeded last time: its email is not sent again, but its
+    # recorded output still feeds node_b's variables.
+    mock_send.submit.assert_called_once()
+    args = mock_send.submit.call_args[0]
+    assert args[1] == "b@example.com"
+    assert args[3] == "Sent sent_a"
+
+
+def test_resume_replays_condition_routing():
+    mock_send = mock_task({"id": "sent"})
+
+    with patch("orchestration.flows.master_flow.send_message", mock_send):
+        # The subject would evaluate to true now; the recorded result wins.
+        execute_automation_flow.fn(
+            USER_ID,
+            make_condition_workflow(),
+            make_trigger_context("trigger_1"),
+            resume_outputs={"cond_1": {"result": False}},
+        )
+
+    called_recipients = [call[0][1] for call in mock_send.submit.call_args_list]
+    assert called_recipients == ["b@example.com"]
+
+
+# ---------------------------------------------------------------------------
+# Output pruning and the trimmed audit
+# ---------------------------------------------------------------------------
+
+
+def test_run_context_keeps_only_referenced_fields_until_read():
+    plan = compile_execution_plan(make_chain_workflow())
+    run = _WorkflowRun(
+        plan, USER_ID, make_trigger_context("trigger_1"), None, MagicMock(), MagicMock()
+    )
+    for node_id in ("trigger_1", "node_a"):
+        run.start_node(node_id)
+    run.action_succeeded("node_a", {"id": "sent_a", "raw": "x" * 10_000})
+
+    assert run.node_outputs == {"node_a": {"id": "sent_a"}}
+    assert run.audit_outputs["node_a"]["id"] == "sent_a"
+
+    # node_b resolves {{node_outputs.node_a.id}}; nothing else reads node_a.
+    call = run.start_node("node_b")
+    assert call is not None and call.args[3] == "Sent sent_a"
+    assert "node_a" not in run.node_outputs
+
+
+def test_persisted_audit_trims_long_output_strings():
+    mock_send = mock_task({"id": "sent_1", "raw": "x" * 5_000})
+    persist = MagicMock()
+
+    with (
+        patch("orchestration.flows.master_flow.send_message", mock_send),
+        patch("orchestration.flows.master_flow._persist_run", persist),
+        patch.object(settings, "audit_output_max_chars", 100),
+    ):
+        execute_automation_flow.fn(
+            USER_ID, make_send_email_workflow(), make_trigger_context("trigger_1")
+        )
+
+    output = persist.call_args.kwargs["node_outputs"]["action_1"]
+    assert output["id"] == "sent_1"
+    assert output["raw"] == "x" * 100 + "… [4900 more characters]"
+
+
+def test_claim_checked_trigger_payload_is_loaded_before_the_run():
+    reference = {
+        "trigger_context": {"matched_trigger_node_id": "trigger_1", "payload_ref": "x"}
+    }
+    load = AsyncMock(return_value=make_trigger_context("trigger_1"))
+    mock_reply = mock_task({"id": "replied"})
+    workflow = make_send_email_workflow()
+    workflow["execution_config"]["nodes"]["action_1"]["config"] = {
+        "type": "reply_email",
+        "config": {"body": "Re: {{trigger_1.subject}}"},
+    }
+
+    with (
+        patch("orchestration.flows.master_flow.TriggerPayloadService.load", load),
+        patch("orchestration.flows.master_flow.reply_email", mock_reply),
+    ):
+        execute_automation_flow.fn(USER_ID, workflow, reference)
+
+    load.assert_awaited_once_with(reference)
+    assert mock_reply.submit.call_args[0][1] == "Re: Invoice October"
+
+
+def test_node_output_landing_invalidates_memoized_paths():
+    plan = compile_execution_plan(make_chain_workflow())
+    run = _WorkflowRun(
+        plan, USER_ID, make_trigger_context("trigger_1"), None, MagicMock(), MagicMock()
+    )
+    run.node_outputs["node_a"] = {"id": "stale"}
+    run._unread["node_a"] += 1  # keep node_a readable after node_b starts
+    for node_id in ("trigger_1", "node_a"):
+        run.start_node(node_id)
+    assert run.start_node("node_b").args[3] == "Sent stale"
+
+    run.action_succeeded("node_a", {"id": "fresh"})
+
+    assert run.start_node("node_b").args[3] == "Sent fresh"
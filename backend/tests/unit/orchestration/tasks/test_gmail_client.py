@@ -0,0 +1,104 @@
+import threading
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from google.auth.exceptions import RefreshError
+
+from orchestration.tasks import gmail_client
+from orchestration.tasks.gmail_tasks import send_message, send_message_async
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield MagicMock()
+
+
+@pytest.fixture
+def loader():
+    """Counts credential loads and discovery builds behind the client cache."""
+    gmail_client.clear_gmail_client_cache()
+    creds = MagicMock(valid=True)
+    get_creds = AsyncMock(return_value=creds)
+    build = MagicMock()
+    build.return_value.users.return_value.messages.return_value.send.return_value.execute.return_value = {
+        "id": "sent"
+    }
+
+    with (
+        patch.object(gmail_client, "db_session", _fake_session),
+        patch.object(gmail_client.AuthService, "get_google_credentials", get_creds),
+        patch.object(
+            gmail_client.UserService, "get_email", AsyncMock(return_value="me@x.com")
+        ),
+        patch.object(gmail_client, "build_gmail_service", build),
+    ):
+        yield get_creds, build, creds
+
+    gmail_client.clear_gmail_client_cache()
+
+
+def test_five_gmail_actions_share_one_load_and_build(loader):
+    get_creds, build, _creds = loader
+    user_id = uuid4()
+
+    for _ in range(5):
+        assert send_message.fn(user_id, "to@x.com", "s", "b") == {"id": "sent"}
+
+    assert get_creds.await_count == 1
+    assert build.call_count == 1
+
+
+def test_concurrent_first_use_loads_once(loader):
+    get_creds, build, _creds = loader
+    user_id = uuid4()
+
+    threads = [
+        threading.Thread(target=send_message.fn, args=(user_id, "t@x.com", "s", "b"))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert get_creds.await_count == 1
+    assert build.call_count == 1
+
+
+def test_expired_credentials_are_reloaded(loader):
+    get_creds, _build, creds = loader
+    user_id = uuid4()
+
+    send_message.fn(user_id, "to@x.com", "s", "b")
+    creds.valid = False
+    send_message.fn(user_id, "to@x.com", "s", "b")
+
+    assert get_creds.await_count == 2
+
+
+def test_auth_error_evicts_cached_client(loader):
+    get_creds, build, _creds = loader
+    user_id = uuid4()
+    send = build.return_value.users.return_value.messages.return_value.send
+    send.return_value.execute.side_effect = RefreshError("revoked")
+
+    with pytest.raises(RefreshError):
+        send_message.fn(user_id, "to@x.com", "s", "b")
+
+    send.return_value.execute.side_effect = None
+    send_message.fn(user_id, "to@x.com", "s", "b")
+
+    assert get_creds.await_count == 2
+
+
+async def test_async_tasks_share_the_cache(loader):
+    get_creds, build, _creds = loader
+    user_id = uuid4()
+
+    for _ in range(3):
+        await send_message_async.fn(user_id, "to@x.com", "s", "b")
+
+    assert get_creds.await_count == 1
+    assert build.call_count == 1
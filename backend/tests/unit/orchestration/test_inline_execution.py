@@ -0,0 +1,201 @@
+"""Inline fast path: short workflows run in-process instead of via Prefect."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+
+from orchestration.engine import compile_execution_plan
+from orchestration.flows.master_flow import InlineFallback, execute_workflow_inline
+from orchestration.services import inline_execution_service
+from orchestration.services.deployment_service import DeploymentService
+from orchestration.services.inline_execution_service import InlineExecutionService
+from tests.workflow_factories import action, make_workflow, trigger
+
+
+def _config(action_type="send_email", action_config=None, mode=None, extra=0):
+    action_config = action_config or {
+        "to": "x@example.com",
+        "subject": "s",
+        "body": "b",
+    }
+    nodes = [trigger("t1"), action("a1", action_type, **action_config)]
+    edges = [("t1", "a1")]
+    for i in range(extra):
+        nodes.append({**nodes[1], "id": f"x{i}"})
+        edges.append(("t1", f"x{i}"))
+    config = make_workflow(nodes, edges)["execution_config"]
+    if mode:
+        config["execution_mode"] = mode
+    return config
+
+
+def _workflow(**kwargs):
+    return SimpleNamespace(
+        id=uuid4(),
+        user_id=uuid4(),
+        name="Inline",
+        description="",
+        config=_config(**kwargs),
+    )
+
+
+def _plan(**kwargs):
+    return compile_execution_plan(
+        InlineExecutionService.workflow_data(_workflow(**kwargs))
+    )
+
+
+def _ctx():
+    return {
+        "trigger_context": {
+            "matched_trigger_node_id": "t1",
+            "original_email": {"from": "a@example.com", "subject": "Hi"},
+        }
+    }
+
+
+def test_eligibility_is_opt_in_or_under_threshold():
+    assert not InlineExecutionService.is_eligible(_plan())
+    assert InlineExecutionService.is_eligible(_plan(mode="inline"))
+
+    with patch.object(
+        inline_execution_service.settings, "inline_execution_max_nodes", 2
+    ):
+        assert InlineExecutionService.is_eligible(_plan())
+        assert not InlineExecutionService.is_eligible(_plan(extra=1))
+        assert not InlineExecutionService.is_eligible(_plan(mode="prefect"))
+
+
+def test_long_running_actions_never_run_inline():
+    plan = _plan(
+        action_type="smart_draft",
+        action_config={"user_prompt": "reply"},
+        mode="inline",
+    )
+    assert not InlineExecutionService.is_eligible(plan)
+
+
+async def test_deployment_run_takes_inline_path_without_prefect():
+    workflow = _workflow(mode="inline")
+    send = AsyncMock(return_value={"id": "sent"})
+
+    with (
+        patch("orchestration.flows.master_flow.send_message_async.fn", send),
+        patch(
+            "orchestration.services.deployment_service.run_deployment",
+            new=AsyncMock(),
+        ) as run_deployment,
+    ):
+        await DeploymentService.run(workflow.id, _ctx(), workflow=workflow)
+        await asyncio.gather(*inline_execution_service._running)
+
+    send.assert_awaited_once()
+    run_deployment.assert_not_awaited()
+
+
+async def test_failed_single_action_falls_back_to_prefect():
+    workflow = _workflow(mode="inline")
+    send = AsyncMock(side_effect=RuntimeError("rate limited"))
+
+    with (
+        patch("orchestration.flows.master_flow.send_message_async.fn", send),
+        patch(
+            "orchestration.services.deployment_service.run_deployment",
+            new=AsyncMock(),
+        ) as run_deployment,
+    ):
+        await DeploymentService.run(workflow.id, _ctx(), workflow=workflow)
+        await asyncio.gather(*inline_execution_service._running)
+
+    run_deployment.assert_awaited_once()
+    assert run_deployment.await_args.kwargs["parameters"] == _ctx()
+
+
+async def test_failure_after_a_side_effect_does_not_fall_back():
+    workflow = _workflow(mode="inline", extra=1)
+    send = AsyncMock(side_effect=[{"id": "sent"}, RuntimeError("boom")])
+
+    with patch("orchestration.flows.master_flow.send_message_async.fn", send):
+        with pytest.raises(RuntimeError, match="boom"):
+            await execute_workflow_inline(
+                workflow.user_id,
+                InlineExecutionService.workflow_data(workflow),
+                _ctx(),
+            )
+
+
+async def test_inline_fallback_is_raised_for_only_action():
+    workflow = _workflow(mode="inline")
+    send = AsyncMock(side_effect=RuntimeError("boom"))
+
+    with patch("orchestration.flows.master_flow.send_message_async.fn", send):
+        with pytest.raises(InlineFallback):
+            await execute_workflow_inline(
+                workflow.user_id,
+                InlineExecutionService.workflow_data(workflow),
+                _ctx(),
+            )
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield None
+
+
+async def test_inline_run_has_its_own_run_id_for_events_and_audit():
+    workflow = _workflow(mode="inline")
+    published = []
+
+    async def publish(batch):
+        published.extend(batch)
+
+    with (
+        patch(
+            "orchestration.flows.master_flow.send_message_async.fn",
+            AsyncMock(return_value={"id": "sent"}),
+        ),
+        patch("core.events.publish_events", publish),
+        patch("orchestration.flows.master_flow.db_session", _fake_session),
+        patch(
+            "orchestration.flows.master_flow.WorkflowRunService.create",
+            new=AsyncMock(),
+        ) as create,
+    ):
+        await execute_workflow_inline(
+            workflow.user_id,
+            InlineExecutionService.workflow_data(workflow),
+            _ctx(),
+            str(workflow.id),
+        )
+
+    record = create.await_args.kwargs
+    assert record["inline"] is True
+    assert record["prefect_run_id"] is None
+    assert isinstance(record["id"], UUID)
+    assert published
+    assert {event["run_id"] for event in published} == {str(record["id"])}
+
+
+async def test_fallback_publishes_no_events():
+    workflow = _workflow(mode="inline")
+    publish = AsyncMock()
+
+    with (
+        patch(
+            "orchestration.flows.master_flow.send_message_async.fn",
+            AsyncMock(side_effect=RuntimeError("boom")),
+        ),
+        patch("core.events.publish_events", publish),
+    ):
+        with pytest.raises(InlineFallback):
+            await execute_workflow_inline(
+                workflow.user_id,
+                InlineExecutionService.workflow_data(workflow),
+                _ctx(),
+            )
+
+    publish.assert_not_awaited()
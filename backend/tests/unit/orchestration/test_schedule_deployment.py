@@ -57,3 +57,25 @@ async def test_schedule_trigger_creates_cron_schedule():
     schedule = flow_mock.deploy.await_args.kwargs["schedule"]
     assert isinstance(schedule, Schedule)
     assert schedule.cron == "0 9 * * *"
+
+
+async def test_async_master_flow_setting_selects_async_entrypoint():
+    flow_mock = MagicMock()
+    flow_mock.deploy = AsyncMock(return_value=uuid4())
+
+    with (
+        patch(
+            "orchestration.services.deployment_service.settings.async_master_flow",
+            True,
+        ),
+        patch(
+            "orchestration.services.deployment_service.execute_automation_flow_async"
+        ) as flow_cls,
+    ):
+        flow_cls.from_source = AsyncMock(return_value=flow_mock)
+        await DeploymentService.create_deployment_for_workflow(
+            uuid4(), _schedule_schema()
+        )
+
+    entrypoint = flow_cls.from_source.await_args.kwargs["entrypoint"]
+    assert entrypoint.endswith("master_flow.py:execute_automation_flow_async")
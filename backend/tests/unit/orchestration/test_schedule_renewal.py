@@ -1,5 +1,6 @@
 """Unit tests for the system-maintenance deployment registrations
-(renew-gmail-watches, cleanup-expired-auth) called from main.py's lifespan."""
+(renew-gmail-watches, cleanup-expired-auth, cleanup-trigger-payloads) called
+from main.py's lifespan."""
 
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
@@ -10,6 +11,7 @@ from prefect.schedules import Schedule
 from scripts.register_renewal import (
     register_renewal_deployment,
     register_cleanup_deployment,
+    register_payload_cleanup_deployment,
 )
 
 
@@ -31,6 +33,22 @@ async def test_registers_cleanup_daily_cron_deployment():
     assert kwargs["schedule"].cron == "15 3 * * *"
 
 
+async def test_registers_payload_cleanup_daily_cron_deployment():
+    flow_mock = MagicMock()
+    deployment_id = uuid4()
+    flow_mock.deploy = AsyncMock(return_value=deployment_id)
+
+    with patch("scripts.register_renewal.cleanup_expired_trigger_payloads") as flow_cls:
+        flow_cls.from_source = AsyncMock(return_value=flow_mock)
+        result = await register_payload_cleanup_deployment()
+
+    assert result == deployment_id
+    kwargs = flow_mock.deploy.await_args.kwargs
+    assert kwargs["name"] == "cleanup-trigger-payloads-daily"
+    assert kwargs["work_pool_name"] == "my-process-pool"
+    assert kwargs["schedule"].cron == "30 3 * * *"
+
+
 async def test_registers_daily_cron_deployment():
     flow_mock = MagicMock()
     deployment_id = uuid4()
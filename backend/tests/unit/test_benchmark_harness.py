@@ -0,0 +1,58 @@
+from benchmarks import harness
+from benchmarks.harness import compare, load, run, save
+
+
+def _report(**medians):
+    return {
+        "results": {
+            key: {"median_us": value, "min_us": value} for key, value in medians.items()
+        }
+    }
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    baseline = _report(**{"a[1]": 100.0, "b[1]": 100.0, "c[1]": 100.0})
+    current = _report(**{"a[1]": 119.0, "b[1]": 125.0, "c[1]": 50.0})
+
+    results = {item.key: item for item in compare(baseline, current, threshold=0.2)}
+
+    assert not results["a[1]"].regressed
+    assert results["b[1]"].regressed
+    assert results["b[1]"].ratio == 1.25
+    assert not results["c[1]"].regressed
+
+
+def test_compare_ignores_benchmarks_missing_from_baseline():
+    results = compare(_report(**{"a[1]": 1.0}), _report(**{"new[1]": 5.0}), threshold=0.2)
+
+    assert results == []
+
+
+def test_run_times_each_size_and_round_trips_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(harness, "_cases", {})
+    monkeypatch.setattr(
+        harness, "measure", lambda fn, **kwargs: {"median_us": 1.0, "min_us": 1.0}
+    )
+    calls = []
+
+    @harness.case("noop", sizes=(1, 2))
+    def noop(size):
+        calls.append(size)
+        return lambda: None
+
+    report = run(["noop"], quick=False)
+    assert calls == [1, 2]
+    assert set(report["results"]) == {"noop[1]", "noop[2]"}
+
+    path = tmp_path / "results" / "report.json"
+    save(report, path)
+    assert load(path)["results"] == report["results"]
+
+
+def test_quick_run_only_times_smallest_size(monkeypatch):
+    monkeypatch.setattr(harness, "_cases", {})
+    harness.case("noop", sizes=(1, 2, 3))(lambda size: lambda: None)
+
+    report = run(quick=True)
+
+    assert list(report["results"]) == ["noop[1]"]
@@ -1,6 +1,13 @@
 from typing import Literal
 
-from utils.evaluate_condition import evaluate_condition
+import pytest
+
+from utils.evaluate_condition import (
+    _cached_email_address,
+    compile_condition,
+    evaluate_condition,
+)
+from utils.resolve_variables import ResolutionMemo, VariableResolutionError
 from workflow.schemas.condition_nodes import (
     ConditionOperators,
     ConditionRule,
@@ -285,3 +292,85 @@ def test_match_any_all_rules_fail():
         match_type="ANY",
     )
     assert evaluate_condition(condition, ctx) is False
+
+
+# ---------------------------------------------------------------------------
+# Compiled predicates — short-circuit ANY / ALL, reuse across contexts
+# ---------------------------------------------------------------------------
+
+
+def test_match_any_stops_at_first_matching_rule():
+    # The second rule's variable is missing; it is never resolved.
+    condition = make_condition(
+        [
+            make_rule("{{t.subject}}", ConditionOperators.CONTAINS, "invoice"),
+            make_rule("{{t.missing}}", ConditionOperators.EQUALS, "x"),
+        ],
+        match_type="ANY",
+    )
+    assert evaluate_condition(condition, {"t": {"subject": "Invoice"}}) is True
+
+
+def test_match_all_stops_at_first_failing_rule():
+    condition = make_condition(
+        [
+            make_rule("{{t.subject}}", ConditionOperators.CONTAINS, "invoice"),
+            make_rule("{{t.missing}}", ConditionOperators.EQUALS, "x"),
+        ],
+        match_type="ALL",
+    )
+    assert evaluate_condition(condition, {"t": {"subject": "Hello"}}) is False
+
+
+def test_missing_variable_still_raises_when_evaluated():
+    condition = make_condition(
+        [make_rule("{{t.missing}}", ConditionOperators.EQUALS, "x")]
+    )
+    with pytest.raises(VariableResolutionError):
+        evaluate_condition(condition, {"t": {}})
+
+
+def test_compiled_condition_reused_across_contexts():
+    predicate = compile_condition(
+        make_condition(
+            [
+                make_rule(
+                    "{{t.from}}", ConditionOperators.EQUALS, "Alice <ALICE@example.com>"
+                ),
+                make_rule("{{t.amount}}", ConditionOperators.GREATER_THAN, "100"),
+            ]
+        )
+    )
+    assert predicate({"t": {"from": "alice@example.com", "amount": "250"}}) is True
+    assert predicate({"t": {"from": "alice@example.com", "amount": "50"}}) is False
+    assert predicate({"t": {"from": "bob@example.com", "amount": "250"}}) is False
+
+
+def test_conditions_share_a_runs_memo():
+    memo = ResolutionMemo()
+    ctx = {"t": {"subject": "Invoice October"}}
+    first = make_condition(
+        [make_rule("{{t.subject}}", ConditionOperators.CONTAINS, "invoice")]
+    )
+    second = make_condition(
+        [make_rule("{{t.subject}}", ConditionOperators.CONTAINS, "october")]
+    )
+
+    assert evaluate_condition(first, ctx, memo) is True
+    ctx["t"]["subject"] = "changed"
+    # The path was resolved once for the run; the second condition reuses it.
+    assert evaluate_condition(second, ctx, memo) is True
+    assert len(memo) == 1
+
+
+def test_long_values_are_not_kept_in_the_address_cache():
+    _cached_email_address.cache_clear()
+    predicate = compile_condition(
+        make_condition(
+            [make_rule("{{t.body}}", ConditionOperators.EQUALS, "alice@example.com")]
+        )
+    )
+
+    assert predicate({"t": {"body": "Alice <alice@example.com>"}}) is True
+    assert predicate({"t": {"body": "x" * 10_000}}) is False
+    assert _cached_email_address.cache_info().currsize == 2
@@ -0,0 +1,42 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from utils import gmail_api
+
+
+@pytest.fixture
+def fresh_discovery(monkeypatch):
+    """Counts discovery-document loads, starting from an unparsed document."""
+    monkeypatch.setattr(gmail_api, "_discovery_document", None)
+    get_static_doc = MagicMock(wraps=gmail_api.discovery_cache.get_static_doc)
+    monkeypatch.setattr(gmail_api.discovery_cache, "get_static_doc", get_static_doc)
+    return get_static_doc
+
+
+def test_discovery_document_is_parsed_once_per_process(fresh_discovery):
+    services = [
+        gmail_api.build_gmail_service(Credentials(f"token-{i}")) for i in range(3)
+    ]
+
+    fresh_discovery.assert_called_once_with("gmail", "v1")
+    assert [s._http.credentials.token for s in services] == [
+        "token-0",
+        "token-1",
+        "token-2",
+    ]
+    request = services[1].users().messages().get(userId="me", id="m1")
+    assert request.uri.endswith("/gmail/v1/users/me/messages/m1?alt=json")
+
+
+def test_shared_discovery_document_is_not_modified_by_use(fresh_discovery):
+    service = gmail_api.build_gmail_service(Credentials("token"))
+    before = json.dumps(gmail_api._discovery_document, sort_keys=True)
+
+    service.users().messages().send(userId="me", body={"raw": "x"})
+    service.users().history().list(userId="me", startHistoryId="1")
+    service.users().watch(userId="me", body={})
+
+    assert json.dumps(gmail_api._discovery_document, sort_keys=True) == before
@@ -0,0 +1,45 @@
+import pytest
+
+from utils.lru_cache import LRUCache
+
+
+def test_get_missing_returns_none():
+    assert LRUCache(2).get("x") is None
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_put_existing_key_refreshes_value():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("a", 2)
+
+    assert cache.get("a") == 2
+    assert len(cache) == 1
+
+
+def test_pop_and_clear():
+    cache = LRUCache(3)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        LRUCache(0)
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+import core.models  # noqa: F401 — registers the workflows table for the FK
+from processed_messages.services import ProcessedMessageService
+
+
+def make_session(rows=()) -> MagicMock:
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=list(rows))
+    session.commit = AsyncMock()
+    return session
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_create_many_is_one_insert_on_conflict_do_nothing():
+    workflow_id = uuid4()
+    session = make_session(
+        [SimpleNamespace(message_id="m1", workflow_id=workflow_id)]
+    )
+
+    inserted = await ProcessedMessageService.create_many(
+        session, [("m1", workflow_id), ("m2", workflow_id), ("m1", workflow_id)]
+    )
+
+    session.execute.assert_awaited_once()
+    sql = _sql(session.execute.await_args.args[0])
+    assert "ON CONFLICT ON CONSTRAINT uq_message_workflow_pair DO NOTHING" in sql
+    assert "RETURNING" in sql
+    # Duplicates within the call are sent once.
+    assert sql.count("%(message_id_m") == 2
+    session.commit.assert_awaited_once()
+    assert inserted == {("m1", workflow_id)}
+
+
+async def test_create_many_without_pairs_skips_the_database():
+    session = make_session()
+
+    assert await ProcessedMessageService.create_many(session, []) == set()
+    session.execute.assert_not_called()
+
+
+async def test_get_processed_pairs_is_one_query():
+    workflow_id = uuid4()
+    session = make_session(
+        [SimpleNamespace(message_id="m2", workflow_id=workflow_id)]
+    )
+
+    pairs = await ProcessedMessageService.get_processed_pairs(
+        session, ["m1", "m2"], [workflow_id]
+    )
+
+    session.execute.assert_awaited_once()
+    assert pairs == {("m2", workflow_id)}
+    empty = await ProcessedMessageService.get_processed_pairs(session, [], [workflow_id])
+    assert empty == set()
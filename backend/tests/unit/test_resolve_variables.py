@@ -1,5 +1,14 @@
+from unittest.mock import patch
+
 import pytest
-from utils.resolve_variables import resolve_variables, VariableResolutionError
+from utils import resolve_variables as resolve_module
+from utils.resolve_variables import (
+    CompiledTemplate,
+    ResolutionMemo,
+    compile_template,
+    resolve_variables,
+    VariableResolutionError,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -157,3 +166,94 @@ def test_boolean_returned_unchanged():
 
 def test_none_returned_unchanged():
     assert resolve_variables(None, {}) is None
+
+
+# ---------------------------------------------------------------------------
+# Compiled templates
+# ---------------------------------------------------------------------------
+
+
+def test_template_compiled_into_literals_and_lookups():
+    template = CompiledTemplate("Hi {{ a.name }}, re: {{b.subject | 'none'}}!")
+    assert template.parts[0] == "Hi "
+    assert template.parts[1].path == ["a", "name"]
+    assert template.parts[2] == ", re: "
+    assert template.parts[3].default == "none"
+    assert template.parts[4] == "!"
+
+
+def test_template_compiled_once_per_source():
+    resolve_module.clear_template_cache()
+    ctx = {"a": {"x": "1"}}
+    with patch.object(
+        resolve_module, "CompiledTemplate", wraps=CompiledTemplate
+    ) as compiled:
+        assert resolve_variables("{{a.x}}", ctx) == "1"
+        assert resolve_variables("{{a.x}}", {"a": {"x": "2"}}) == "2"
+    compiled.assert_called_once_with("{{a.x}}")
+
+
+def test_string_without_placeholders_is_not_compiled():
+    resolve_module.clear_template_cache()
+    text = "plain " * 1000
+    assert resolve_variables(text, {}) is text
+    assert len(resolve_module._templates) == 0
+
+
+def test_template_without_lookups_is_static():
+    assert compile_template("{{a.x").is_static is True
+    assert compile_template("Hi {{a.x}}").is_static is False
+
+
+def test_unclosed_braces_left_as_is():
+    assert compile_template("{{a.x").render({}) == "{{a.x"
+
+
+# ---------------------------------------------------------------------------
+# Per-run memo
+# ---------------------------------------------------------------------------
+
+
+def test_memo_reuses_resolved_paths():
+    memo = ResolutionMemo()
+    ctx = {"t": {"body": "first"}}
+    assert resolve_variables("{{t.body}}", ctx, memo) == "first"
+
+    # Served from the memo, not by walking the context again.
+    ctx["t"]["body"] = "second"
+    assert resolve_variables({"a": ["{{t.body}}!"]}, ctx, memo) == {"a": ["first!"]}
+    assert resolve_variables("{{t.body}}", ctx) == "second"
+
+
+def test_memo_applies_each_lookups_own_default_to_a_missing_path():
+    memo = ResolutionMemo()
+    assert resolve_variables("{{t.missing | 'a'}}", {}, memo) == "a"
+    assert resolve_variables("{{t.missing | 'b'}}", {}, memo) == "b"
+    with pytest.raises(VariableResolutionError):
+        resolve_variables("{{t.missing}}", {}, memo)
+
+
+def test_memo_invalidation_covers_nested_and_enclosing_paths():
+    memo = ResolutionMemo()
+    ctx = {"node_outputs": {"a": {"id": "1"}, "b": {"id": "2"}}}
+    for path in ("node_outputs.a.id", "node_outputs.b.id", "node_outputs"):
+        resolve_variables("{{%s}}" % path, ctx, memo)
+
+    memo.invalidate(("node_outputs", "a"))
+
+    assert len(memo) == 1  # node_outputs.b.id
+    ctx["node_outputs"]["a"]["id"] = "3"
+    assert resolve_variables("{{node_outputs.a.id}}", ctx, memo) == "3"
+
+
+def test_memo_get_or_compute_computes_each_key_once():
+    memo = ResolutionMemo()
+    calls = []
+
+    def compute(context):
+        calls.append(context)
+        return context["v"]
+
+    assert memo.get_or_compute(("a",), compute, {"v": "1"}) == "1"
+    assert memo.get_or_compute(("a",), compute, {"v": "2"}) == "1"
+    assert len(calls) == 1
@@ -0,0 +1,30 @@
+from utils.substring_matcher import SubstringMatcher
+
+
+def test_finds_every_pattern_in_text():
+    matcher = SubstringMatcher(["invoice", "voice", "ice", "order"])
+
+    assert matcher.find("your invoice is ready") == {"invoice", "voice", "ice"}
+    assert matcher.find("new order") == {"order"}
+    assert matcher.find("nothing here") == set()
+
+
+def test_overlapping_and_repeated_prefixes():
+    matcher = SubstringMatcher(["he", "she", "his", "hers"])
+
+    assert matcher.find("ushers") == {"he", "she", "hers"}
+    assert matcher.find("ahishers") == {"his", "she", "he", "hers"}
+
+
+def test_matches_after_failure_transitions():
+    matcher = SubstringMatcher(["abcd", "bce"])
+
+    assert matcher.find("abce") == {"bce"}
+
+
+def test_empty_patterns_are_ignored():
+    matcher = SubstringMatcher(["", "a"])
+
+    assert matcher.find("xyz") == set()
+    assert not SubstringMatcher([""])
+    assert SubstringMatcher(["a"])
@@ -1,3 +1,5 @@
+import random
+import time
 from typing import Optional
 
 import pytest
@@ -213,3 +215,129 @@ def test_multiple_start_nodes_valid():
         ],
     )
     assert len(config.start_node_ids) == 2
+
+
+# ---------------------------------------------------------------------------
+# Derived graph data — reused by the executor
+# ---------------------------------------------------------------------------
+
+
+def test_topological_order_exposed_on_model():
+    config = WorkflowExecutionConfig(
+        start_node_ids=["t1"],
+        nodes={
+            "t1": make_trigger("t1"),
+            "a1": make_action("a1"),
+            "a2": make_action("a2"),
+            "a3": make_action("a3"),
+        },
+        edges=[
+            make_edge("e1", "t1", "a2"),
+            make_edge("e2", "t1", "a1"),
+            make_edge("e3", "a1", "a2"),
+            make_edge("e4", "a2", "a3"),
+        ],
+    )
+    assert config.topological_order == ["t1", "a1", "a2", "a3"]
+    assert [e.target for e in config.adjacency["t1"]] == ["a2", "a1"]
+
+
+def test_unvalidated_model_derives_graph_on_first_use():
+    config = WorkflowExecutionConfig.model_construct(
+        start_node_ids=["t1"],
+        nodes={"t1": make_trigger("t1"), "a1": make_action("a1")},
+        edges=[make_edge("e1", "t1", "a1")],
+    )
+    assert config.topological_order == ["t1", "a1"]
+
+
+def test_cycle_reported_against_the_start_node_leading_into_it():
+    with pytest.raises(ValueError, match="starting from node 't2'"):
+        WorkflowExecutionConfig(
+            start_node_ids=["t1", "t2"],
+            nodes={
+                "t1": make_trigger("t1"),
+                "t2": make_trigger("t2"),
+                "a1": make_action("a1"),
+                "a2": make_action("a2"),
+                "a3": make_action("a3"),
+            },
+            edges=[
+                make_edge("e1", "t1", "a1"),
+                make_edge("e2", "t2", "a2"),
+                make_edge("e3", "a2", "a3"),
+                make_edge("e4", "a3", "a2"),
+            ],
+        )
+
+
+def test_cycle_not_blamed_on_start_node_that_only_reaches_its_downstream():
+    with pytest.raises(ValueError, match="starting from node 's1'"):
+        WorkflowExecutionConfig(
+            start_node_ids=["s0", "s1"],
+            nodes={
+                "s0": make_trigger("s0"),
+                "s1": make_trigger("s1"),
+                "x": make_action("x"),
+                "a": make_action("a"),
+                "b": make_action("b"),
+            },
+            edges=[
+                make_edge("e1", "s0", "x"),
+                make_edge("e2", "s1", "a"),
+                make_edge("e3", "a", "b"),
+                make_edge("e4", "b", "a"),
+                make_edge("e5", "b", "x"),
+            ],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Scale — iterative validation, no recursion limit, bounded time
+# ---------------------------------------------------------------------------
+
+LARGE_NODES = 10_000
+LARGE_EDGES = 50_000
+# Generous so slow CI machines pass; the single pass takes well under this.
+VALIDATION_BUDGET_S = 2.0
+
+
+def make_large_graph(cycle: bool = False):
+    """A 10k-node chain plus forward edges up to 50k edges in total."""
+    rng = random.Random(13)
+    action = make_action("a0")
+    nodes = {"t1": make_trigger("t1")}
+    nodes.update(
+        {
+            f"a{i}": action.model_copy(update={"id": f"a{i}"})
+            for i in range(LARGE_NODES - 1)
+        }
+    )
+    ids = list(nodes)
+    edges = [make_edge(f"c{i}", ids[i], ids[i + 1]) for i in range(len(ids) - 1)]
+    while len(edges) < LARGE_EDGES:
+        i, j = sorted(rng.sample(range(len(ids)), 2))
+        edges.append(make_edge(f"f{len(edges)}", ids[i], ids[j]))
+    if cycle:
+        edges[-1] = make_edge("back", ids[-1], ids[LARGE_NODES // 2])
+    return nodes, edges
+
+
+def test_large_graph_validates_within_budget():
+    nodes, edges = make_large_graph()
+
+    started = time.perf_counter()
+    config = WorkflowExecutionConfig(start_node_ids=["t1"], nodes=nodes, edges=edges)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < VALIDATION_BUDGET_S
+    assert len(config.topological_order) == LARGE_NODES
+    position = {node_id: i for i, node_id in enumerate(config.topological_order)}
+    assert all(position[e.source] < position[e.target] for e in edges)
+
+
+def test_large_graph_cycle_detected_without_recursion_error():
+    nodes, edges = make_large_graph(cycle=True)
+
+    with pytest.raises(ValueError, match="Circular dependency"):
+        WorkflowExecutionConfig(start_node_ids=["t1"], nodes=nodes, edges=edges)
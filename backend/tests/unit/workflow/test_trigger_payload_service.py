@@ -0,0 +1,108 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from core.config_loader import settings
+from workflow.services.trigger_payload_service import (
+    PAYLOAD_REF,
+    TriggerPayloadNotFound,
+    TriggerPayloadService,
+)
+
+
+@asynccontextmanager
+async def fake_db_session(session):
+    yield session
+
+
+def make_session() -> MagicMock:
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    session.get = AsyncMock()
+    return session
+
+
+def _params(body: str) -> dict:
+    return {
+        "trigger_context": {
+            "matched_trigger_node_id": "hook_1",
+            "webhook_payload": {"body": {"text": body}, "headers": {}, "query": {}},
+        }
+    }
+
+
+def _patch_db(session):
+    return patch(
+        "workflow.services.trigger_payload_service.db_session",
+        side_effect=lambda: fake_db_session(session),
+    )
+
+
+async def test_small_payload_stays_inline():
+    session = make_session()
+    params = _params("short")
+
+    with _patch_db(session):
+        result = await TriggerPayloadService.offload(uuid4(), params)
+
+    assert result is params
+    session.add.assert_not_called()
+
+
+async def test_large_payload_round_trips_through_a_reference():
+    session = make_session()
+    params = _params("x" * 100_000)
+
+    with (
+        _patch_db(session),
+        patch.object(settings, "trigger_payload_inline_max_bytes", 1024),
+    ):
+        offloaded = await TriggerPayloadService.offload(uuid4(), params)
+
+        ctx = offloaded["trigger_context"]
+        assert "webhook_payload" not in ctx
+        assert ctx["matched_trigger_node_id"] == "hook_1"
+        record = session.add.call_args[0][0]
+        assert ctx[PAYLOAD_REF] == str(record.id)
+        # Compressed well below the JSON size; nothing else runs in the request.
+        assert len(record.data) < record.size_bytes // 10
+        session.execute.assert_not_awaited()
+        session.commit.assert_awaited_once()
+
+        session.get.return_value = record
+        loaded = await TriggerPayloadService.load(offloaded)
+
+    assert loaded == params
+
+
+async def test_load_without_reference_skips_the_database():
+    params = _params("short")
+
+    with patch("workflow.services.trigger_payload_service.db_session") as db_session:
+        assert await TriggerPayloadService.load(params) is params
+        assert await TriggerPayloadService.load(None) is None
+
+    db_session.assert_not_called()
+
+
+async def test_load_of_expired_payload_raises():
+    session = make_session()
+    session.get.return_value = None
+    params = {"trigger_context": {PAYLOAD_REF: str(uuid4())}}
+
+    with _patch_db(session), pytest.raises(TriggerPayloadNotFound):
+        await TriggerPayloadService.load(params)
+
+
+async def test_purge_expired_deletes_in_one_statement():
+    session = make_session()
+    session.execute.return_value = MagicMock(rowcount=4)
+
+    with _patch_db(session):
+        assert await TriggerPayloadService.purge_expired() == 4
+
+    session.execute.assert_awaited_once()
+    session.commit.assert_awaited_once()
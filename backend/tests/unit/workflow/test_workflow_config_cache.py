@@ -0,0 +1,124 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from workflow.services import workflow_config_cache as cache_module
+from workflow.services.workflow_config_cache import (
+    WORKFLOW_CONFIG_CHANGED,
+    clear_workflow_config_cache,
+    get_workflow_config,
+    on_workflow_config_changed,
+    publish_workflow_config_changed,
+    trusted_execution_config,
+)
+
+
+def make_config(subject: str = "Hi") -> dict:
+    return {
+        "start_node_ids": ["trigger_1"],
+        "nodes": {
+            "trigger_1": {
+                "id": "trigger_1",
+                "type": "trigger",
+                "config": {"type": "manual", "config": {}},
+            },
+            "action_1": {
+                "id": "action_1",
+                "type": "action",
+                "config": {
+                    "type": "send_email",
+                    "config": {"to": "a@example.com", "subject": subject, "body": "B"},
+                },
+            },
+        },
+        "edges": [{"id": "e1", "source": "trigger_1", "target": "action_1"}],
+    }
+
+
+def make_workflow(version: int = 1, subject: str = "Hi") -> MagicMock:
+    workflow = MagicMock()
+    workflow.id = uuid4()
+    workflow.version = version
+    workflow.config = make_config(subject)
+    return workflow
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    clear_workflow_config_cache()
+    yield
+    clear_workflow_config_cache()
+
+
+def test_same_version_reuses_the_model():
+    workflow = make_workflow()
+
+    first = get_workflow_config(workflow)
+
+    assert get_workflow_config(workflow) is first
+    assert first.nodes["action_1"].config.config.subject == "Hi"
+
+
+def test_new_version_misses_the_cache():
+    workflow = make_workflow()
+    first = get_workflow_config(workflow)
+
+    workflow.version = 2
+    workflow.config = make_config("Edited")
+    second = get_workflow_config(workflow)
+
+    assert second is not first
+    assert second.nodes["action_1"].config.config.subject == "Edited"
+
+
+def test_trusted_path_skips_graph_validation():
+    data = make_config()
+    data["edges"].append({"id": "e2", "source": "action_1", "target": "action_1"})
+
+    # Full validation would reject the self-loop.
+    config = trusted_execution_config(data)
+
+    assert config.adjacency["action_1"][0].target == "action_1"
+
+
+def test_untrusted_path_runs_full_validation():
+    workflow = make_workflow()
+    workflow.config["edges"] = []
+
+    with pytest.raises(ValueError):
+        get_workflow_config(workflow, trusted=False)
+
+
+async def test_publish_evicts_locally_and_notifies():
+    workflow = make_workflow()
+    first = get_workflow_config(workflow)
+
+    with patch.object(cache_module, "publish_event", new=AsyncMock()) as publish:
+        await publish_workflow_config_changed(workflow.id)
+
+    publish.assert_awaited_once_with(
+        {"type": WORKFLOW_CONFIG_CHANGED, "workflow_id": str(workflow.id)}
+    )
+    assert get_workflow_config(workflow) is not first
+
+
+def test_listener_evicts_on_config_changed_event():
+    from core.event_listener import EventListener
+
+    workflow = make_workflow()
+    first = get_workflow_config(workflow)
+    listener = EventListener()
+    listener.add_handler(WORKFLOW_CONFIG_CHANGED, on_workflow_config_changed)
+    listener._loop = MagicMock()
+
+    with patch("core.event_listener.asyncio.run_coroutine_threadsafe") as forward:
+        listener._dispatch(
+            json.dumps(
+                {"type": WORKFLOW_CONFIG_CHANGED, "workflow_id": str(workflow.id)}
+            )
+        )
+
+    forward.assert_not_called()
+    assert get_workflow_config(workflow) is not first
@@ -0,0 +1,37 @@
+"""Workflow definitions for tests.
+
+The node and workflow builders are shared with the benchmarks
+(``benchmarks/workflows.py``); ``make_plan`` compiles a workflow into an
+``ExecutionPlan``.
+"""
+
+from typing import Iterable, Optional, Sequence
+
+from benchmarks.workflows import (
+    EdgeSpec,
+    action,
+    condition,
+    make_tree_workflow,
+    make_workflow,
+    send_email,
+    trigger,
+)
+from orchestration.engine import ExecutionPlan, compile_execution_plan
+
+__all__ = [
+    "action",
+    "condition",
+    "make_plan",
+    "make_tree_workflow",
+    "make_workflow",
+    "send_email",
+    "trigger",
+]
+
+
+def make_plan(
+    nodes: Iterable[dict],
+    edges: Iterable[EdgeSpec] = (),
+    start_node_ids: Optional[Sequence[str]] = None,
+) -> ExecutionPlan:
+    return compile_execution_plan(make_workflow(nodes, edges, start_node_ids))
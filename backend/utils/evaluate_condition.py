@@ -1,67 +1,146 @@
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Protocol
 from email.utils import parseaddr
-from utils.resolve_variables import resolve_variables, VariableResolutionError
-from workflow.schemas.condition_nodes import IfCondition, ConditionOperators
+from utils.resolve_variables import (
+    CompiledTemplate,
+    ResolutionMemo,
+    VariableResolutionError,
+)
+from workflow.schemas.condition_nodes import (
+    ConditionOperators,
+    ConditionRule,
+    IfCondition,
+)
 
 
-def evaluate_condition(condition: IfCondition, run_context: Dict[str, Any]) -> bool:
-    """
-    Evaluates an IfConditionConfig against the current run_context.
-    """
-    rules = condition.config.rules
-    match_type = condition.config.match_type
+class Predicate(Protocol):
+    """A compiled rule or condition: run_context (and the run's memo) → bool."""
+
+    def __call__(
+        self, run_context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+    ) -> bool: ...
+
+
+# Longer than any "Name <address>" header worth remembering; bodies and
+# subjects are parsed without going through the cache.
+_CACHED_ADDRESS_MAX_LEN = 320
+
+
+def _parse_email_address(value: str) -> str:
+    _, parsed = parseaddr(value)
+    return parsed if parsed and "@" in parsed else ""
+
+
+# parseaddr dominates an equals rule; the same senders come up again and again.
+_cached_email_address = lru_cache(maxsize=4096)(_parse_email_address)
 
-    results = []
-    for rule in rules:
-        operator = rule.operator
 
-        if operator == ConditionOperators.EXISTS:
-            # "exists" = the variable path resolves to a value (incl. empty string).
-            # A missing path makes resolve_variables raise → treat as does-not-exist.
+def _email_address(value: str) -> str:
+    """Extract just the email if it's formatted like "Name <email@domain>"."""
+    if len(value) > _CACHED_ADDRESS_MAX_LEN:
+        return _parse_email_address(value)
+    return _cached_email_address(value)
+
+
+def _to_float(value: Any):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _compile_rule(rule: ConditionRule) -> Predicate:
+    """Turn one rule into a predicate, normalizing its expected value once."""
+    operator = rule.operator
+    template = CompiledTemplate(rule.variable)
+
+    if operator == ConditionOperators.EXISTS:
+        # "exists" = the variable path resolves to a value (incl. empty string).
+        # A missing path makes the render raise → treat as does-not-exist.
+        def exists(
+            run_context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+        ) -> bool:
             try:
-                resolve_variables(rule.variable, run_context)
-                res = True
+                template.render(run_context, memo)
+                return True
             except VariableResolutionError:
-                res = False
-            results.append(res)
-            continue
-
-        actual_value = resolve_variables(rule.variable, run_context)
-        expected_value = rule.value
-
-        res = False
-
-        actual_str = str(actual_value).lower().strip()
-        expected_str = str(expected_value).lower().strip()
-
-        if operator == ConditionOperators.EQUALS:
-            # Extract just the email if it's formatted like "Name <email@domain>"
-            _, parsed_actual = parseaddr(actual_str)
-            _, parsed_expected = parseaddr(expected_str)
-
-            if parsed_actual and "@" in parsed_actual:
-                compare_target = (
-                    parsed_expected
-                    if (parsed_expected and "@" in parsed_expected)
-                    else expected_str
-                )
-                res = parsed_actual == compare_target
-            else:
-                res = actual_str == expected_str
-
-        elif operator == ConditionOperators.CONTAINS:
-            res = expected_str in actual_str
-        elif operator == ConditionOperators.GREATER_THAN:
-            try:
-                res = float(actual_value) > float(expected_value)
-            except (ValueError, TypeError):
-                res = False
-        elif operator == ConditionOperators.LESS_THAN:
-            try:
-                res = float(actual_value) < float(expected_value)
-            except (ValueError, TypeError):
-                res = False
+                return False
+
+        return exists
+
+    expected_value = rule.value
+    expected_str = str(expected_value).lower().strip()
 
-        results.append(res)
+    if operator == ConditionOperators.EQUALS:
+        expected_email = _email_address(expected_str)
 
-    return any(results) if match_type == "ANY" else all(results)
+        def equals(
+            run_context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+        ) -> bool:
+            actual_str = template.render(run_context, memo).lower().strip()
+            actual_email = _email_address(actual_str)
+            if actual_email:
+                return actual_email == (expected_email or expected_str)
+            return actual_str == expected_str
+
+        return equals
+
+    if operator == ConditionOperators.CONTAINS:
+
+        def contains(
+            run_context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+        ) -> bool:
+            return expected_str in template.render(run_context, memo).lower().strip()
+
+        return contains
+
+    if operator in (ConditionOperators.GREATER_THAN, ConditionOperators.LESS_THAN):
+        expected_number = _to_float(expected_value)
+        greater = operator == ConditionOperators.GREATER_THAN
+
+        def compare(
+            run_context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+        ) -> bool:
+            # Resolved first so a missing variable still fails the node.
+            actual_number = _to_float(template.render(run_context, memo))
+            if actual_number is None or expected_number is None:
+                return False
+            if greater:
+                return actual_number > expected_number
+            return actual_number < expected_number
+
+        return compare
+
+    return lambda run_context, memo=None: False
+
+
+def compile_condition(condition: IfCondition) -> Predicate:
+    """
+    Compile an IfCondition into a predicate over the run_context.
+
+    Templates, expected values and email/number parsing are prepared once, so
+    evaluating the same condition for every incoming email only resolves the
+    variables. ANY stops at the first matching rule and ALL at the first
+    failing one.
+    """
+    predicates: List[Predicate] = [
+        _compile_rule(rule) for rule in condition.config.rules
+    ]
+
+    if condition.config.match_type == "ANY":
+        return lambda run_context, memo=None: any(
+            p(run_context, memo) for p in predicates
+        )
+    return lambda run_context, memo=None: all(p(run_context, memo) for p in predicates)
+
+
+def evaluate_condition(
+    condition: IfCondition,
+    run_context: Dict[str, Any],
+    memo: Optional[ResolutionMemo] = None,
+) -> bool:
+    """
+    Evaluates an IfConditionConfig against the current run_context.
+    The executor uses the predicate its execution plan compiled instead.
+    """
+    return compile_condition(condition)(run_context, memo)
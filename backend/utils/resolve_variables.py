@@ -1,11 +1,68 @@
 import re
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.config_loader import settings
+from utils.lru_cache import LRUCache
 
 
 class VariableResolutionError(Exception):
     """Raised when a {{path}} can't be resolved and no default was supplied."""
 
 
+_VARIABLE = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+
+
+# A path that did not resolve, memoized as such; each lookup then applies its
+# own default.
+_MISSING = object()
+
+
+class ResolutionMemo:
+    """Resolved ``{{path}}`` values for one workflow run, keyed by path.
+
+    Several conditions and actions in a run often read the same fields (the
+    sender, the email body); with a memo each path is walked and stringified
+    once. The executor invalidates a node's paths whenever its output lands or
+    is released.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get_or_compute(
+        self,
+        key: Tuple[str, ...],
+        compute: Callable[[Dict[str, Any]], Any],
+        context: Dict[str, Any],
+    ) -> Any:
+        """The memoized value for ``key``, or ``compute(context)``, stored."""
+        value = self._values.get(key)
+        if value is None:
+            value = self._values[key] = compute(context)
+        return value
+
+    def invalidate(self, prefix: Sequence[str]) -> None:
+        """Forget every path under ``prefix``, and any path that contains it
+        (``{{node_outputs}}`` changes when ``node_outputs.x`` does)."""
+        prefix = tuple(prefix)
+        size = len(prefix)
+        stale = [
+            key
+            for key in self._values
+            if key[:size] == prefix or prefix[: len(key)] == key
+        ]
+        for key in stale:
+            del self._values[key]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
 def _parse_default(literal: str) -> str:
     """Strip one layer of matching surrounding quotes from a default literal."""
     if len(literal) >= 2 and literal[0] == literal[-1] and literal[0] in ("'", '"'):
@@ -13,50 +70,134 @@ def _parse_default(literal: str) -> str:
     return literal
 
 
-def resolve_variables(value: Any, context: Dict[str, Any]) -> Any:
+class _Lookup:
+    """One ``{{path | default}}`` placeholder, parsed."""
+
+    __slots__ = ("default", "key", "path", "raw")
+
+    def __init__(self, raw: str, inner: str):
+        self.raw = raw
+        # E.g., "node_1.summary" splits into ["node_1", "summary"].
+        # An optional default may follow a pipe: "node_1.subject | 'No Subject'".
+        self.default: Optional[str] = None
+        if "|" in inner:
+            path_str, default_raw = inner.split("|", 1)
+            self.default = _parse_default(default_raw.strip())
+        else:
+            path_str = inner
+        self.path = path_str.strip().split(".")
+        self.key = tuple(self.path)
+
+    def _walk(self, context: Dict[str, Any]) -> Any:
+        current: Any = context
+        try:
+            for p in self.path:
+                # Handle both dictionary keys and object attributes
+                current = (
+                    current[p] if isinstance(current, dict) else getattr(current, p)
+                )
+            return str(current)
+        except (KeyError, AttributeError, TypeError):
+            return _MISSING
+
+    def resolve(
+        self, context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+    ) -> str:
+        if memo is None:
+            value = self._walk(context)
+        else:
+            value = memo.get_or_compute(self.key, self._walk, context)
+        if value is _MISSING:
+            if self.default is not None:
+                return self.default
+            raise VariableResolutionError(
+                f"Could not resolve variable '{self.raw}'. "
+                f"The path '{self.path}' does not exist in the current context."
+            )
+        return value
+
+
+class CompiledTemplate:
+    """A template string parsed once into literal chunks and path lookups.
+
+    Rendering is a join over the parts: no regex scan, and no re-splitting of
+    paths or re-parsing of defaults per call.
+    """
+
+    __slots__ = ("is_static", "parts", "source")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts: List[Union[str, _Lookup]] = []
+        position = 0
+        for match in _VARIABLE.finditer(source):
+            if match.start() > position:
+                parts.append(source[position : match.start()])
+            parts.append(_Lookup(match.group(0), match.group(1).strip()))
+            position = match.end()
+        if position < len(source):
+            parts.append(source[position:])
+        self.parts: Tuple[Union[str, _Lookup], ...] = tuple(parts)
+        self.is_static = not any(isinstance(part, _Lookup) for part in parts)
+
+    def render(
+        self, context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+    ) -> str:
+        if self.is_static:
+            return self.source
+        return "".join(
+            part if isinstance(part, str) else part.resolve(context, memo)
+            for part in self.parts
+        )
+
+
+# Action configs repeat across runs of the same workflow, so their strings are
+# compiled once per worker process. Least recently used are evicted.
+_templates: LRUCache[str, CompiledTemplate] = LRUCache(settings.template_cache_size)
+
+
+def compile_template(source: str) -> CompiledTemplate:
+    """The compiled form of ``source``, from the cache when it's been seen."""
+    template = _templates.get(source)
+    if template is None:
+        template = CompiledTemplate(source)
+        _templates.put(source, template)
+    return template
+
+
+def clear_template_cache() -> None:
+    _templates.clear()
+
+
+def variable_paths(source: str) -> List[List[str]]:
+    """The lookup path of every {{placeholder}} in ``source``."""
+    if "{{" not in source:
+        return []
+    return [
+        part.path
+        for part in compile_template(source).parts
+        if isinstance(part, _Lookup)
+    ]
+
+
+def resolve_variables(
+    value: Any, context: Dict[str, Any], memo: Optional[ResolutionMemo] = None
+) -> Any:
     """
     Recursively scans for {{path.to.variable}} in strings, dicts, and lists,
     and replaces them with actual values from the context.
+    With a run's ``memo``, paths already resolved in that run are reused.
     """
     if isinstance(value, str):
-
-        def repl(match):
-            # E.g., extracts "node_1.summary" and splits into ["node_1", "summary"].
-            # An optional default may follow a pipe: "node_1.subject | 'No Subject'".
-            raw_match = match.group(0)
-            inner = match.group(1).strip()
-
-            default: str | None = None
-            has_default = "|" in inner
-            if has_default:
-                path_str, default_raw = inner.split("|", 1)
-                default = _parse_default(default_raw.strip())
-            else:
-                path_str = inner
-
-            path = path_str.strip().split(".")
-            current = context
-            try:
-                for p in path:
-                    # Handle both dictionary keys and object attributes
-                    current = (
-                        current[p] if isinstance(current, dict) else getattr(current, p)
-                    )
-                return str(current)
-            except (KeyError, AttributeError, TypeError):
-                if has_default:
-                    return str(default)
-                raise VariableResolutionError(
-                    f"Could not resolve variable '{raw_match}'. "
-                    f"The path '{path}' does not exist in the current context."
-                ) from None
-
-        # Regex to find {{ anything }}
-        return re.sub(r"\{\{\s*(.*?)\s*\}\}", repl, value)
+        # Plain text (most of a large email body config) is returned as is,
+        # without compiling or caching it.
+        if "{{" not in value:
+            return value
+        return compile_template(value).render(context, memo)
 
     elif isinstance(value, dict):
-        return {k: resolve_variables(v, context) for k, v in value.items()}
+        return {k: resolve_variables(v, context, memo) for k, v in value.items()}
     elif isinstance(value, list):
-        return [resolve_variables(v, context) for v in value]
+        return [resolve_variables(v, context, memo) for v in value]
 
     return value
@@ -0,0 +1,69 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Set
+
+
+class SubstringMatcher:
+    """Finds which of many patterns occur in a text, in one pass over the text.
+
+    An Aho-Corasick automaton: a trie of the patterns plus failure links, so
+    the cost of a search is the length of the text plus the number of matches,
+    however many patterns there are. Case-sensitive; lowercase both sides for
+    case-insensitive matching.
+    """
+
+    __slots__ = ("_fail", "_goto", "_out")
+
+    def __init__(self, patterns: Iterable[str]):
+        # State 0 is the root. _goto[state][char] → next state; _out[state] is
+        # every pattern that ends at this state (including via failure links).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Set[str]] = [set()]
+        for pattern in set(patterns):
+            if pattern:
+                self._add(pattern)
+        self._fail: List[int] = [0] * len(self._goto)
+        self._link()
+
+    def __bool__(self) -> bool:
+        return bool(self._goto[0])
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._out.append(set())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._out[state].add(pattern)
+
+    def _link(self) -> None:
+        # Breadth-first, so a state's failure target (always shallower) is
+        # linked before the state itself.
+        queue: Deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                # Children of the root fail back to the root, not to themselves.
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] |= self._out[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        """The patterns that occur somewhere in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+        return found
@@ -2,6 +2,7 @@ from typing import List
 
 from prefect.client.schemas import FlowRun
 
+from workflow.models.workflow_run_record import WorkflowRunRecord
 from workflow.schemas.workflow_run import WorkflowRun
 
 
@@ -10,3 +11,21 @@ def translate_flow_runs_schema(original_runs: List[FlowRun]) -> List[WorkflowRun
     Takes a list of FlowRun objects and returns a list of slim WorkflowRun objects.
     """
     return [WorkflowRun.model_validate(run) for run in original_runs]
+
+
+def translate_inline_runs_schema(records: List[WorkflowRunRecord]) -> List[WorkflowRun]:
+    """
+    Inline runs' audit records as WorkflowRun rows, shaped like the Prefect runs
+    they are listed with: any failed node fails the run, as the flows do.
+    """
+    return [
+        WorkflowRun(
+            id=record.id,
+            name=f"inline-{record.id.hex[:8]}",
+            deployment_id=record.workflow_id,
+            state_name="Completed" if record.status == "success" else "Failed",
+            start_time=record.triggered_at,
+            total_run_time=(record.duration_ms or 0) / 1000,
+        )
+        for record in records
+    ]
@@ -1,7 +1,9 @@
+from .trigger_payload import TriggerPayload
 from .workflow import Workflow
 from .workflow_run_record import WorkflowRunRecord
 
 __all__ = [
+    "TriggerPayload",
     "Workflow",
     "WorkflowRunRecord",
 ]
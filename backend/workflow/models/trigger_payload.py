@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database import Base
+
+
+class TriggerPayload(Base):
+    """A large trigger payload stored out of line (claim check).
+
+    Instead of passing a big webhook body or decoded email inline as a Prefect
+    flow-run parameter, the API writes it here once, zlib-compressed JSON, and
+    the run only receives the row id (workflow/services/trigger_payload_service.py).
+    """
+
+    __tablename__ = "trigger_payloads"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    workflow_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("workflows.id", ondelete="CASCADE"), nullable=False
+    )
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Uncompressed JSON size, for monitoring how much stays out of Prefect.
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    # Kept long enough for a crashed run to be rescheduled; purged after.
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, false
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -34,8 +34,15 @@ class WorkflowRunRecord(Base):
     prefect_run_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True), nullable=True
     )
+    # Runs executed in the API process (InlineExecutionService) have no Prefect
+    # run; their ``id`` is the run id their events carried, and the history
+    # lists them from this table instead of from Prefect.
+    inline: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
     trigger_data: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
-    # { node_id: { "output": ..., "status": "success"|"failed", "error": ... } }
+    # { node_id: { "output": ..., "status": "success"|"failed", "error": ...,
+    #              "timing": { queued_at, started_at, finished_at, duration_ms, ... } } }
     node_results: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
     # "success" | "partial" | "failed"
     status: Mapped[str] = mapped_column(String(16), nullable=False)
@@ -1,9 +1,11 @@
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 from uuid import UUID
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     status,
     WebSocket,
     WebSocketDisconnect,
@@ -18,20 +20,29 @@ from auth.dependencies import get_current_user
 from core.database import get_db, db_session
 from core.setup_logging import setup_logger
 from auth.utils import decode_access_token
+from orchestration.engine import ResumeError
 from orchestration.services import DeploymentService
 from user.models import User
 from utils.catalog_introspector import build_catalog
 from workflow.schemas.catalog import WorkflowCatalog
 from workflow.schemas import WorkflowSchema, WorkflowExecutionConfig
 from workflow.schemas.ui_metadata_workflow import UIMetadata
-from workflow.schemas.workflow_run import WorkflowRun, WorkflowRunDetail
+from workflow.schemas.workflow_run import (
+    ActionLatencyStats,
+    WorkflowRun,
+    WorkflowRunDetail,
+)
 from workflow.schemas import (
     RunWorkflowRequest,
     UpdateWorkflowRequest,
     ToggleWorkflowRequest,
 )
 from workflow.models.workflow import Workflow
-from workflow.services import WorkflowService, WorkflowRunService
+from workflow.services import (
+    WorkflowService,
+    WorkflowRunService,
+    publish_workflow_config_changed,
+)
 from core.websocket_manager import manager
 
 
@@ -291,6 +302,7 @@ async def update_workflow_config(
         )
 
         await db.commit()  # we commit the config update here because of sequential dependencies between service and manager
+        await publish_workflow_config_changed(request.deployment_id)
         return result
     except HTTPException:
         raise
@@ -321,6 +333,7 @@ async def delete_workflow(
         await WorkflowService.delete_by_id(db, deployment_id)
         await DeploymentService.delete(deployment_id)
         await db.commit()  # to actually commit the changes to the database
+        await publish_workflow_config_changed(deployment_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -361,7 +374,7 @@ async def get_workflow_history(
                 detail="Workflow not found.",
             )
 
-        return await DeploymentService.get_workflow_history(deployement_id)
+        return await DeploymentService.get_workflow_history(deployement_id, user.id)
     except HTTPException:
         raise
     except Exception as e:
@@ -413,6 +426,24 @@ async def export_workflow(
         ) from e
 
 
+@workflow_router.get("/runs/latency", response_model=List[ActionLatencyStats])
+async def get_action_latency(
+    workflow_id: Optional[UUID] = None,
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """p50/p95 execution time per action type over the user's persisted runs.
+
+    Built from the per-node timing in the run audits; runs recorded before
+    timing was captured don't contribute.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    return await WorkflowRunService.get_action_latency_stats(
+        db, user.id, workflow_id=workflow_id, since=since
+    )
+
+
 @workflow_router.get("/runs/{run_id}/audit", response_model=WorkflowRunDetail)
 async def get_run_audit(
     run_id: UUID,
@@ -421,13 +452,14 @@ async def get_run_audit(
 ):
     """Returns the persisted per-node execution audit for a run.
 
-    `run_id` is the Prefect run id (the same value the history list rows carry).
+    `run_id` is the id the history list rows carry: the Prefect run id, or the
+    audit record's own id for an inline run.
     Surfaces node_results / trigger_data that Prefect introspection lacks.
     """
-    record = await WorkflowRunService.get_by_prefect_run_id(db, run_id, user.id)
+    record = await WorkflowRunService.get_by_run_id(db, run_id, user.id)
     if record is None:
         # 404 (not 403): don't leak another user's run; also covers runs that
-        # predate the audit table or have no prefect_run_id.
+        # predate the audit table or have no run id.
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Run audit not found.",
@@ -435,6 +467,51 @@ async def get_run_audit(
     return record
 
 
+@workflow_router.post("/runs/{run_id}/resume")
+async def resume_run(
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Re-executes a failed run from its failed nodes.
+
+    The nodes that succeeded are not run again: the new run replays their
+    outputs from this run's audit, so e.g. an email that already went out
+    isn't sent twice. The new run gets its own audit record.
+    """
+    record = await WorkflowRunService.get_by_run_id(db, run_id, user.id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Run audit not found.",
+        )
+    workflow = await WorkflowService.get_by_id_and_user(db, record.workflow_id, user.id)
+    if workflow is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow not found.",
+        )
+
+    try:
+        parameters = await DeploymentService.resume(workflow, record)
+    except ResumeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        ) from e
+    except Exception as e:
+        logger.error(f"Error resuming run {run_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not resume this run.",
+        ) from e
+
+    return {
+        "status": "resumed",
+        "replayed_nodes": sorted(parameters["resume_outputs"]),
+    }
+
+
 @workflow_router.get("/runs/{run_id}/logs")
 async def get_run_logs(run_id: UUID, user: User = Depends(get_current_user)):
     """
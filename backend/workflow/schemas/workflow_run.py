@@ -35,12 +35,53 @@ class WorkflowRun(BaseModel):
         return v
 
 
+class NodeTimingResult(BaseModel):
+    """When a node queued, started and finished, as stored in its audit entry."""
+
+    node_type: Optional[str] = None
+    action_type: Optional[str] = None
+    queued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[float] = Field(
+        None, description="Execution time, started → finished."
+    )
+    queue_ms: Optional[float] = Field(
+        None, description="Executor overhead between becoming ready and starting."
+    )
+    barrier_wait_ms: Optional[float] = Field(
+        None,
+        description="Time between the first incoming edge firing and the last "
+        "predecessor settling (waiting on the dependency barrier).",
+    )
+    resolve_ms: Optional[float] = Field(
+        None, description="Actions only: time spent resolving {{variables}}."
+    )
+    throttle_ms: Optional[float] = Field(
+        None,
+        description="Actions only: time held back by a concurrency limit "
+        "(excluded from duration_ms).",
+    )
+
+
 class NodeResult(BaseModel):
     """Per-node audit entry as persisted in WorkflowRunRecord.node_results."""
 
     output: Any = Field(None, description="The value this node produced.")
     status: str = Field(..., description="success | failed")
     error: Optional[str] = Field(None, description="Error message if the node failed.")
+    timing: Optional[NodeTimingResult] = Field(
+        None, description="Absent on runs recorded before timing was captured."
+    )
+
+
+class ActionLatencyStats(BaseModel):
+    """Latency percentiles for one action type over the stored runs."""
+
+    action_type: str
+    count: int = Field(..., description="Executions the percentiles cover.")
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
 
 
 class WorkflowRunDetail(BaseModel):
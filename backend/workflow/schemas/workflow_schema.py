@@ -1,6 +1,6 @@
 from collections import deque
-from pydantic import BaseModel, Field, model_validator
-from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import Dict, List, Literal, Optional, Set, cast
 
 from utils.build_adjacency_list import build_adjacency_list
 from workflow.schemas.edges import Edge
@@ -20,52 +20,53 @@ class WorkflowExecutionConfig(BaseModel):
     edges: List[Edge] = Field(
         default_factory=list, description="Flat list of edges connecting the nodes."
     )
+    execution_mode: Optional[Literal["inline", "prefect"]] = Field(
+        None,
+        description=(
+            "Where runs execute: 'inline' in the API process, 'prefect' on a worker. "
+            "Leave null to let the server decide from the workflow's size."
+        ),
+    )
+
+    # Derived by the graph validator, so the executor can reuse them instead
+    # of rebuilding adjacency and re-sorting the graph.
+    _adjacency: Optional[Dict[str, List[Edge]]] = PrivateAttr(default=None)
+    _topological_order: Optional[List[str]] = PrivateAttr(default=None)
+
+    @property
+    def adjacency(self) -> Dict[str, List[Edge]]:
+        """Node ID → its outgoing edges."""
+        if self._adjacency is None:
+            # Built without validation (model_construct): derive on first use.
+            self._store(_GraphAnalysis(self.start_node_ids, self.edges))
+        return cast(Dict[str, List[Edge]], self._adjacency)
+
+    @property
+    def topological_order(self) -> List[str]:
+        """Every node reachable from a start node, each after all its predecessors."""
+        if self._topological_order is None:
+            self._store(_GraphAnalysis(self.start_node_ids, self.edges))
+        return cast(List[str], self._topological_order)
+
+    def _store(self, graph: "_GraphAnalysis") -> None:
+        self._adjacency = graph.adjacency
+        self._topological_order = graph.topological_order
 
     @model_validator(mode="after")
-    def check_for_cycles(self) -> "WorkflowExecutionConfig":
+    def check_graph(self) -> "WorkflowExecutionConfig":
         """
-        Uses Depth-First Search to ensure the graph is a
-        Directed Acyclic Graph (DAG).
+        Validates in one pass over the edges that the graph is a Directed
+        Acyclic Graph (DAG), that it contains actionable steps, and that
+        triggers are actually connected to every downstream node.
         """
-        if not self.edges:
-            return self
-
-        adj_list = build_adjacency_list(self.edges)
-
-        visited = set()  # Nodes fully processed
-        rec_stack = set()  # Nodes currently in the recursion stack
-
-        def has_cycle(node_id: str) -> bool:
-            visited.add(node_id)
-            rec_stack.add(node_id)
+        graph = _GraphAnalysis(self.start_node_ids, self.edges)
 
-            for edge in adj_list.get(node_id, []):
-                neighbor_id = edge.target
-                if neighbor_id not in visited:
-                    if has_cycle(neighbor_id):
-                        return True
-                elif neighbor_id in rec_stack:
-                    # Found a back-edge to a node currently being explored
-                    return True
-
-            rec_stack.remove(node_id)
-            return False
-
-        for start_node in self.start_node_ids:
-            if start_node not in visited and has_cycle(start_node):
-                raise ValueError(
-                    f"Circular dependency detected starting from node '{start_node}'. "
-                    "Workflows must be Directed Acyclic Graphs (DAGs)."
-                )
-
-        return self
+        if graph.cycle_start is not None:
+            raise ValueError(
+                f"Circular dependency detected starting from node '{graph.cycle_start}'. "
+                "Workflows must be Directed Acyclic Graphs (DAGs)."
+            )
 
-    @model_validator(mode="after")
-    def check_minimum_requirements(self) -> "WorkflowExecutionConfig":
-        """
-        Validates that the workflow contains actionable steps and that
-        triggers are actually connected to downstream nodes.
-        """
         has_executable_node = any(
             node.type in ["action", "condition"] for node in self.nodes.values()
         )
@@ -75,39 +76,106 @@ class WorkflowExecutionConfig(BaseModel):
                 "Trigger-only workflows are not allowed."
             )
 
-        start_node_has_edge = {
-            edge.source for edge in self.edges if edge.source in self.start_node_ids
-        }
-
-        if not start_node_has_edge:
+        if not any(start in graph.adjacency for start in self.start_node_ids):
             raise ValueError(
                 "At least one trigger node must be connected to an action or condition. "
                 "An isolated trigger node will not execute any processes."
             )
 
-        reachable_nodes = set(self.start_node_ids)
-        adj_list = build_adjacency_list(self.edges)
-
-        queue = deque(self.start_node_ids)
-        while queue:
-            current = queue.popleft()
-            for edge in adj_list.get(current, []):
-                if edge.target not in reachable_nodes:
-                    reachable_nodes.add(edge.target)
-                    queue.append(edge.target)
-
-        unreachable_nodes = (
-            set(self.nodes.keys()) - reachable_nodes
-        )  # elements that are in the first set but not in the second set
+        unreachable_nodes = [
+            node_id for node_id in self.nodes if node_id not in graph.reachable
+        ]
         if unreachable_nodes:
             raise ValueError(
                 f"Workflow contains unreachable nodes: {', '.join(unreachable_nodes)}. "
                 "All actions and conditions must be connected to a trigger path."
             )
 
+        self._store(graph)
         return self
 
 
+class _GraphAnalysis:
+    """
+    Adjacency, reachability, cycle detection and a topological order for a
+    workflow graph, computed iteratively (no recursion limit on long chains).
+
+    Reachability is a BFS from the start nodes that remembers which start node
+    reached each node first. Kahn's algorithm over the reachable subgraph then
+    yields the topological order; any node it can't order sits on (or behind)
+    a cycle.
+    """
+
+    __slots__ = ("adjacency", "cycle_start", "reachable", "topological_order")
+
+    def __init__(self, start_node_ids: List[str], edges: List[Edge]):
+        self.adjacency = build_adjacency_list(edges)
+
+        # node_id → index of the first start node that reaches it.
+        reached_from: Dict[str, int] = {}
+        for index, start in enumerate(start_node_ids):
+            if start in reached_from:
+                continue
+            reached_from[start] = index
+            queue = deque([start])
+            while queue:
+                for edge in self.adjacency.get(queue.popleft(), []):
+                    if edge.target not in reached_from:
+                        reached_from[edge.target] = index
+                        queue.append(edge.target)
+        self.reachable = reached_from.keys()
+
+        in_degree = dict.fromkeys(reached_from, 0)
+        for source in reached_from:
+            for edge in self.adjacency.get(source, []):
+                in_degree[edge.target] += 1
+
+        queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+        order: List[str] = []
+        while queue:
+            node_id = queue.popleft()
+            order.append(node_id)
+            for edge in self.adjacency.get(node_id, []):
+                in_degree[edge.target] -= 1
+                if in_degree[edge.target] == 0:
+                    queue.append(edge.target)
+        self.topological_order = order
+
+        # Report the cycle against the first start node that leads into it.
+        self.cycle_start: Optional[str] = None
+        if len(order) < len(reached_from):
+            on_cycle = self._leading_into_cycles(
+                {node_id for node_id, degree in in_degree.items() if degree > 0}
+            )
+            first = min(reached_from[node_id] for node_id in on_cycle)
+            self.cycle_start = start_node_ids[first]
+
+    def _leading_into_cycles(self, unordered: Set[str]) -> Set[str]:
+        """
+        Drops the nodes Kahn's algorithm left unordered only because they sit
+        behind a cycle: peeling off nodes with no successor among the rest
+        leaves the cycles and the paths between them.
+        """
+        predecessors: Dict[str, List[str]] = {}
+        out_degree = dict.fromkeys(unordered, 0)
+        for source in unordered:
+            for edge in self.adjacency.get(source, []):
+                if edge.target in unordered:
+                    out_degree[source] += 1
+                    predecessors.setdefault(edge.target, []).append(source)
+
+        remaining = set(unordered)
+        queue = deque(node_id for node_id, degree in out_degree.items() if degree == 0)
+        while queue:
+            node_id = queue.popleft()
+            remaining.discard(node_id)
+            for source in predecessors.get(node_id, []):
+                out_degree[source] -= 1
+                if out_degree[source] == 0:
+                    queue.append(source)
+        return remaining
+
+
 class WorkflowSchema(BaseModel):
     """
     The full representation used by the API and AI Service.
@@ -1,7 +1,20 @@
 from .workflow_service import WorkflowService
 from .workflow_run_service import WorkflowRunService
+from .trigger_payload_service import TriggerPayloadNotFound, TriggerPayloadService
+from .workflow_config_cache import (
+    clear_workflow_config_cache,
+    get_workflow_config,
+    invalidate_workflow_config,
+    publish_workflow_config_changed,
+)
 
 __all__ = [
+    "TriggerPayloadNotFound",
+    "TriggerPayloadService",
     "WorkflowRunService",
     "WorkflowService",
+    "clear_workflow_config_cache",
+    "get_workflow_config",
+    "invalidate_workflow_config",
+    "publish_workflow_config_changed",
 ]
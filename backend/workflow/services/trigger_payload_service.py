@@ -0,0 +1,118 @@
+"""Claim check for large trigger payloads.
+
+A Prefect flow run's parameters are serialized into the Prefect API database
+and shipped to the worker, so a multi-megabyte webhook body or decoded email
+used to be stored and copied several times per run. Above
+``trigger_payload_inline_max_bytes`` the payload is written once, compressed,
+to ``trigger_payloads``; the run's ``trigger_context`` carries a
+``payload_ref`` instead and the master flow loads it when the run starts.
+Expired rows are purged by the daily ``cleanup_expired_trigger_payloads`` flow.
+"""
+
+import json
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import delete
+
+from core.config_loader import settings
+from core.database import db_session
+from workflow.models.trigger_payload import TriggerPayload
+
+# The trigger_context keys that hold the payload itself.
+PAYLOAD_KEYS = ("original_email", "webhook_payload")
+PAYLOAD_REF = "payload_ref"
+
+
+class TriggerPayloadNotFound(Exception):
+    """A run references a stored payload that no longer exists."""
+
+
+def _trigger_context(parameters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    ctx = (parameters or {}).get("trigger_context")
+    return ctx if isinstance(ctx, dict) else None
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, default=str, separators=(",", ":")).encode()
+
+
+class TriggerPayloadService:
+    @staticmethod
+    def is_reference(parameters: Optional[Dict[str, Any]]) -> bool:
+        ctx = _trigger_context(parameters)
+        return ctx is not None and PAYLOAD_REF in ctx
+
+    @staticmethod
+    async def offload(
+        workflow_id: UUID, parameters: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ``parameters`` with a large trigger payload replaced by a reference.
+        Small payloads (and parameters without one) are returned unchanged.
+        """
+        limit = settings.trigger_payload_inline_max_bytes
+        ctx = _trigger_context(parameters)
+        if limit <= 0 or ctx is None:
+            return parameters
+        payload = {key: ctx[key] for key in PAYLOAD_KEYS if ctx.get(key) is not None}
+        if not payload:
+            return parameters
+        raw = encode_payload(payload)
+        if len(raw) <= limit:
+            return parameters
+
+        now = datetime.now(timezone.utc)
+        # The id is assigned up front so the reference is known without a refresh.
+        record = TriggerPayload(
+            id=uuid.uuid4(),
+            workflow_id=workflow_id,
+            data=zlib.compress(raw),
+            size_bytes=len(raw),
+            created_at=now,
+            expires_at=now + timedelta(hours=settings.trigger_payload_retention_hours),
+        )
+        async with db_session() as db:
+            db.add(record)
+            await db.commit()
+
+        slim = {key: value for key, value in ctx.items() if key not in PAYLOAD_KEYS}
+        slim[PAYLOAD_REF] = str(record.id)
+        return {**(parameters or {}), "trigger_context": slim}
+
+    @staticmethod
+    async def purge_expired() -> int:
+        """Delete the payloads past ``expires_at``; returns how many went."""
+        async with db_session() as db:
+            result = await db.execute(
+                delete(TriggerPayload)
+                .where(TriggerPayload.expires_at < datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return result.rowcount  # type: ignore[attr-defined]
+
+    @staticmethod
+    async def load(parameters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        ``parameters`` with a ``payload_ref`` swapped back for the stored payload.
+        Anything without a reference is returned as is, without a DB round trip.
+        Raises TriggerPayloadNotFound when the payload has expired.
+        """
+        ctx = _trigger_context(parameters)
+        if ctx is None or PAYLOAD_REF not in ctx:
+            return parameters
+
+        async with db_session() as db:
+            record = await db.get(TriggerPayload, UUID(str(ctx[PAYLOAD_REF])))
+        if record is None:
+            raise TriggerPayloadNotFound(
+                f"Trigger payload {ctx[PAYLOAD_REF]} no longer exists."
+            )
+
+        restored = {key: value for key, value in ctx.items() if key != PAYLOAD_REF}
+        restored.update(json.loads(zlib.decompress(record.data)))
+        return {**(parameters or {}), "trigger_context": restored}
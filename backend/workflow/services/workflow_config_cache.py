@@ -0,0 +1,101 @@
+"""Process-local cache of validated ``WorkflowExecutionConfig`` models.
+
+The Gmail sync pass and the webhook trigger both need a workflow's config as a
+model, and used to re-validate the stored JSONB on every message / request.
+That JSONB was validated when the workflow was saved, so models are cached per
+(workflow id, version): an edit bumps the version and misses the cache.
+
+An edit or delete also publishes a ``workflow_config_changed`` event on the
+events NOTIFY channel; every API process registers ``on_workflow_config_changed``
+with its listener at startup and evicts its copy, so stale versions don't
+linger in memory.
+"""
+
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+from pydantic import TypeAdapter
+
+from core.config_loader import settings
+from core.events import publish_event
+from utils.lru_cache import LRUCache
+from workflow.models.workflow import Workflow
+from workflow.schemas import WorkflowExecutionConfig
+from workflow.schemas.edges import Edge
+from workflow.schemas.workflow_nodes import WorkflowNode
+
+WORKFLOW_CONFIG_CHANGED = "workflow_config_changed"
+
+# workflow id → (version, validated config).
+_configs: LRUCache[str, Tuple[int, WorkflowExecutionConfig]] = LRUCache(
+    settings.workflow_config_cache_size
+)
+
+_nodes = TypeAdapter(Dict[str, WorkflowNode])
+_edges = TypeAdapter(List[Edge])
+
+
+def trusted_execution_config(data: Dict[str, Any]) -> WorkflowExecutionConfig:
+    """
+    Build the model from a config that was validated when it was written.
+
+    ``model_construct`` skips the model-level graph validation (cycles,
+    reachability); nodes and edges are still parsed into their models, since
+    the executor and triggers read them as objects. The adjacency and
+    topological order are derived lazily if something asks for them.
+    """
+    return WorkflowExecutionConfig.model_construct(
+        start_node_ids=list(data["start_node_ids"]),
+        nodes=_nodes.validate_python(data["nodes"]),
+        edges=_edges.validate_python(data.get("edges") or []),
+        execution_mode=data.get("execution_mode"),
+    )
+
+
+def get_workflow_config(
+    workflow: Workflow, *, trusted: bool = True
+) -> WorkflowExecutionConfig:
+    """``workflow``'s config as a model, from the cache when this version has one.
+
+    ``trusted=False`` runs full validation on a miss, for configs that didn't
+    go through the save path.
+    """
+    key = str(workflow.id)
+    version = workflow.version or 1
+    cached = _configs.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    config = (
+        trusted_execution_config(workflow.config)
+        if trusted
+        else WorkflowExecutionConfig.model_validate(workflow.config)
+    )
+    _configs.put(key, (version, config))
+    return config
+
+
+def invalidate_workflow_config(workflow_id: Any) -> None:
+    _configs.pop(str(workflow_id))
+
+
+def on_workflow_config_changed(event: Dict[str, Any]) -> None:
+    """Listener handler: an edit or delete in some API process."""
+    invalidate_workflow_config(event.get("workflow_id"))
+
+
+def clear_workflow_config_cache() -> None:
+    _configs.clear()
+
+
+async def publish_workflow_config_changed(workflow_id: UUID) -> None:
+    """Evict ``workflow_id`` here and, via NOTIFY, in every other API process.
+
+    Call after the edit or delete is committed. Best-effort like every event:
+    a lost NOTIFY only leaves an unreachable old version in the cache.
+    """
+    invalidate_workflow_config(workflow_id)
+    # No user_id: the listener consumes it instead of forwarding it to a socket.
+    await publish_event(
+        {"type": WORKFLOW_CONFIG_CHANGED, "workflow_id": str(workflow_id)}
+    )
@@ -1,7 +1,9 @@
+from datetime import datetime
 from uuid import UUID
 from typing import Optional, List
 
-from sqlalchemy import select, update
+from sqlalchemy import Float, and_, column, func, or_, select, true, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from workflow.models.workflow_run_record import WorkflowRunRecord
@@ -19,8 +21,11 @@ class WorkflowRunService:
         prefect_run_id: Optional[UUID] = None,
         trigger_data: Optional[dict] = None,
         duration_ms: Optional[int] = None,
+        id: Optional[UUID] = None,
+        inline: bool = False,
     ) -> WorkflowRunRecord:
         record = WorkflowRunRecord(
+            inline=inline,
             workflow_id=workflow_id,
             user_id=user_id,
             prefect_run_id=prefect_run_id,
@@ -29,27 +34,113 @@ class WorkflowRunService:
             status=status,
             duration_ms=duration_ms,
         )
+        if id is not None:
+            record.id = id
         db.add(record)
         await db.commit()
         await db.refresh(record)
         return record
 
     @staticmethod
-    async def get_by_prefect_run_id(
-        db: AsyncSession, prefect_run_id: UUID, user_id: UUID
+    async def get_by_run_id(
+        db: AsyncSession, run_id: UUID, user_id: UUID
     ) -> Optional[WorkflowRunRecord]:
-        """Fetch a single audit record by its Prefect run id, scoped to the owner.
+        """Fetch a single audit record by its run id, scoped to the owner.
 
-        Filtering on user_id enforces ownership in the query, so a non-owner gets
-        None (treated as 404 by the route — no existence leak)."""
+        The run id is the Prefect run id, or the record's own id for an inline
+        run (the id its events and history row carry). Filtering on user_id
+        enforces ownership in the query, so a non-owner gets None (treated as
+        404 by the route — no existence leak)."""
         result = await db.execute(
             select(WorkflowRunRecord).where(
-                WorkflowRunRecord.prefect_run_id == prefect_run_id,
+                or_(
+                    WorkflowRunRecord.prefect_run_id == run_id,
+                    and_(
+                        WorkflowRunRecord.inline.is_(True),
+                        WorkflowRunRecord.id == run_id,
+                    ),
+                ),
                 WorkflowRunRecord.user_id == user_id,
             )
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_inline_runs(
+        db: AsyncSession,
+        user_id: UUID,
+        workflow_id: Optional[UUID] = None,
+        limit: int = 50,
+    ) -> List[WorkflowRunRecord]:
+        """The user's most recent inline runs, which Prefect has no record of."""
+        query = select(WorkflowRunRecord).where(
+            WorkflowRunRecord.user_id == user_id,
+            WorkflowRunRecord.inline.is_(True),
+        )
+        if workflow_id is not None:
+            query = query.where(WorkflowRunRecord.workflow_id == workflow_id)
+        result = await db.execute(
+            query.order_by(WorkflowRunRecord.triggered_at.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def action_latency_query(
+        user_id: UUID,
+        workflow_id: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+    ):
+        """p50/p95 of node timing.duration_ms per action type.
+
+        Unnests each run's node_results JSONB in Postgres, so only the
+        aggregated rows leave the database.
+        """
+        node = func.jsonb_each(WorkflowRunRecord.node_results).table_valued(
+            "key", column("value", JSONB)
+        )
+        action_type = node.c.value[("timing", "action_type")].astext
+        duration = node.c.value[("timing", "duration_ms")].astext.cast(Float)
+
+        timed_nodes = (
+            select(action_type.label("action_type"), duration.label("duration_ms"))
+            .select_from(WorkflowRunRecord)
+            .join(node, true())
+            .where(WorkflowRunRecord.user_id == user_id)
+        )
+        if workflow_id is not None:
+            timed_nodes = timed_nodes.where(WorkflowRunRecord.workflow_id == workflow_id)
+        if since is not None:
+            timed_nodes = timed_nodes.where(WorkflowRunRecord.triggered_at >= since)
+        timed = timed_nodes.subquery()
+
+        return (
+            select(
+                timed.c.action_type,
+                func.count().label("count"),
+                func.percentile_cont(0.5)
+                .within_group(timed.c.duration_ms)
+                .label("p50_ms"),
+                func.percentile_cont(0.95)
+                .within_group(timed.c.duration_ms)
+                .label("p95_ms"),
+            )
+            .where(timed.c.action_type.is_not(None), timed.c.duration_ms.is_not(None))
+            .group_by(timed.c.action_type)
+            .order_by(timed.c.action_type)
+        )
+
+    @staticmethod
+    async def get_action_latency_stats(
+        db: AsyncSession,
+        user_id: UUID,
+        workflow_id: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+    ) -> List[dict]:
+        result = await db.execute(
+            WorkflowRunService.action_latency_query(user_id, workflow_id, since)
+        )
+        return [dict(row) for row in result.mappings().all()]
+
     @staticmethod
     async def get_undelivered_failures(
         db: AsyncSession, user_id: UUID